@@ -4,6 +4,7 @@ import requests
 from typing import Optional
 from datetime import datetime
 from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageOpportunity
+from arbitrage_app.scraper.api.http_session import create_http_session
 from arbitrage_app.sample_trading import TRADING_PAIRS, ARBITRAGE_THRESHOLD
 
 from dotenv import load_dotenv
@@ -14,10 +15,15 @@ logger = logging.getLogger(__name__)
 class BaleNotifier:
     """Bale bot client for sending arbitrage notifications"""
     
-    def __init__(self, bot_token: str, chat_id: str):
+    def __init__(self, bot_token: str, chat_id: str, metrics_collector=None):
         self.bot_token = bot_token
         self.chat_id = chat_id
         self.base_url = f"https://tapi.bale.ai/bot{bot_token}"
+        self.session = create_http_session("bale", metrics_collector)
+    
+    def close(self):
+        """Close pooled connections to the Bale API"""
+        self.session.close()
         
     def send_message(self, message: str) -> bool:
         """
@@ -38,7 +44,7 @@ class BaleNotifier:
         }
         
         try:
-            response = requests.post(url, json=payload, timeout=10)
+            response = self.session.post(url, json=payload)
             response.raise_for_status()
             
             logger.info("Bale message sent successfully")
@@ -65,14 +71,26 @@ class BaleNotifier:
         discovery_time = datetime.fromtimestamp(opportunity.timestamp)
         time_str = discovery_time.strftime("%Y-%m-%d %H:%M:%S")
         
-        # Format prices with proper formatting
-        nobitex_price_str = f"{opportunity.nobitex_price:,.6f}"
-        wallex_price_str = f"{opportunity.wallex_price:,.6f}"
+        # Format prices with proper formatting, for whichever exchanges quoted the pair
+        exchange_prices = {"nobitex": opportunity.nobitex_price, "wallex": opportunity.wallex_price}
+        exchange_prices.setdefault(opportunity.buy_exchange, opportunity.buy_price)
+        exchange_prices.setdefault(opportunity.sell_exchange, opportunity.sell_price)
+        prices_str = "\n".join(
+            f"• * {exchange.title()} Price: * {price:,.6f} USDT"
+            for exchange, price in exchange_prices.items() if price is not None
+        )
         
         # Format profit information
         profit_percentage_str = f"{opportunity.profit_percentage:.6f}%"
         profit_amount_str = f"{opportunity.profit_amount:,.6f}"
         
+        # Order book scans also report the size both books can fill
+        depth_str = ""
+        if opportunity.executable_volume is not None:
+            depth_str = (f"• * Executable Volume: * {opportunity.executable_volume:,.6f}\n"
+                         f"• * Buy VWAP: * {opportunity.buy_vwap:,.6f} USDT\n"
+                         f"• * Sell VWAP: * {opportunity.sell_vwap:,.6f} USDT\n")
+        
         # Create the message
         message = f"""
 🚨 * ARBITRAGE OPPORTUNITY DETECTED! * 🚨
@@ -81,15 +99,14 @@ class BaleNotifier:
 ⏰ * Discovery Time: * {time_str}
 
 💰 * Price Information: *
-• * Nobitex Price: * {nobitex_price_str} USDT
-• * Wallex Price: * {wallex_price_str} USDT
+{prices_str}
 
 📈 * Arbitrage Details: *
 • * Buy Exchange: * {opportunity.buy_exchange.upper()}
 • * Sell Exchange: * {opportunity.sell_exchange.upper()}
 • * Profit Percentage: * {profit_percentage_str}
 • * Profit Amount: * {profit_amount_str} USDT
-
+{depth_str}
 ⚡ _ Act quickly! Arbitrage opportunities may disappear fast. _
         """.strip()
         
@@ -170,10 +187,13 @@ _ Please check the service logs for more details. _
         
         return self.send_message(error_notification)
 
-def create_bale_notifier() -> Optional[BaleNotifier]:
+def create_bale_notifier(metrics_collector=None) -> Optional[BaleNotifier]:
     """
     Create a BaleNotifier instance from environment variables
     
+    Args:
+        metrics_collector: Optional PrometheusMetrics instance for connection metrics
+    
     Returns:
         BaleNotifier instance or None if configuration is missing
     """
@@ -188,4 +208,4 @@ def create_bale_notifier() -> Optional[BaleNotifier]:
         logger.warning("Bale configuration not properly set. Please update environment variables.")
         return None
     
-    return BaleNotifier(bot_token, chat_id)
+    return BaleNotifier(bot_token, chat_id, metrics_collector)
@@ -1,8 +1,13 @@
+import asyncio
 import logging
 import time
-from typing import List
+from contextlib import nullcontext
+from typing import Callable, List, Optional
 from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector, ArbitrageOpportunity
+from arbitrage_app.scraper.detector.async_arbitrage_detector import AsyncArbitrageDetector
+from arbitrage_app.scraper.detector.streaming_arbitrage_detector import StreamingArbitrageDetector
 from arbitrage_app.bot.notifier.bale_notifier import create_bale_notifier
+from arbitrage_app.sample_trading import RUN_MODE
 
 
 logger = logging.getLogger(__name__)
@@ -10,13 +15,24 @@ logger = logging.getLogger(__name__)
 class ArbitrageNotificationService:
     """Service that monitors for arbitrage opportunities and sends notifications"""
     
-    def __init__(self, metrics_collector=None, database_service=None):
-        self.detector = ArbitrageDetector(metrics_collector, database_service)
-        self.bale_notifier = create_bale_notifier()
+    def __init__(self, metrics_collector=None, database_service=None, run_mode: str = RUN_MODE,
+                 trading_pairs: Optional[List[str]] = None):
+        self.run_mode = run_mode
+        if run_mode == "async":
+            self.detector = AsyncArbitrageDetector(metrics_collector, database_service, trading_pairs=trading_pairs)
+        elif run_mode == "stream":
+            self.detector = StreamingArbitrageDetector(metrics_collector, database_service, trading_pairs=trading_pairs)
+        else:
+            self.detector = ArbitrageDetector(metrics_collector, database_service, trading_pairs=trading_pairs)
+        self.bale_notifier = create_bale_notifier(metrics_collector)
         self.last_notifications = {}  # Track last notification time per symbol
         self.notification_cooldown = 300  # 5 minutes cooldown between notifications for same symbol
         self.metrics = metrics_collector
         
+    def _stage(self, stage: str):
+        """Context manager timing a scan stage, or doing nothing without metrics"""
+        return self.metrics.time_stage(stage) if self.metrics else nullcontext()
+    
     def should_send_notification(self, opportunity: ArbitrageOpportunity) -> bool:
         """
         Check if we should send a notification for this opportunity
@@ -84,9 +100,10 @@ class ArbitrageNotificationService:
             
             # Send notifications for each opportunity
             notifications_sent = 0
-            for opportunity in opportunities:
-                if self.send_arbitrage_notification(opportunity):
-                    notifications_sent += 1
+            with self._stage("notify"):
+                for opportunity in opportunities:
+                    if self.send_arbitrage_notification(opportunity):
+                        notifications_sent += 1
             
             logger.info(f"Scan completed. Found {len(opportunities)} opportunities, sent {notifications_sent} notifications.")
             return opportunities
@@ -100,6 +117,55 @@ class ArbitrageNotificationService:
             
             return []
     
+    async def async_scan_and_notify(self) -> List[ArbitrageOpportunity]:
+        """
+        Scan for arbitrage opportunities on the event loop and send notifications
+        
+        Returns:
+            List of arbitrage opportunities found
+        """
+        loop = asyncio.get_running_loop()
+        
+        try:
+            opportunities = await self.detector.scan_all_pairs()
+            
+            # Bale requests are blocking, keep them off the event loop
+            with self._stage("notify"):
+                results = await asyncio.gather(*(
+                    loop.run_in_executor(None, self.send_arbitrage_notification, opportunity)
+                    for opportunity in opportunities
+                ))
+            notifications_sent = sum(1 for sent in results if sent)
+            
+            logger.info(f"Scan completed. Found {len(opportunities)} opportunities, sent {notifications_sent} notifications.")
+            return opportunities
+            
+        except Exception as e:
+            logger.error(f"Error during arbitrage scan: {e}")
+            
+            # Send error notification
+            if self.bale_notifier:
+                await loop.run_in_executor(None, self.bale_notifier.send_error_notification, str(e))
+            
+            return []
+    
+    async def stream_and_notify(self, on_opportunity: Optional[Callable[[ArbitrageOpportunity], None]] = None):
+        """
+        Detect opportunities from the exchange streams and send notifications until stopped
+        
+        Args:
+            on_opportunity: Optional callback run for every opportunity found
+        """
+        loop = asyncio.get_running_loop()
+        
+        async def notify(opportunity: ArbitrageOpportunity):
+            # Bale requests are blocking and must not hold up the stream, so they are not awaited
+            loop.run_in_executor(None, self.send_arbitrage_notification, opportunity)
+            if on_opportunity:
+                on_opportunity(opportunity)
+        
+        await self.detector.run(notify)
+    
     def send_startup_notification(self) -> bool:
         """
         Send startup notification when service starts
@@ -134,6 +200,19 @@ class ArbitrageNotificationService:
             logger.error(f"Error sending test notification: {e}")
             return False
     
+    def close(self):
+        """Release HTTP sessions held by the detector and the Bale notifier"""
+        # The async detector's sessions belong to the event loop, see async_close
+        if self.run_mode != "async":
+            self.detector.close()
+        if self.bale_notifier:
+            self.bale_notifier.close()
+    
+    async def async_close(self):
+        """Close the async detector's sessions before the event loop stops"""
+        if self.run_mode == "async":
+            await self.detector.close()
+    
     def get_service_status(self) -> dict:
         """
         Get current service status information
@@ -144,7 +223,10 @@ class ArbitrageNotificationService:
         return {
             "bale_configured": self.bale_notifier is not None,
             "trading_pairs_count": len(self.detector.trading_pairs),
+            "exchanges": list(self.detector.exchanges),
             "arbitrage_threshold": self.detector.threshold,
+            "scan_mode": self.detector.scan_mode,
+            "run_mode": self.run_mode,
             "notification_cooldown": self.notification_cooldown,
             "last_notifications": len(self.last_notifications),
             "service_uptime": time.time()
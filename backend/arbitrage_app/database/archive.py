@@ -0,0 +1,246 @@
+"""
+Columnar archive of aged price and opportunity history
+Rows older than ARCHIVE_TABLES allows move out of the database into Parquet files partitioned by date and symbol
+Run directly: python -m arbitrage_app.database.archive
+
+Files live at <ARCHIVE_PATH>/<table>/date=YYYY-MM-DD/symbol=<symbol>/part-<first id>-<last id>.parquet.
+A day is written first and deleted from the database afterwards, by the ids
+that reached a file; re-running after an interruption rewrites the same file
+names, so nothing is duplicated. On a partitioned table, partitions whose
+whole range was archived are detached and dropped instead of deleting their rows.
+"""
+
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Iterator, List, Optional
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from sqlalchemy import Table, Boolean, DateTime, Float, Integer, String, delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from arbitrage_app.database.models import DatabaseManager, ArbitrageOpportunityTable, PriceDataTable, init_database
+from arbitrage_app.database.partitioning import INTERVALS
+from arbitrage_app.database.streaming import stream_rows, column_batches
+from arbitrage_app.sample_trading import ARCHIVE_PATH, ARCHIVE_TABLES, ARCHIVE_COMPRESSION, STREAM_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+TABLES = {table.__tablename__: table.__table__ for table in (PriceDataTable, ArbitrageOpportunityTable)}
+
+# Columns carried by the directory names rather than inside the files
+PARTITION_COLUMNS = ("date", "symbol")
+
+# Archived ids per DELETE statement, below SQLite's bound parameter limit
+DELETE_CHUNK_IDS = 900
+
+def arrow_type(column) -> pa.DataType:
+    """Arrow type storing a SQLAlchemy column"""
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    if isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, DateTime):
+        return pa.timestamp("us")
+    if isinstance(column.type, Boolean):
+        return pa.bool_()
+    if isinstance(column.type, String):
+        return pa.string()
+    raise TypeError(f"No archive type for column {column.name} ({column.type})")
+
+def file_schema(table: Table) -> pa.Schema:
+    """Schema of a table's archive files: every column except the partition columns"""
+    return pa.schema([(column.name, arrow_type(column)) for column in table.columns if column.name not in PARTITION_COLUMNS])
+
+class ArchiveManager:
+    """
+    Moves aged rows to Parquet and reads archive and database back as one history
+
+    Each table in ARCHIVE_TABLES keeps `after_days` whole days in the
+    database; older days are archived one day at a time.
+    """
+
+    def __init__(self, db_manager: DatabaseManager, path: str = ARCHIVE_PATH, tables: Dict[str, dict] = ARCHIVE_TABLES,
+                 compression: str = ARCHIVE_COMPRESSION):
+        self.db_manager = db_manager
+        self.path = path
+        self.tables = tables
+        self.compression = compression
+
+    def archive(self, now: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        Archive every day older than each table's `after_days`
+
+        Returns:
+            Dictionary mapping table name to the number of rows archived
+        """
+        now = now or datetime.utcnow()
+        archived = {}
+        for table_name, settings in self.tables.items():
+            table = TABLES[table_name]
+            cutoff = datetime(now.year, now.month, now.day) - timedelta(days=settings["after_days"])
+            archived[table_name] = 0
+            try:
+                with self.db_manager.engine.connect() as connection:
+                    oldest = connection.execute(select(func.min(table.c.timestamp)).where(table.c.timestamp < cutoff)).scalar()
+                if oldest is None:
+                    continue
+                partitions = self._whole_partitions(table_name, cutoff)
+                day = datetime(oldest.year, oldest.month, oldest.day)
+                while day < cutoff:
+                    # Rows of a partition that is dropped below are not deleted one by one
+                    in_partition = any(start <= day < end for start, end in partitions.values())
+                    archived[table_name] += self.archive_day(table_name, day, delete_rows=not in_partition)
+                    day += timedelta(days=1)
+                if partitions:
+                    self.db_manager.partition_manager.drop_partitions(table_name, sorted(partitions))
+            except (SQLAlchemyError, OSError, pa.ArrowException) as e:
+                logger.error(f"Error archiving {table_name}: {e}")
+            if archived[table_name]:
+                logger.info(f"Archived {archived[table_name]} {table_name} rows older than {cutoff:%Y-%m-%d}")
+        return archived
+
+    def _whole_partitions(self, table_name: str, cutoff: datetime) -> Dict[str, tuple]:
+        """Partitions of a table whose whole range is older than `cutoff`, mapped to (start, end); empty if not partitioned"""
+        partition_manager = self.db_manager.partition_manager
+        if not partition_manager.enabled or table_name not in partition_manager.tables or not partition_manager.is_partitioned(table_name):
+            return {}
+        step = INTERVALS[partition_manager.tables[table_name]["interval"]]
+        starts = partition_manager.list_partitions(table_name)
+        return {name: (starts[name], starts[name] + step) for name in partition_manager.partitions_before(table_name, cutoff)}
+
+    def archive_day(self, table_name: str, day: datetime, delete_rows: bool = True) -> int:
+        """
+        Write one day of a table to Parquet, one file per symbol, then delete it from the database
+
+        Args:
+            table_name: 'price_data' or 'arbitrage_opportunities'
+            day: Midnight starting the day
+            delete_rows: Delete the archived rows; off when their whole partition is dropped afterwards
+
+        Returns:
+            Number of rows archived
+        """
+        table = TABLES[table_name]
+        schema = file_schema(table)
+        next_day = day + timedelta(days=1)
+        query = select(table).where(table.c.timestamp >= day, table.c.timestamp < next_day)
+        rows = stream_rows(self.db_manager.engine, query, table.c.timestamp, table.c.id)
+
+        writers = {}
+        try:
+            for batch in column_batches(rows, table.columns.keys()):
+                record_batch = pa.record_batch([pa.array(batch[name], field.type) for name, field in zip(schema.names, schema)], schema=schema)
+                # One pass over the batch groups row positions by symbol
+                positions = {}
+                for index, symbol in enumerate(batch["symbol"]):
+                    positions.setdefault(symbol, []).append(index)
+                for symbol, indexes in positions.items():
+                    if symbol not in writers:
+                        writers[symbol] = self._open_writer(table_name, day, symbol, schema)
+                    symbol_batch = record_batch.take(pa.array(indexes, pa.int64()))
+                    writers[symbol]["writer"].write_batch(symbol_batch)
+                    writers[symbol]["ids"].append(symbol_batch["id"])
+        finally:
+            for writer in writers.values():
+                writer["writer"].close()
+
+        if not writers:
+            return 0
+        for writer in writers.values():
+            ids = pa.chunked_array(writer["ids"], pa.int64())
+            os.replace(writer["temporary_path"], os.path.join(os.path.dirname(writer["temporary_path"]),
+                                                              f"part-{pc.min(ids).as_py()}-{pc.max(ids).as_py()}.parquet"))
+
+        if not delete_rows:
+            written = sum(len(ids) for writer in writers.values() for ids in writer["ids"])
+            logger.info(f"Archived {written} {table_name} rows of {day:%Y-%m-%d} for {len(writers)} symbols, kept until their partition is dropped")
+            return written
+
+        # Only the rows that reached a file are deleted: a row committed late
+        # with an id inside the archived range was never streamed and stays
+        deleted = 0
+        with self.db_manager.engine.begin() as connection:
+            for writer in writers.values():
+                ids = pa.chunked_array(writer["ids"], pa.int64()).to_pylist()
+                for start in range(0, len(ids), DELETE_CHUNK_IDS):
+                    deleted += connection.execute(delete(table).where(
+                        table.c.timestamp >= day, table.c.timestamp < next_day,
+                        table.c.id.in_(ids[start:start + DELETE_CHUNK_IDS])
+                    )).rowcount
+        logger.info(f"Archived {deleted} {table_name} rows of {day:%Y-%m-%d} for {len(writers)} symbols")
+        return deleted
+
+    def _open_writer(self, table_name: str, day: datetime, symbol: str, schema: pa.Schema) -> dict:
+        """Parquet writer for one day and symbol, writing to a temporary file until the day is complete"""
+        directory = os.path.join(self.path, table_name, f"date={day:%Y-%m-%d}", f"symbol={symbol}")
+        os.makedirs(directory, exist_ok=True)
+        # Dataset discovery skips dot files, so readers never see a half-written day
+        temporary_path = os.path.join(directory, ".part.parquet.tmp")
+        return {
+            "writer": pq.ParquetWriter(temporary_path, schema, compression=self.compression),
+            "temporary_path": temporary_path,
+            "ids": []
+        }
+
+    def archived_days(self, table_name: str) -> List[str]:
+        """Dates, as YYYY-MM-DD, that have archive files for a table"""
+        table_path = os.path.join(self.path, table_name)
+        if not os.path.isdir(table_path):
+            return []
+        return sorted(name.split("=", 1)[1] for name in os.listdir(table_path) if name.startswith("date="))
+
+    def scan(self, table_name: str, start: datetime, end: datetime, symbol: Optional[str] = None,
+             batch_size: int = STREAM_PAGE_SIZE) -> Iterator[Dict[str, list]]:
+        """
+        Read a time range of a table from the archive and the database as one history
+
+        Archived days come first, each sorted by (timestamp, id) and read one
+        day at a time, followed by the rows still in the database.
+
+        Args:
+            table_name: 'price_data' or 'arbitrage_opportunities'
+            start: Earliest timestamp to include
+            end: Timestamps before this time are included
+            symbol: Only this symbol if given
+            batch_size: Rows per yielded batch
+
+        Yields:
+            Dictionaries mapping every column of the table to its values in the batch
+        """
+        table = TABLES[table_name]
+        columns = table.columns.keys()
+        for date in self.archived_days(table_name):
+            if not start.strftime("%Y-%m-%d") <= date <= end.strftime("%Y-%m-%d"):
+                continue
+            day_table = self._read_day(table_name, date, start, end, symbol)
+            for record_batch in day_table.select(columns).to_batches(batch_size):
+                yield record_batch.to_pydict()
+
+        query = select(table).where(table.c.timestamp >= start, table.c.timestamp < end)
+        if symbol is not None:
+            query = query.where(table.c.symbol == symbol)
+        yield from column_batches(stream_rows(self.db_manager.engine, query, table.c.timestamp, table.c.id, batch_size), columns, batch_size)
+
+    def _read_day(self, table_name: str, date: str, start: datetime, end: datetime, symbol: Optional[str]) -> pa.Table:
+        """One archived day of a table within a time range, sorted by (timestamp, id)"""
+        day_path = os.path.join(self.path, table_name, f"date={date}")
+        dataset = ds.dataset(day_path, format="parquet", partitioning=ds.partitioning(pa.schema([("symbol", pa.string())]), flavor="hive"))
+        time_filter = (ds.field("timestamp") >= pa.scalar(start, pa.timestamp("us"))) & (ds.field("timestamp") < pa.scalar(end, pa.timestamp("us")))
+        if symbol is not None:
+            time_filter &= ds.field("symbol") == symbol
+        day_table = dataset.to_table(filter=time_filter)
+        return day_table.take(pc.sort_indices(day_table, sort_keys=[("timestamp", "ascending"), ("id", "ascending")]))
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    archived = ArchiveManager(init_database()).archive()
+    for table_name, rows in archived.items():
+        print(f"{table_name}: archived {rows} rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""
+Benchmark of the old single-column price_data indexes against the query-matched ones
+Run directly: python -m arbitrage_app.database.bench_indexes [rows]
+
+Fills two scratch tables on the configured DATABASE_URL, one per index layout,
+prints insert throughput, query plans and query times, and drops the tables.
+"""
+
+import sys
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import MetaData, Table, Column, Integer, String, Float, DateTime, Index, select, func, text
+from arbitrage_app.database.models import get_db_manager, init_database
+from arbitrage_app.database.bulk_ingest import ingest_rows
+from arbitrage_app.sample_trading import TRADING_PAIRS, EXCHANGES
+
+CHUNK_ROWS = 100_000
+
+def price_table(metadata, name):
+    """Scratch copy of the price_data columns"""
+    return Table(
+        name, metadata,
+        Column("id", Integer, primary_key=True),
+        Column("symbol", String(20), nullable=False),
+        Column("exchange", String(20), nullable=False),
+        Column("price", Float, nullable=False),
+        Column("timestamp", DateTime),
+        Column("created_at", DateTime)
+    )
+
+def build_tables(metadata):
+    """Tables with the previous index layout and with the current one"""
+    before = price_table(metadata, "bench_price_data_before")
+    for column in ("id", "symbol", "exchange", "timestamp"):
+        Index(f"ix_bench_before_{column}", before.c[column])
+
+    after = price_table(metadata, "bench_price_data_after")
+    Index("ix_bench_after_symbol_exchange_timestamp", after.c.symbol, after.c.exchange, after.c.timestamp.desc())
+    if get_db_manager().engine.dialect.name == "postgresql":
+        Index("ix_bench_after_timestamp_brin", after.c.timestamp, postgresql_using="brin")
+    return before, after
+
+def row_chunks(count, start):
+    """Append-only price rows, every pair quoted on every exchange each second"""
+    chunk = []
+    for index in range(count):
+        tick, venue = divmod(index, len(TRADING_PAIRS) * len(EXCHANGES))
+        symbol_index, exchange_index = divmod(venue, len(EXCHANGES))
+        chunk.append({
+            "symbol": TRADING_PAIRS[symbol_index],
+            "exchange": EXCHANGES[exchange_index],
+            "price": 100.0 + (index % 1000),
+            "timestamp": start + timedelta(seconds=tick)
+        })
+        if len(chunk) == CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def explain(connection, query):
+    """The database's plan for a query"""
+    compiled = query.compile(dialect=connection.dialect, compile_kwargs={"literal_binds": True})
+    if connection.dialect.name == "postgresql":
+        rows = connection.execute(text(f"EXPLAIN (ANALYZE, BUFFERS) {compiled}"))
+        return "\n".join(f"    {row[0]}" for row in rows)
+    rows = connection.execute(text(f"EXPLAIN QUERY PLAN {compiled}"))
+    return "\n".join(f"    {row[-1]}" for row in rows)
+
+def best_time(connection, query, repeat=5):
+    """Fastest of several runs of a query, in milliseconds"""
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        connection.execute(query).fetchall()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings) * 1000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    engine = init_database().engine
+    metadata = MetaData()
+    tables = build_tables(metadata)
+    start = datetime(2024, 1, 1)
+    last_tick = start + timedelta(seconds=count // (len(TRADING_PAIRS) * len(EXCHANGES)))
+
+    metadata.drop_all(engine)
+    metadata.create_all(engine)
+    try:
+        for table in tables:
+            start_time = time.perf_counter()
+            for chunk in row_chunks(count, start):
+                ingest_rows(engine, table, chunk)
+            elapsed = time.perf_counter() - start_time
+            print(f"{table.name}: inserted {count:,} rows in {elapsed:.1f}s ({count / elapsed:,.0f} rows/s)")
+
+        with engine.connect() as connection:
+            connection.execute(text("ANALYZE"))
+            for table in tables:
+                history = select(table).where(
+                    table.c.symbol == TRADING_PAIRS[0], table.c.exchange == EXCHANGES[0]
+                ).order_by(table.c.timestamp.desc()).limit(100)
+                last_hour = select(func.count()).select_from(table).where(
+                    table.c.timestamp >= last_tick - timedelta(hours=1)
+                )
+
+                print(f"\n{table.name}")
+                for name, query in (("price history", history), ("last hour", last_hour)):
+                    print(f"  {name}: {best_time(connection, query):.2f} ms")
+                    print(explain(connection, query))
+    finally:
+        metadata.drop_all(engine)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark of price_data ingestion methods against the configured DATABASE_URL
+Run directly: python -m arbitrage_app.database.bench_ingest [rows]
+
+Writes rows for the symbol BENCH and deletes them afterwards.
+"""
+
+import sys
+import time
+from datetime import datetime
+from sqlalchemy import delete
+from arbitrage_app.database.models import get_db_manager, init_database, PriceDataTable
+from arbitrage_app.database.bulk_ingest import ingest_rows, supports_copy
+
+BENCH_SYMBOL = "BENCH"
+
+def bench_rows(count):
+    """Price rows for the benchmark symbol"""
+    timestamp = datetime.utcnow()
+    return [
+        {"symbol": BENCH_SYMBOL, "exchange": "nobitex" if index % 2 else "wallex", "price": 60000.0 + index, "timestamp": timestamp}
+        for index in range(count)
+    ]
+
+def per_row_commit(rows):
+    """The original path: one session and one commit per row"""
+    for row in rows:
+        get_db_manager().store_price_data(row["symbol"], row["exchange"], row["price"], row["timestamp"])
+
+def timed(function, rows):
+    """Rows written per second"""
+    start_time = time.perf_counter()
+    function(rows)
+    return len(rows) / (time.perf_counter() - start_time)
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    table = PriceDataTable.__table__
+    db_manager = init_database()
+
+    methods = [
+        ("per-row commit", lambda rows: per_row_commit(rows), min(count, 2_000)),
+        ("executemany INSERT", lambda rows: ingest_rows(db_manager.engine, table, rows, method="insert"), count),
+    ]
+    if supports_copy(db_manager.engine):
+        methods.append(("COPY FROM STDIN", lambda rows: ingest_rows(db_manager.engine, table, rows, method="copy"), count))
+    else:
+        print(f"COPY skipped: {db_manager.engine.dialect.name}+{db_manager.engine.dialect.driver} is not PostgreSQL with psycopg2")
+
+    print(f"{'method':<20} {'rows':>8} {'rows/s':>12}")
+    try:
+        for name, function, rows in methods:
+            print(f"{name:<20} {rows:>8} {timed(function, bench_rows(rows)):>12,.0f}")
+    finally:
+        with db_manager.engine.begin() as connection:
+            connection.execute(delete(table).where(table.c.symbol == BENCH_SYMBOL))
+
+if __name__ == "__main__":
+    main()
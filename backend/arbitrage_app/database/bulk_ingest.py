@@ -0,0 +1,148 @@
+"""
+Bulk ingestion of price rows into the price tables
+PostgreSQL (psycopg2) streams rows with COPY FROM STDIN; other databases get one batched INSERT
+"""
+
+import csv
+import io
+import logging
+from datetime import datetime
+from typing import Iterable, List, Sequence
+from sqlalchemy import insert, Table
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from arbitrage_app.sample_trading import PRICE_INGEST_METHOD, PRICE_COPY_CHUNK_ROWS
+
+logger = logging.getLogger(__name__)
+
+INGEST_METHODS = ("auto", "copy", "insert")
+
+def supports_copy(engine: Engine) -> bool:
+    """Whether the engine talks to PostgreSQL through psycopg2, which provides copy_expert"""
+    return engine.dialect.name == "postgresql" and engine.dialect.driver == "psycopg2"
+
+def resolve_ingest_method(engine: Engine, method: str = PRICE_INGEST_METHOD) -> str:
+    """
+    Pick the ingestion method to use on an engine
+
+    Args:
+        engine: SQLAlchemy engine rows are written through
+        method: 'auto', 'copy' or 'insert'; 'auto' and 'copy' use COPY where the engine supports it
+
+    Returns:
+        'copy' or 'insert'
+    """
+    if method not in INGEST_METHODS:
+        raise ValueError(f"Unknown ingest method: {method}. Use one of {', '.join(INGEST_METHODS)}")
+    if method == "insert" or not supports_copy(engine):
+        return "insert"
+    return "copy"
+
+def copy_columns(table: Table) -> List[str]:
+    """Columns COPY fills: every column except an autoincrementing id"""
+    return [column.name for column in table.columns if column is not table.autoincrement_column]
+
+def _csv_value(value) -> str:
+    """Text COPY parses back into the column's value; an empty field is NULL"""
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def rows_to_csv(rows: Iterable[dict], table: Table, columns: Sequence[str], now: datetime) -> io.StringIO:
+    """Serialize rows as CSV in `columns` order, ready for COPY"""
+    # COPY bypasses the datetime.utcnow defaults SQLAlchemy applies, so they are sent explicitly
+    defaults = {name: now for name in columns if table.columns[name].default is not None}
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow([_csv_value(row.get(name, defaults.get(name))) for name in columns])
+    buffer.seek(0)
+    return buffer
+
+def copy_rows(connection: Connection, table: Table, rows: List[dict], chunk_rows: int = PRICE_COPY_CHUNK_ROWS) -> int:
+    """
+    Stream rows into a table with COPY FROM STDIN
+
+    Rows are sent in chunks of `chunk_rows` so a large backlog is never
+    serialized into memory at once. Runs inside the caller's transaction.
+
+    Args:
+        connection: SQLAlchemy connection to a psycopg2 PostgreSQL database
+        table: Table to fill (e.g., PriceDataTable.__table__)
+        rows: Dictionaries keyed by column name; missing columns are NULL or their default
+        chunk_rows: Rows per COPY statement
+
+    Returns:
+        Number of rows copied
+    """
+    now = datetime.utcnow()
+    columns = copy_columns(table)
+    statement = f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)"
+    dbapi_error = connection.dialect.dbapi.Error
+    cursor = connection.connection.cursor()
+    try:
+        for start in range(0, len(rows), chunk_rows):
+            cursor.copy_expert(statement, rows_to_csv(rows[start:start + chunk_rows], table, columns, now))
+    except dbapi_error as e:
+        # Raised by psycopg2 directly, so wrap it like SQLAlchemy wraps its own statements
+        raise DBAPIError.instance(statement, None, e, dbapi_error) from e
+    finally:
+        cursor.close()
+    return len(rows)
+
+def insert_rows(connection: Connection, table: Table, rows: List[dict]) -> int:
+    """
+    Insert rows into a table with one executemany INSERT
+
+    Args:
+        connection: SQLAlchemy connection to any supported database
+        table: Table to fill (e.g., PriceDataTable.__table__)
+        rows: Dictionaries keyed by column name, all with the same keys
+
+    Returns:
+        Number of rows inserted
+    """
+    connection.execute(insert(table), rows)
+    return len(rows)
+
+def ingest_rows(engine: Engine, table: Table, rows: List[dict], method: str = PRICE_INGEST_METHOD) -> int:
+    """
+    Write rows in one transaction with the fastest method the database supports
+
+    Args:
+        engine: SQLAlchemy engine to write through
+        table: Table to fill (PriceDataTable.__table__ or PriceSnapshotTable.__table__)
+        rows: Dictionaries keyed by column name, all with the same keys
+        method: 'auto', 'copy' or 'insert' (see resolve_ingest_method)
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+
+    with engine.begin() as connection:
+        return write_rows(connection, table, rows, method)
+
+def write_rows(connection: Connection, table: Table, rows: List[dict], method: str = PRICE_INGEST_METHOD) -> int:
+    """
+    Write rows inside the caller's transaction with the fastest method the database supports
+
+    Args:
+        connection: SQLAlchemy connection with an open transaction
+        table: Table to fill (PriceDataTable.__table__ or PriceSnapshotTable.__table__)
+        rows: Dictionaries keyed by column name, all with the same keys
+        method: 'auto', 'copy' or 'insert' (see resolve_ingest_method)
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+    if resolve_ingest_method(connection.engine, method) == "copy":
+        return copy_rows(connection, table, rows)
+    return insert_rows(connection, table, rows)
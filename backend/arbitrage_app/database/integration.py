@@ -3,18 +3,24 @@ Database integration service for storing arbitrage data
 """
 
 import logging
-from typing import List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 from datetime import datetime
-from arbitrage_app.database.models import db_manager, ArbitrageOpportunityTable, PriceDataTable
+from arbitrage_app.database.models import get_db_manager, DatabaseManager, ArbitrageOpportunityTable, PriceDataTable
 from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageOpportunity
+from arbitrage_app.sample_trading import PRICE_STORAGE
 
 logger = logging.getLogger(__name__)
 
+PRICE_STORAGES = ("rows", "snapshots", "both")
+
 class DatabaseIntegrationService:
     """Service for integrating database storage with arbitrage detection"""
     
-    def __init__(self):
-        self.db_manager = db_manager
+    def __init__(self, price_storage: str = PRICE_STORAGE, db_manager: Optional[DatabaseManager] = None):
+        if price_storage not in PRICE_STORAGES:
+            raise ValueError(f"Unknown price storage: {price_storage}. Use one of {', '.join(PRICE_STORAGES)}")
+        self.db_manager = db_manager or get_db_manager()
+        self.price_storage = price_storage
     
     def store_arbitrage_opportunity(self, opportunity: ArbitrageOpportunity) -> bool:
         """Store an arbitrage opportunity in the database"""
@@ -23,6 +29,8 @@ class DatabaseIntegrationService:
                 'symbol': opportunity.symbol,
                 'nobitex_price': opportunity.nobitex_price,
                 'wallex_price': opportunity.wallex_price,
+                'buy_price': opportunity.buy_price,
+                'sell_price': opportunity.sell_price,
                 'profit_percentage': opportunity.profit_percentage,
                 'profit_amount': opportunity.profit_amount,
                 'buy_exchange': opportunity.buy_exchange,
@@ -30,7 +38,8 @@ class DatabaseIntegrationService:
                 'timestamp': opportunity.timestamp
             }
             
-            success = self.db_manager.store_arbitrage_opportunity(opportunity_data)
+            # The row and its rollup counts are stored together or not at all
+            success = self.db_manager.store_opportunity_batch([opportunity_data])
             if success:
                 logger.info(f"💾 Stored arbitrage opportunity for {opportunity.symbol} in database")
             return success
@@ -41,18 +50,26 @@ class DatabaseIntegrationService:
     
     def store_price_data(self, symbol: str, nobitex_price: Optional[float], wallex_price: Optional[float], timestamp: datetime) -> bool:
         """Store price data from both exchanges"""
-        success = True
-        
-        if nobitex_price is not None:
-            if not self.db_manager.store_price_data(symbol, 'nobitex', nobitex_price, timestamp):
-                success = False
-        
-        if wallex_price is not None:
-            if not self.db_manager.store_price_data(symbol, 'wallex', wallex_price, timestamp):
-                success = False
-        logger.info(f"💾 Stored price data for {symbol} in database")
+        return self.store_exchange_prices(symbol, {'nobitex': nobitex_price, 'wallex': wallex_price}, timestamp)
+    
+    def store_exchange_prices(self, symbol: str, prices: Dict[str, Optional[float]], timestamp: datetime) -> bool:
+        """Store price data from any number of exchanges"""
+        return self.store_price_batch([(symbol, prices, timestamp)])
+    
+    def store_price_batch(self, price_batch: List[Tuple[str, Dict[str, Optional[float]], datetime]]) -> bool:
+        """Store the prices of many symbols, e.g. a whole scan, with their rollups in one transaction"""
+        success = self.db_manager.store_price_batch(
+            price_batch,
+            store_rows=self.price_storage in ("rows", "both"),
+            store_snapshots=self.price_storage in ("snapshots", "both")
+        )
+        if success:
+            logger.info(f"💾 Stored prices for {len(price_batch)} symbols in database")
         return success
     
+    def close(self):
+        """Nothing to flush, every write is stored before it returns"""
+    
     def get_recent_opportunities(self, limit: int = 100) -> List[ArbitrageOpportunityTable]:
         """Get recent arbitrage opportunities from database"""
         return self.db_manager.get_recent_opportunities(limit)
@@ -64,4 +81,52 @@ class DatabaseIntegrationService:
     def get_price_history(self, symbol: str, exchange: str, limit: int = 100) -> List[PriceDataTable]:
         """Get price history for a symbol and exchange"""
         return self.db_manager.get_price_history(symbol, exchange, limit)
+    
+    def stream_price_history(self, symbol: str, exchange: str, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None, descending: bool = False) -> Iterator[tuple]:
+        """Stream (id, timestamp, price) rows of a symbol on an exchange in constant memory, oldest first"""
+        return self.db_manager.stream_price_history(symbol, exchange, start, end, descending=descending)
+    
+    def stream_opportunities(self, symbol: Optional[str] = None, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None, descending: bool = False) -> Iterator[tuple]:
+        """Stream arbitrage opportunity rows in constant memory, oldest first"""
+        return self.db_manager.stream_opportunities(symbol, start, end, descending=descending)
+    
+    def price_history_batches(self, symbol: str, exchange: str, start: Optional[datetime] = None,
+                              end: Optional[datetime] = None) -> Iterator[Dict[str, list]]:
+        """Stream the price history of a symbol on an exchange as column batches"""
+        return self.db_manager.price_history_batches(symbol, exchange, start, end)
+    
+    def opportunity_batches(self, symbol: Optional[str] = None, start: Optional[datetime] = None,
+                            end: Optional[datetime] = None) -> Iterator[Dict[str, list]]:
+        """Stream arbitrage opportunities as column batches"""
+        return self.db_manager.opportunity_batches(symbol, start, end)
+    
+    def scan_history(self, table_name: str, start: datetime, end: datetime, symbol: Optional[str] = None) -> Iterator[Dict[str, list]]:
+        """Read a time range of price_data or arbitrage_opportunities from the Parquet archive and the database as one history"""
+        # pyarrow is only loaded when history is read, not at startup
+        from arbitrage_app.database.archive import ArchiveManager
+        return ArchiveManager(self.db_manager).scan(table_name, start, end, symbol)
+    
+    def get_snapshot_history(self, symbol: str, limit: int = 100) -> List[dict]:
+        """Get price snapshots of a symbol with every exchange's price, newest first"""
+        return self.db_manager.get_snapshot_history(symbol, limit)
+    
+    def get_latest_snapshots(self) -> Dict[str, dict]:
+        """Get the latest price snapshot of every symbol"""
+        return self.db_manager.get_latest_snapshots()
+    
+    def get_spread_history(self, symbol: str, buy_exchange: str, sell_exchange: str, limit: int = 100) -> List[Tuple[datetime, float]]:
+        """Get the spread between two exchanges for a symbol, newest first"""
+        return self.db_manager.get_spread_history(symbol, buy_exchange, sell_exchange, limit)
+    
+    def get_rollups(self, symbol: str, exchange: str, resolution: str = "1h", start: Optional[datetime] = None,
+                    end: Optional[datetime] = None, limit: int = 1000) -> List[dict]:
+        """Get OHLC, spread and opportunity-count buckets of a symbol on an exchange, newest first"""
+        return self.db_manager.get_rollups(symbol, exchange, resolution, start, end, limit)
+    
+    def get_opportunity_counts(self, symbol: str, resolution: str = "1h", start: Optional[datetime] = None,
+                               end: Optional[datetime] = None) -> List[Tuple[datetime, int]]:
+        """Get the number of arbitrage opportunities on a symbol per bucket, newest first"""
+        return self.db_manager.get_opportunity_counts(symbol, resolution, start, end)
  
\ No newline at end of file
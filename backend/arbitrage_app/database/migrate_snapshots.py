@@ -0,0 +1,24 @@
+"""
+Migration of price_data rows into the compact price_snapshots table
+Run directly: python -m arbitrage_app.database.migrate_snapshots [--delete-source]
+
+Safe to re-run: snapshots that already exist are skipped. Switch PRICE_STORAGE
+to "both" first so nothing is missed, then to "snapshots" once migrated.
+"""
+
+import sys
+import logging
+from arbitrage_app.database.models import init_database
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def main():
+    delete_source = "--delete-source" in sys.argv[1:]
+    migrated = init_database().migrate_price_data_to_snapshots(delete_source=delete_source)
+    print(f"Created {migrated} snapshots" + (" and deleted the migrated price_data rows" if delete_source else ""))
+
+if __name__ == "__main__":
+    main()
@@ -4,68 +4,274 @@ Database models and connection for Arbitrage Detection Service
 
 import os
 import logging
+import threading
 from datetime import datetime
-from typing import List
-from sqlalchemy import create_engine, Column, Integer, String, Float, DateTime, Boolean, Text
+from functools import cached_property
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import (
+    create_engine, inspect, text, select, insert, case, func, exists, and_,
+    Column, Integer, SmallInteger, String, Float, DateTime, Boolean, Text, ForeignKey, Index
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.engine import Row
 from sqlalchemy.exc import SQLAlchemyError
 from dotenv import load_dotenv
+from arbitrage_app.database.bulk_ingest import ingest_rows, write_rows
+from arbitrage_app.database.partitioning import PartitionManager
+from arbitrage_app.database.streaming import stream_rows, column_batches
+from arbitrage_app.database.rollups import aggregate_prices, aggregate_opportunities, supports_upsert, upsert_rollups
+from arbitrage_app.sample_trading import EXCHANGES, ROLLUPS_ENABLED, STREAM_PAGE_SIZE
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
-# Database configuration
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL, echo=False, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
+# Shared engine and manager, created on first use rather than at import
+_engine = None
+_db_manager = None
+_init_lock = threading.Lock()
+
+def get_engine():
+    """
+    Get the SQLAlchemy engine for DATABASE_URL, creating it on first use
+    
+    Creating the engine opens no connection; the first query does.
+    
+    Raises:
+        RuntimeError: If DATABASE_URL is not set
+    """
+    global _engine
+    with _init_lock:
+        if _engine is None:
+            database_url = os.getenv("DATABASE_URL")
+            if not database_url:
+                raise RuntimeError("DATABASE_URL is not set")
+            _engine = create_engine(database_url, echo=False, pool_pre_ping=True)
+        return _engine
+
+def get_db_manager() -> "DatabaseManager":
+    """Get the shared database manager; its tables are only set up by init_database"""
+    global _db_manager
+    with _init_lock:
+        if _db_manager is None:
+            _db_manager = DatabaseManager()
+        return _db_manager
+
+def init_database() -> "DatabaseManager":
+    """
+    Connect to the database and create or upgrade its schema
+    
+    Call once at startup, before the first write. Safe to call again.
+    
+    Returns:
+        The shared database manager
+    """
+    manager = get_db_manager()
+    manager.create_schema()
+    return manager
+
+def brin_index(name: str, column: str) -> Index:
+    """
+    BRIN index for append-only time columns, created on PostgreSQL only
+    
+    BRIN keeps one summary per block range, so it stays tiny and nearly free
+    to maintain while still narrowing time-range scans on tables written in
+    time order. Other databases have no BRIN and get no index at all.
+    """
+    return Index(name, column, postgresql_using="brin", info={"dialect": "postgresql"}).ddl_if(dialect="postgresql")
+
 class ArbitrageOpportunityTable(Base):
     """Database model for storing arbitrage opportunities"""
     __tablename__ = "arbitrage_opportunities"
     
-    id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String(20), nullable=False, index=True)
-    nobitex_price = Column(Float, nullable=False)
-    wallex_price = Column(Float, nullable=False)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(20), nullable=False)
+    # Prices on Nobitex and Wallex when quoted; buy_price and sell_price cover any exchange
+    nobitex_price = Column(Float, nullable=True)
+    wallex_price = Column(Float, nullable=True)
+    buy_price = Column(Float, nullable=True)
+    sell_price = Column(Float, nullable=True)
     profit_percentage = Column(Float, nullable=False)
     profit_amount = Column(Float, nullable=False)
     buy_exchange = Column(String(20), nullable=False)
     sell_exchange = Column(String(20), nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # get_recent_opportunities reads the newest rows of the whole table; also the partition key on PostgreSQL
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # get_opportunities_by_symbol: filter on symbol, newest first
+        Index("ix_arbitrage_opportunities_symbol_timestamp", symbol, timestamp.desc()),
+    )
 
 class PriceDataTable(Base):
     """Database model for storing price data from exchanges"""
     __tablename__ = "price_data"
     
-    id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String(20), nullable=False, index=True)
-    exchange = Column(String(20), nullable=False, index=True)
+    id = Column(Integer, primary_key=True)
+    symbol = Column(String(20), nullable=False)
+    exchange = Column(String(20), nullable=False)
     price = Column(Float, nullable=False)
-    timestamp = Column(DateTime, default=datetime.utcnow, index=True)
+    # Partition key on PostgreSQL
+    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
+    
+    __table_args__ = (
+        # get_price_history: filter on symbol and exchange, newest first, read straight off the index
+        Index("ix_price_data_symbol_exchange_timestamp", symbol, exchange, timestamp.desc()),
+        brin_index("ix_price_data_timestamp_brin", "timestamp"),
+    )
+
+class SymbolTable(Base):
+    """Dictionary encoding trading pair symbols as small integers"""
+    __tablename__ = "symbols"
+    
+    # SQLite only autoincrements INTEGER primary keys
+    id = Column(SmallInteger().with_variant(Integer, "sqlite"), primary_key=True)
+    name = Column(String(20), nullable=False, unique=True)
+
+class PriceSnapshotTable(Base):
+    """
+    Compact price storage: one row per symbol and instant with a price column per exchange
+    
+    Columns are named <exchange>_price for every exchange in EXCHANGES; an
+    exchange added later gets its column from _upgrade_tables.
+    """
+    __tablename__ = "price_snapshots"
+    
+    # The primary key index serves per-symbol history, BRIN serves time ranges across symbols
+    symbol_id = Column(SmallInteger().with_variant(Integer, "sqlite"), ForeignKey("symbols.id"), primary_key=True, autoincrement=False)
+    ts = Column(DateTime, primary_key=True)
+    
+    __table_args__ = (
+        brin_index("ix_price_snapshots_ts_brin", "ts"),
+    )
+
+for _exchange in EXCHANGES:
+    setattr(PriceSnapshotTable, f"{_exchange}_price", Column(Float, nullable=True))
+
+class PriceRollupTable(Base):
+    """
+    Per-bucket aggregates of a symbol's price on one exchange, at each resolution in ROLLUP_RESOLUTIONS
+    
+    Spreads are against the cheapest other exchange quoted at the same time
+    (see rollups.exchange_spreads); their mean is spread_sum / spread_count.
+    Opportunities are counted on the row of their buy and of their sell exchange.
+    """
+    __tablename__ = "price_rollups"
+    
+    # The primary key index serves per-symbol, per-exchange reads of a resolution over a time range
+    resolution = Column(String(4), primary_key=True)
+    symbol = Column(String(20), primary_key=True)
+    exchange = Column(String(20), primary_key=True)
+    bucket = Column(DateTime, primary_key=True)
+    open = Column(Float, nullable=True)
+    high = Column(Float, nullable=True)
+    low = Column(Float, nullable=True)
+    close = Column(Float, nullable=True)
+    # Times of the open and close prices, so batches arriving out of order merge correctly
+    open_ts = Column(DateTime, nullable=True)
+    close_ts = Column(DateTime, nullable=True)
+    sample_count = Column(Integer, nullable=False, default=0)
+    spread_min = Column(Float, nullable=True)
+    spread_max = Column(Float, nullable=True)
+    spread_sum = Column(Float, nullable=False, default=0.0)
+    spread_count = Column(Integer, nullable=False, default=0)
+    buy_opportunities = Column(Integer, nullable=False, default=0)
+    sell_opportunities = Column(Integer, nullable=False, default=0)
+
+def snapshot_price_column(exchange: str) -> str:
+    """Name of an exchange's price column in price_snapshots"""
+    return f"{exchange}_price"
 
 class DatabaseManager:
     """Database manager for arbitrage service"""
     
-    def __init__(self):
-        self.engine = engine
-        self.SessionLocal = SessionLocal
-        self._create_tables()
+    def __init__(self, database_engine=None):
+        # Without an engine (e.g., a throwaway SQLite database) the shared one is created on first use
+        self._database_engine = database_engine
+        # Symbol dictionary cache, name -> id; ids never change once assigned
+        self._symbol_ids: Dict[str, int] = {}
+        self.rollups_enabled = ROLLUPS_ENABLED
+    
+    @cached_property
+    def engine(self):
+        return self._database_engine or get_engine()
     
-    def _create_tables(self):
-        """Create database tables if they don't exist"""
+    @cached_property
+    def SessionLocal(self):
+        return sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+    
+    @cached_property
+    def partition_manager(self) -> PartitionManager:
+        return PartitionManager(self.engine)
+    
+    def create_schema(self):
+        """Create missing tables and bring existing ones up to the current models"""
         try:
             Base.metadata.create_all(bind=self.engine)
+            self._upgrade_tables()
+            self.partition_manager.setup()
+            self.sync_indexes()
             logger.info("Database tables created successfully")
         except SQLAlchemyError as e:
             logger.error(f"Error creating database tables: {e}")
             raise
     
+    def _upgrade_tables(self):
+        """Bring tables created by older versions up to the current models"""
+        inspector = inspect(self.engine)
+        for table in Base.metadata.sorted_tables:
+            existing_columns = {column["name"]: column for column in inspector.get_columns(table.name)}
+            with self.engine.begin() as connection:
+                for column in table.columns:
+                    if column.name not in existing_columns:
+                        # New columns are always nullable, so existing rows stay valid
+                        column_type = column.type.compile(dialect=self.engine.dialect)
+                        connection.execute(text(f'ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}'))
+                        logger.info(f"Added column {table.name}.{column.name}")
+                    elif column.nullable and not existing_columns[column.name]["nullable"] and self.engine.dialect.name == "postgresql":
+                        connection.execute(text(f'ALTER TABLE {table.name} ALTER COLUMN {column.name} DROP NOT NULL'))
+                        logger.info(f"Made column {table.name}.{column.name} nullable")
+    
+    def sync_indexes(self) -> Tuple[List[str], List[str]]:
+        """
+        Create the indexes the models declare and drop generated ones they no longer declare
+        
+        create_all only creates indexes together with their table, so tables
+        from older versions are brought in line here. Only indexes named like
+        SQLAlchemy's generated ones (ix_<table>_...) are ever dropped.
+        
+        Returns:
+            Tuple of (created index names, dropped index names)
+        """
+        dialect = self.engine.dialect.name
+        inspector = inspect(self.engine)
+        created, dropped = [], []
+        
+        with self.engine.begin() as connection:
+            for table in Base.metadata.sorted_tables:
+                existing = {index["name"] for index in inspector.get_indexes(table.name)}
+                declared = {
+                    index.name: index for index in table.indexes
+                    if index.info.get("dialect", dialect) == dialect
+                }
+                
+                for name, index in declared.items():
+                    if name not in existing:
+                        index.create(connection)
+                        created.append(name)
+                for name in sorted(existing - declared.keys()):
+                    if name.startswith(f"ix_{table.name}_"):
+                        connection.execute(text(f'DROP INDEX {name}'))
+                        dropped.append(name)
+        
+        if created or dropped:
+            logger.info(f"Indexes synced: created {', '.join(created) or 'none'}, dropped {', '.join(dropped) or 'none'}")
+        return created, dropped
+    
     def get_session(self) -> Session:
         """Get a database session"""
         return self.SessionLocal()
@@ -82,6 +288,33 @@ class DatabaseManager:
             logger.error(f"Error storing arbitrage opportunity: {e}")
             return False
     
+    def store_opportunity_batch(self, opportunities: List[dict]) -> bool:
+        """
+        Store arbitrage opportunities and count them in the rollups in one transaction
+        
+        Like store_price_batch, either the rows and their rollup counts are
+        stored or neither is, so a rejected write can be retried without
+        leaving the opportunity counts short or counting them twice.
+        
+        Args:
+            opportunities: Column dictionaries of ArbitrageOpportunityTable rows
+        
+        Returns:
+            True if every opportunity was stored, False otherwise
+        """
+        if not opportunities:
+            return True
+        try:
+            rollup_rows = aggregate_opportunities(opportunities) if self.rollups_enabled else []
+            with self.engine.begin() as connection:
+                connection.execute(insert(ArbitrageOpportunityTable.__table__), opportunities)
+                if rollup_rows and self._rollups_supported(connection):
+                    upsert_rollups(connection, PriceRollupTable.__table__, rollup_rows)
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error storing {len(opportunities)} arbitrage opportunities: {e}")
+            return False
+    
     def store_price_data(self, symbol: str, exchange: str, price: float, timestamp: datetime) -> bool:
         """Store price data in the database"""
         try:
@@ -99,6 +332,381 @@ class DatabaseManager:
             logger.error(f"Error storing price data: {e}")
             return False
     
+    def store_price_data_batch(self, price_rows: List[dict]) -> bool:
+        """
+        Store many price rows in one transaction
+        
+        PostgreSQL streams the rows with COPY, other databases get one
+        executemany INSERT (see PRICE_INGEST_METHOD).
+        
+        Args:
+            price_rows: Dictionaries with symbol, exchange, price and timestamp keys
+        
+        Returns:
+            True if every row was stored, False otherwise
+        """
+        try:
+            ingest_rows(self.engine, PriceDataTable.__table__, price_rows)
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error storing {len(price_rows)} price rows: {e}")
+            return False
+    
+    def get_symbol_ids(self, symbols: Iterable[str]) -> Dict[str, int]:
+        """
+        Get the dictionary ids of symbols, assigning ids to new ones
+        
+        Args:
+            symbols: Trading pair symbols
+        
+        Returns:
+            Dictionary mapping symbol to id
+        """
+        symbols = set(symbols)
+        missing = symbols - self._symbol_ids.keys()
+        if missing:
+            symbol_table = SymbolTable.__table__
+            with self.engine.begin() as connection:
+                known = {name for (name,) in connection.execute(select(symbol_table.c.name).where(symbol_table.c.name.in_(missing)))}
+                if missing - known:
+                    connection.execute(insert(symbol_table), [{"name": name} for name in sorted(missing - known)])
+                rows = connection.execute(select(symbol_table.c.name, symbol_table.c.id).where(symbol_table.c.name.in_(missing)))
+                self._symbol_ids.update({name: symbol_id for name, symbol_id in rows})
+        return {symbol: self._symbol_ids[symbol] for symbol in symbols}
+    
+    def store_price_snapshots(self, price_batch: List[Tuple[str, Dict[str, Optional[float]], datetime]]) -> bool:
+        """
+        Store one snapshot row per symbol in one transaction
+        
+        Args:
+            price_batch: (symbol, prices by exchange, timestamp) tuples
+        
+        Returns:
+            True if every snapshot was stored, False otherwise
+        """
+        if not price_batch:
+            return True
+        try:
+            ingest_rows(self.engine, PriceSnapshotTable.__table__, self._snapshot_rows(price_batch))
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error storing {len(price_batch)} price snapshots: {e}")
+            return False
+    
+    def _snapshot_rows(self, price_batch: List[Tuple[str, Dict[str, Optional[float]], datetime]]) -> List[dict]:
+        """Turn (symbol, prices by exchange, timestamp) tuples into price_snapshots rows"""
+        symbol_ids = self.get_symbol_ids(symbol for symbol, prices, timestamp in price_batch)
+        unknown = {exchange for symbol, prices, timestamp in price_batch for exchange in prices} - set(EXCHANGES)
+        if unknown:
+            logger.warning(f"No snapshot column for exchanges {', '.join(sorted(unknown))}; their prices are not stored")
+        
+        return [
+            {
+                "symbol_id": symbol_ids[symbol],
+                "ts": timestamp,
+                **{snapshot_price_column(exchange): prices.get(exchange) for exchange in EXCHANGES}
+            }
+            for symbol, prices, timestamp in price_batch
+        ]
+    
+    def store_price_batch(self, price_batch: List[Tuple[str, Dict[str, Optional[float]], datetime]],
+                          store_rows: bool = True, store_snapshots: bool = False) -> bool:
+        """
+        Store a batch of prices and fold it into the rollups in one transaction
+        
+        Either all of the batch's price rows, snapshots and rollup updates are
+        stored or none are, so a rejected batch can be written again without
+        duplicating rows or counting it twice in the rollups.
+        
+        Args:
+            price_batch: (symbol, prices by exchange, timestamp) tuples
+            store_rows: Store one price_data row per exchange price
+            store_snapshots: Store one price_snapshots row per symbol
+        
+        Returns:
+            True if the whole batch was stored, False otherwise
+        """
+        if not price_batch:
+            return True
+        price_rows = [
+            {'symbol': symbol, 'exchange': exchange, 'price': price, 'timestamp': timestamp}
+            for symbol, prices, timestamp in price_batch
+            for exchange, price in prices.items()
+            if price is not None
+        ] if store_rows else []
+        try:
+            # Symbol ids are assigned in their own transaction; an unused id is harmless
+            snapshot_rows = self._snapshot_rows(price_batch) if store_snapshots else []
+            rollup_rows = aggregate_prices(price_batch) if self.rollups_enabled else []
+            with self.engine.begin() as connection:
+                write_rows(connection, PriceDataTable.__table__, price_rows)
+                write_rows(connection, PriceSnapshotTable.__table__, snapshot_rows)
+                if rollup_rows and self._rollups_supported(connection):
+                    upsert_rollups(connection, PriceRollupTable.__table__, rollup_rows)
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error storing prices for {len(price_batch)} symbols: {e}")
+            return False
+    
+    def migrate_price_data_to_snapshots(self, delete_source: bool = False) -> int:
+        """
+        Copy price_data rows into price_snapshots, one snapshot per symbol and timestamp
+        
+        Rows written together share a timestamp, so they pivot into one
+        snapshot. Snapshots that already exist are skipped, so the migration
+        can be re-run while the service keeps writing price_data.
+        
+        Args:
+            delete_source: Delete the migrated price_data rows afterwards
+        
+        Returns:
+            Number of snapshots created
+        """
+        price_table = PriceDataTable.__table__
+        snapshot_table = PriceSnapshotTable.__table__
+        symbol_table = SymbolTable.__table__
+        
+        with self.engine.connect() as connection:
+            # Rows written after this point are left for the next run
+            last_id = connection.execute(select(func.max(price_table.c.id))).scalar()
+            symbols = [name for (name,) in connection.execute(select(price_table.c.symbol).distinct())]
+        if last_id is None:
+            return 0
+        symbol_ids = self.get_symbol_ids(symbols)
+        
+        pivot = select(
+            symbol_table.c.id,
+            price_table.c.timestamp,
+            *[
+                func.max(case((price_table.c.exchange == exchange, price_table.c.price)))
+                for exchange in EXCHANGES
+            ]
+        ).join(
+            symbol_table, symbol_table.c.name == price_table.c.symbol
+        ).where(
+            price_table.c.id <= last_id,
+            price_table.c.timestamp.isnot(None),
+            ~exists().where(and_(
+                snapshot_table.c.symbol_id == symbol_table.c.id,
+                snapshot_table.c.ts == price_table.c.timestamp
+            ))
+        ).group_by(symbol_table.c.id, price_table.c.timestamp)
+        
+        columns = ["symbol_id", "ts"] + [snapshot_price_column(exchange) for exchange in EXCHANGES]
+        with self.engine.begin() as connection:
+            migrated = connection.execute(insert(snapshot_table).from_select(columns, pivot)).rowcount
+            if delete_source:
+                connection.execute(price_table.delete().where(price_table.c.id <= last_id, price_table.c.exchange.in_(EXCHANGES)))
+        
+        logger.info(f"Migrated price_data for {len(symbol_ids)} symbols into {migrated} snapshots")
+        return migrated
+    
+    def get_snapshot_history(self, symbol: str, limit: int = 100) -> List[dict]:
+        """
+        Get recent snapshots of a symbol, newest first
+        
+        Args:
+            symbol: Trading pair symbol
+            limit: Maximum number of snapshots
+        
+        Returns:
+            List of dictionaries with timestamp and prices (exchange -> price) keys
+        """
+        snapshot_table = PriceSnapshotTable.__table__
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(
+                    select(snapshot_table)
+                    .join(SymbolTable.__table__)
+                    .where(SymbolTable.__table__.c.name == symbol)
+                    .order_by(snapshot_table.c.ts.desc())
+                    .limit(limit)
+                ).fetchall()
+            return [self._snapshot_dict(row) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting snapshot history for {symbol}: {e}")
+            return []
+    
+    def get_latest_snapshots(self) -> Dict[str, dict]:
+        """
+        Get the latest snapshot of every symbol
+        
+        Returns:
+            Dictionary mapping symbol to a dictionary with timestamp and prices keys
+        """
+        snapshot_table = PriceSnapshotTable.__table__
+        symbol_table = SymbolTable.__table__
+        latest = select(
+            snapshot_table.c.symbol_id, func.max(snapshot_table.c.ts).label("ts")
+        ).group_by(snapshot_table.c.symbol_id).subquery()
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(
+                    select(symbol_table.c.name, snapshot_table)
+                    .join(symbol_table, symbol_table.c.id == snapshot_table.c.symbol_id)
+                    .join(latest, and_(latest.c.symbol_id == snapshot_table.c.symbol_id, latest.c.ts == snapshot_table.c.ts))
+                ).fetchall()
+            return {row.name: self._snapshot_dict(row) for row in rows}
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting latest snapshots: {e}")
+            return {}
+    
+    def get_spread_history(self, symbol: str, buy_exchange: str, sell_exchange: str, limit: int = 100) -> List[Tuple[datetime, float]]:
+        """
+        Get the spread between two exchanges over time, computed from single snapshot rows
+        
+        Args:
+            symbol: Trading pair symbol
+            buy_exchange: Exchange bought on
+            sell_exchange: Exchange sold on
+            limit: Maximum number of snapshots
+        
+        Returns:
+            List of (timestamp, profit percentage) tuples, newest first, for snapshots quoting both exchanges
+        """
+        snapshot_table = PriceSnapshotTable.__table__
+        buy_price = snapshot_table.c[snapshot_price_column(buy_exchange)]
+        sell_price = snapshot_table.c[snapshot_price_column(sell_exchange)]
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(
+                    select(snapshot_table.c.ts, (sell_price - buy_price) / buy_price * 100)
+                    .join(SymbolTable.__table__)
+                    .where(SymbolTable.__table__.c.name == symbol, buy_price.isnot(None), sell_price.isnot(None))
+                    .order_by(snapshot_table.c.ts.desc())
+                    .limit(limit)
+                ).fetchall()
+            return [(timestamp, spread) for timestamp, spread in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting spread history for {symbol}: {e}")
+            return []
+    
+    def _snapshot_dict(self, row) -> dict:
+        """Turn a price_snapshots row into timestamp and prices by exchange"""
+        return {
+            "timestamp": row.ts,
+            "prices": {exchange: getattr(row, snapshot_price_column(exchange)) for exchange in EXCHANGES}
+        }
+    
+    def update_price_rollups(self, price_batch: List[Tuple[str, Dict[str, Optional[float]], datetime]]) -> bool:
+        """
+        Fold a batch of prices into the rollup buckets of every resolution
+        
+        Args:
+            price_batch: (symbol, prices by exchange, timestamp) tuples
+        
+        Returns:
+            True if the rollups were updated or are disabled, False otherwise
+        """
+        return self._upsert_rollups(aggregate_prices(price_batch), f"{len(price_batch)} price snapshots")
+    
+    def update_opportunity_rollups(self, opportunities: List[dict]) -> bool:
+        """
+        Count arbitrage opportunities in the rollup buckets of every resolution
+        
+        Args:
+            opportunities: Dictionaries with symbol, buy_exchange, sell_exchange and timestamp keys
+        
+        Returns:
+            True if the rollups were updated or are disabled, False otherwise
+        """
+        return self._upsert_rollups(aggregate_opportunities(opportunities), f"{len(opportunities)} opportunities")
+    
+    def _upsert_rollups(self, rollup_rows: List[dict], description: str) -> bool:
+        """Merge rollup rows into price_rollups in one transaction"""
+        if not self.rollups_enabled or not rollup_rows:
+            return True
+        try:
+            with self.engine.begin() as connection:
+                if self._rollups_supported(connection):
+                    upsert_rollups(connection, PriceRollupTable.__table__, rollup_rows)
+            return True
+        except SQLAlchemyError as e:
+            logger.error(f"Error updating rollups for {description}: {e}")
+            return False
+    
+    def _rollups_supported(self, connection) -> bool:
+        """Whether rollups can be merged on this database, disabling them if not"""
+        if not supports_upsert(connection):
+            logger.warning(f"Rollups need PostgreSQL or SQLite, not {connection.dialect.name}; disabling them")
+            self.rollups_enabled = False
+        return self.rollups_enabled
+    
+    def get_rollups(self, symbol: str, exchange: str, resolution: str, start: Optional[datetime] = None,
+                    end: Optional[datetime] = None, limit: int = 1000) -> List[dict]:
+        """
+        Get the rollup buckets of a symbol on an exchange, newest first
+        
+        Args:
+            symbol: Trading pair symbol
+            exchange: Exchange name
+            resolution: Resolution name from ROLLUP_RESOLUTIONS, e.g. '1h'
+            start: Earliest bucket start to include
+            end: Bucket starts before this time are included
+            limit: Maximum number of buckets
+        
+        Returns:
+            Bucket dictionaries with OHLC, spread min/max/mean and opportunity counts
+        """
+        rollup_table = PriceRollupTable.__table__
+        query = select(rollup_table).where(
+            rollup_table.c.resolution == resolution,
+            rollup_table.c.symbol == symbol,
+            rollup_table.c.exchange == exchange
+        )
+        if start is not None:
+            query = query.where(rollup_table.c.bucket >= start)
+        if end is not None:
+            query = query.where(rollup_table.c.bucket < end)
+        try:
+            with self.engine.connect() as connection:
+                rows = connection.execute(query.order_by(rollup_table.c.bucket.desc()).limit(limit))
+                return [self._rollup_dict(row) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting {resolution} rollups for {symbol} on {exchange}: {e}")
+            return []
+    
+    def get_opportunity_counts(self, symbol: str, resolution: str, start: Optional[datetime] = None,
+                               end: Optional[datetime] = None) -> List[Tuple[datetime, int]]:
+        """
+        Get the number of arbitrage opportunities on a symbol per bucket, newest first
+        
+        Every opportunity is counted once, on its buy exchange's row.
+        """
+        rollup_table = PriceRollupTable.__table__
+        opportunities = func.sum(rollup_table.c.buy_opportunities)
+        query = select(rollup_table.c.bucket, opportunities).where(
+            rollup_table.c.resolution == resolution,
+            rollup_table.c.symbol == symbol
+        )
+        if start is not None:
+            query = query.where(rollup_table.c.bucket >= start)
+        if end is not None:
+            query = query.where(rollup_table.c.bucket < end)
+        query = query.group_by(rollup_table.c.bucket).having(opportunities > 0).order_by(rollup_table.c.bucket.desc())
+        try:
+            with self.engine.connect() as connection:
+                return [(bucket, count) for bucket, count in connection.execute(query)]
+        except SQLAlchemyError as e:
+            logger.error(f"Error getting {resolution} opportunity counts for {symbol}: {e}")
+            return []
+    
+    def _rollup_dict(self, row) -> dict:
+        """Turn a price_rollups row into a bucket dictionary"""
+        return {
+            "bucket": row.bucket,
+            "open": row.open,
+            "high": row.high,
+            "low": row.low,
+            "close": row.close,
+            "sample_count": row.sample_count,
+            "spread_min": row.spread_min,
+            "spread_max": row.spread_max,
+            "spread_mean": row.spread_sum / row.spread_count if row.spread_count else None,
+            "buy_opportunities": row.buy_opportunities,
+            "sell_opportunities": row.sell_opportunities
+        }
+    
     def get_recent_opportunities(self, limit: int = 100) -> List[ArbitrageOpportunityTable]:
         """Get recent arbitrage opportunities"""
         try:
@@ -136,6 +744,66 @@ class DatabaseManager:
         except SQLAlchemyError as e:
             logger.error(f"Error getting price history for {symbol} on {exchange}: {e}")
             return []
-
-# Global database manager instance
-db_manager = DatabaseManager()
+    
+    def stream_price_history(self, symbol: str, exchange: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                             page_size: int = STREAM_PAGE_SIZE, descending: bool = False) -> Iterator[Row]:
+        """
+        Stream the price history of a symbol on an exchange in constant memory
+        
+        Args:
+            symbol: Trading pair symbol
+            exchange: Exchange name
+            start: Earliest timestamp to include
+            end: Timestamps before this time are included
+            page_size: Rows read per keyset page
+            descending: Newest first instead of oldest first
+        
+        Yields:
+            (id, timestamp, price) rows
+        """
+        price_table = PriceDataTable.__table__
+        query = select(price_table.c.id, price_table.c.timestamp, price_table.c.price).where(
+            price_table.c.symbol == symbol,
+            price_table.c.exchange == exchange
+        )
+        yield from self._stream(query, price_table, start, end, page_size, descending, f"price history for {symbol} on {exchange}")
+    
+    def stream_opportunities(self, symbol: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                             page_size: int = STREAM_PAGE_SIZE, descending: bool = False) -> Iterator[Row]:
+        """
+        Stream arbitrage opportunities, of one symbol or all, in constant memory
+        
+        Yields:
+            Rows with every arbitrage_opportunities column, as plain tuples rather than ORM objects
+        """
+        opportunity_table = ArbitrageOpportunityTable.__table__
+        query = select(opportunity_table)
+        if symbol is not None:
+            query = query.where(opportunity_table.c.symbol == symbol)
+        yield from self._stream(query, opportunity_table, start, end, page_size, descending, f"opportunities for {symbol or 'all symbols'}")
+    
+    def price_history_batches(self, symbol: str, exchange: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                              page_size: int = STREAM_PAGE_SIZE) -> Iterator[Dict[str, list]]:
+        """Stream the price history of a symbol on an exchange as id/timestamp/price column batches, oldest first"""
+        rows = self.stream_price_history(symbol, exchange, start, end, page_size)
+        return column_batches(rows, ("id", "timestamp", "price"), page_size)
+    
+    def opportunity_batches(self, symbol: Optional[str] = None, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            page_size: int = STREAM_PAGE_SIZE) -> Iterator[Dict[str, list]]:
+        """Stream arbitrage opportunities as column batches, oldest first"""
+        rows = self.stream_opportunities(symbol, start, end, page_size)
+        return column_batches(rows, ArbitrageOpportunityTable.__table__.columns.keys(), page_size)
+    
+    def _stream(self, query, table, start: Optional[datetime], end: Optional[datetime], page_size: int,
+                descending: bool, description: str) -> Iterator[Row]:
+        """Apply the time range to a query and stream it in (timestamp, id) keyset pages"""
+        if start is not None:
+            query = query.where(table.c.timestamp >= start)
+        if end is not None:
+            query = query.where(table.c.timestamp < end)
+        try:
+            yield from stream_rows(self.engine, query, table.c.timestamp, table.c.id, page_size, descending)
+        except SQLAlchemyError as e:
+            # A silently truncated stream would look like a complete history
+            logger.error(f"Error streaming {description}: {e}")
+            raise
@@ -0,0 +1,237 @@
+"""
+PostgreSQL range partitioning and retention for the time-series tables
+Tables are split into daily or weekly partitions; retention drops whole partitions instead of deleting rows
+"""
+
+import logging
+import re
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+from arbitrage_app.sample_trading import PARTITIONING_ENABLED, PARTITIONED_TABLES, PARTITIONS_AHEAD
+
+logger = logging.getLogger(__name__)
+
+INTERVALS = {"day": timedelta(days=1), "week": timedelta(weeks=1)}
+
+def period_start(moment: datetime, interval: str) -> datetime:
+    """Start of the day, or of the week (Monday), containing a moment"""
+    day = datetime(moment.year, moment.month, moment.day)
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+def partition_name(table: str, start: datetime) -> str:
+    """Name of the partition holding rows from `start`, e.g. price_data_p20240610"""
+    return f"{table}_p{start:%Y%m%d}"
+
+class PartitionManager:
+    """
+    Keeps the tables in PARTITIONED_TABLES range-partitioned on PostgreSQL
+
+    Each table is partitioned on its time column, one partition per day or
+    week, plus a default partition for rows outside every range. Partitions
+    are created PARTITIONS_AHEAD periods in advance, and partitions entirely
+    older than a table's retention are dropped. Other databases are left
+    untouched, so SQLite keeps working as before.
+    """
+
+    def __init__(self, engine: Engine, tables: Dict[str, dict] = PARTITIONED_TABLES,
+                 enabled: bool = PARTITIONING_ENABLED, ahead: int = PARTITIONS_AHEAD):
+        self.engine = engine
+        self.tables = tables
+        self.ahead = ahead
+        self.enabled = enabled and engine.dialect.name == "postgresql"
+
+    def is_partitioned(self, table: str) -> bool:
+        """Whether a table is a partitioned parent"""
+        with self.engine.connect() as connection:
+            return connection.execute(text(
+                "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+                "WHERE c.relname = :table AND pg_table_is_visible(c.oid)"
+            ), {"table": table}).first() is not None
+
+    def setup(self, now: Optional[datetime] = None):
+        """Convert tables that are not partitioned yet, then create partitions and apply retention"""
+        if not self.enabled:
+            return
+        for table in self.tables:
+            if not self.is_partitioned(table):
+                self.convert_to_partitioned(table, now)
+        self.maintain(now)
+
+    def convert_to_partitioned(self, table: str, now: Optional[datetime] = None):
+        """
+        Replace a plain table with a partitioned one holding the same rows
+
+        The table is renamed, a partitioned table with the same columns and
+        defaults takes its name, the rows are copied across and the old table
+        is dropped, all in one transaction. The primary key becomes
+        (id, <time column>) because PostgreSQL requires the partition key in it.
+        Indexes are recreated afterwards by DatabaseManager.sync_indexes.
+        """
+        settings = self.tables[table]
+        column = settings["column"]
+        legacy = f"{table}_unpartitioned"
+        names = [c["name"] for c in inspect(self.engine).get_columns(table)]
+        columns = ", ".join(names)
+        # Rows stored without a time fall back to when they were written
+        select_columns = ", ".join(f"COALESCE({name}, created_at, now())" if name == column else name for name in names)
+
+        with self.engine.begin() as connection:
+            oldest, row_count = connection.execute(text(f"SELECT min({column}), count(*) FROM {table}")).one()
+            sequence = connection.execute(text("SELECT pg_get_serial_sequence(:table, 'id')"), {"table": table}).scalar()
+
+            connection.execute(text(f"ALTER TABLE {table} RENAME TO {legacy}"))
+            connection.execute(text(f"CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS) PARTITION BY RANGE ({column})"))
+            connection.execute(text(f"ALTER TABLE {table} ALTER COLUMN {column} SET NOT NULL"))
+            if sequence:
+                # The id sequence would otherwise be dropped with the old table
+                connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY {table}.id"))
+
+            connection.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+            self._create_partitions(connection, table, oldest or (now or datetime.utcnow()), now)
+
+            connection.execute(text(f"INSERT INTO {table} ({columns}) SELECT {select_columns} FROM {legacy}"))
+            connection.execute(text(f"DROP TABLE {legacy}"))
+            connection.execute(text(f"ALTER TABLE {table} ADD PRIMARY KEY (id, {column})"))
+
+        logger.info(f"Partitioned {table} by {settings['interval']} on {column}, {row_count} rows moved")
+
+    def maintain(self, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+        """
+        Create upcoming partitions and drop expired ones for every partitioned table
+
+        Returns:
+            Dictionary mapping table name to the partitions dropped
+        """
+        dropped = {}
+        if not self.enabled:
+            return dropped
+
+        now = now or datetime.utcnow()
+        for table in self.tables:
+            try:
+                with self.engine.begin() as connection:
+                    self._create_partitions(connection, table, now, now)
+                dropped[table] = self.drop_expired_partitions(table, now)
+            except SQLAlchemyError as e:
+                logger.error(f"Error maintaining partitions of {table}: {e}")
+        return dropped
+
+    def _create_partitions(self, connection, table: str, start: datetime, now: Optional[datetime]):
+        """Create every missing partition from the one holding `start` to PARTITIONS_AHEAD periods past now"""
+        interval = self.tables[table]["interval"]
+        step = INTERVALS[interval]
+        lower = period_start(start, interval)
+        last = period_start(now or datetime.utcnow(), interval) + step * self.ahead
+        existing = set(self._child_tables(connection, table))
+
+        while lower <= last:
+            upper = lower + step
+            if partition_name(table, lower) not in existing:
+                self._create_partition(connection, table, lower, upper, f"{table}_default" in existing)
+            lower = upper
+
+    def _create_partition(self, connection, table: str, lower: datetime, upper: datetime, has_default: bool):
+        """
+        Create the partition for [lower, upper), taking over rows the default partition holds for that range
+
+        PostgreSQL refuses to add a range the default partition already has
+        rows for, so the default is detached, the partition created, those rows
+        moved into it and the default attached again, all in the caller's transaction.
+        """
+        column = self.tables[table]["column"]
+        name = partition_name(table, lower)
+        default = f"{table}_default"
+        bounds = {"lower": lower, "upper": upper}
+        create = (f"CREATE TABLE {name} PARTITION OF {table} "
+                  f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')")
+
+        stray = has_default and connection.execute(text(
+            f"SELECT 1 FROM {default} WHERE {column} >= :lower AND {column} < :upper LIMIT 1"
+        ), bounds).first() is not None
+        if not stray:
+            connection.execute(text(create))
+            return
+
+        connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {default}"))
+        connection.execute(text(create))
+        moved = connection.execute(text(
+            f"WITH moved AS (DELETE FROM {default} WHERE {column} >= :lower AND {column} < :upper RETURNING *) "
+            f"INSERT INTO {table} SELECT * FROM moved"
+        ), bounds).rowcount
+        connection.execute(text(f"ALTER TABLE {table} ATTACH PARTITION {default} DEFAULT"))
+        logger.info(f"Created {name} and moved {moved} rows into it from {default}")
+
+    def _child_tables(self, connection, table: str) -> List[str]:
+        """Names of every partition of a table, including the default one"""
+        return list(connection.execute(text(
+            "SELECT c.relname FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid JOIN pg_class p ON p.oid = i.inhparent "
+            "WHERE p.relname = :table"
+        ), {"table": table}).scalars())
+
+    def list_partitions(self, table: str) -> Dict[str, datetime]:
+        """Range partitions of a table, mapped to the start of their range"""
+        pattern = re.compile(rf"^{re.escape(table)}_p(\d{{8}})$")
+        with self.engine.connect() as connection:
+            names = self._child_tables(connection, table)
+        return {
+            name: datetime.strptime(match.group(1), "%Y%m%d")
+            for name in names
+            for match in [pattern.match(name)] if match
+        }
+
+    def drop_expired_partitions(self, table: str, now: Optional[datetime] = None) -> List[str]:
+        """
+        Drop the partitions whose whole range is older than the table's retention
+
+        Returns:
+            Names of the dropped partitions
+        """
+        settings = self.tables[table]
+        if not settings.get("retention_days"):
+            return []
+
+        cutoff = (now or datetime.utcnow()) - timedelta(days=settings["retention_days"])
+        return self.drop_partitions(table, self.partitions_before(table, cutoff))
+
+    def partitions_before(self, table: str, cutoff: datetime) -> List[str]:
+        """Range partitions of a table whose whole range is older than `cutoff`, oldest first"""
+        step = INTERVALS[self.tables[table]["interval"]]
+        return sorted(name for name, start in self.list_partitions(table).items() if start + step <= cutoff)
+
+    def drop_partitions(self, table: str, names: List[str]) -> List[str]:
+        """
+        Detach and drop partitions of a table in one transaction
+
+        Returns:
+            Names of the dropped partitions
+        """
+        with self.engine.begin() as connection:
+            for name in names:
+                connection.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+                connection.execute(text(f"DROP TABLE {name}"))
+        if names:
+            logger.info(f"Dropped {len(names)} partitions of {table}: {', '.join(names)}")
+        return names
+
+class PartitionMaintenanceThread(threading.Thread):
+    """Background thread running PartitionManager.maintain at a fixed interval"""
+
+    def __init__(self, partition_manager: PartitionManager, interval: float):
+        super().__init__(name="partition-maintenance", daemon=True)
+        self.partition_manager = partition_manager
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.partition_manager.maintain()
+
+    def stop(self):
+        self._stop_event.set()
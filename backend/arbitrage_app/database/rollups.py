@@ -0,0 +1,159 @@
+"""
+Incremental OHLC and spread rollups of price data
+Each stored batch is folded into per-resolution buckets with one upsert instead of recomputing history
+"""
+
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import Table, case, or_
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection
+from arbitrage_app.sample_trading import ROLLUP_RESOLUTIONS
+
+logger = logging.getLogger(__name__)
+
+EPOCH = datetime(1970, 1, 1)
+
+# Dialects with INSERT ... ON CONFLICT DO UPDATE
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def bucket_start(moment: datetime, seconds: int) -> datetime:
+    """Start of the bucket of `seconds` length, aligned to the epoch, that contains a moment"""
+    size = timedelta(seconds=seconds)
+    return EPOCH + (moment - EPOCH) // size * size
+
+def exchange_spreads(prices: Dict[str, Optional[float]]) -> Dict[str, Optional[float]]:
+    """
+    Spread of every quoted exchange against the cheapest other exchange, in percent
+
+    A positive spread means selling on the exchange beats buying on the
+    cheapest other one. Exchanges have no spread unless another exchange is quoted.
+    """
+    quoted = {exchange: price for exchange, price in prices.items() if price}
+    spreads = {}
+    for exchange, price in quoted.items():
+        others = [other_price for other, other_price in quoted.items() if other != exchange]
+        spreads[exchange] = (price - min(others)) / min(others) * 100 if others else None
+    return spreads
+
+def _new_bucket(resolution: str, symbol: str, exchange: str, bucket: datetime) -> dict:
+    return {
+        "resolution": resolution, "symbol": symbol, "exchange": exchange, "bucket": bucket,
+        "open": None, "high": None, "low": None, "close": None, "open_ts": None, "close_ts": None,
+        "sample_count": 0, "spread_min": None, "spread_max": None, "spread_sum": 0.0, "spread_count": 0,
+        "buy_opportunities": 0, "sell_opportunities": 0
+    }
+
+def aggregate_prices(price_batch: Iterable[Tuple[str, Dict[str, Optional[float]], datetime]],
+                     resolutions: Dict[str, int] = ROLLUP_RESOLUTIONS) -> List[dict]:
+    """
+    Fold a batch of prices into one rollup row per resolution, symbol, exchange and bucket
+
+    Args:
+        price_batch: (symbol, prices by exchange, timestamp) tuples
+        resolutions: Bucket length in seconds by resolution name
+
+    Returns:
+        Rollup rows covering only this batch, ready for upsert_rollups
+    """
+    buckets = {}
+    for symbol, prices, timestamp in price_batch:
+        spreads = exchange_spreads(prices)
+        for exchange, price in prices.items():
+            if not price:
+                continue
+            spread = spreads[exchange]
+            for resolution, seconds in resolutions.items():
+                key = (resolution, symbol, exchange, bucket_start(timestamp, seconds))
+                row = buckets.get(key)
+                if row is None:
+                    row = buckets[key] = _new_bucket(*key)
+                if row["open_ts"] is None or timestamp < row["open_ts"]:
+                    row["open"], row["open_ts"] = price, timestamp
+                if row["close_ts"] is None or timestamp >= row["close_ts"]:
+                    row["close"], row["close_ts"] = price, timestamp
+                row["high"] = price if row["high"] is None else max(row["high"], price)
+                row["low"] = price if row["low"] is None else min(row["low"], price)
+                row["sample_count"] += 1
+                if spread is not None:
+                    row["spread_min"] = spread if row["spread_min"] is None else min(row["spread_min"], spread)
+                    row["spread_max"] = spread if row["spread_max"] is None else max(row["spread_max"], spread)
+                    row["spread_sum"] += spread
+                    row["spread_count"] += 1
+    return list(buckets.values())
+
+def aggregate_opportunities(opportunities: Iterable[dict], resolutions: Dict[str, int] = ROLLUP_RESOLUTIONS) -> List[dict]:
+    """
+    Count opportunities per resolution and bucket on their buy and their sell exchange
+
+    Args:
+        opportunities: Dictionaries with symbol, buy_exchange, sell_exchange and timestamp keys
+
+    Returns:
+        Rollup rows holding only opportunity counts, ready for upsert_rollups
+    """
+    buckets = {}
+    for opportunity in opportunities:
+        timestamp = opportunity.get("timestamp") or datetime.utcnow()
+        for side in ("buy", "sell"):
+            for resolution, seconds in resolutions.items():
+                key = (resolution, opportunity["symbol"], opportunity[f"{side}_exchange"], bucket_start(timestamp, seconds))
+                row = buckets.get(key)
+                if row is None:
+                    row = buckets[key] = _new_bucket(*key)
+                row[f"{side}_opportunities"] += 1
+    return list(buckets.values())
+
+def _merge_columns(table: Table, excluded) -> dict:
+    """Column updates merging a bucket already stored with the same bucket from a new batch"""
+    current = table.c
+
+    def earlier(column, time_column):
+        return case((or_(current[time_column].is_(None), excluded[time_column] < current[time_column]), excluded[column]), else_=current[column])
+
+    def later(column, time_column):
+        return case((or_(current[time_column].is_(None), excluded[time_column] >= current[time_column]), excluded[column]), else_=current[column])
+
+    def lowest(column):
+        return case((or_(current[column].is_(None), excluded[column] < current[column]), excluded[column]), else_=current[column])
+
+    def highest(column):
+        return case((or_(current[column].is_(None), excluded[column] > current[column]), excluded[column]), else_=current[column])
+
+    return {
+        "open": earlier("open", "open_ts"),
+        "open_ts": earlier("open_ts", "open_ts"),
+        "close": later("close", "close_ts"),
+        "close_ts": later("close_ts", "close_ts"),
+        "high": highest("high"),
+        "low": lowest("low"),
+        "spread_max": highest("spread_max"),
+        "spread_min": lowest("spread_min"),
+        **{
+            column: current[column] + excluded[column]
+            for column in ("sample_count", "spread_sum", "spread_count", "buy_opportunities", "sell_opportunities")
+        }
+    }
+
+def supports_upsert(connection: Connection) -> bool:
+    """Whether rollups can be merged on this database"""
+    return connection.dialect.name in UPSERT_INSERTS
+
+def upsert_rollups(connection: Connection, table: Table, rows: List[dict]):
+    """
+    Merge rollup rows into the stored buckets with INSERT ... ON CONFLICT DO UPDATE
+
+    New buckets are inserted as they are; existing ones keep the earliest
+    open, the latest close, the extreme highs, lows and spreads, and add up
+    the counts and sums. Merging is order-independent, so late batches land
+    in the right bucket.
+    """
+    if not rows:
+        return
+    insert_statement = UPSERT_INSERTS[connection.dialect.name](table)
+    statement = insert_statement.on_conflict_do_update(
+        index_elements=[column.name for column in table.primary_key.columns],
+        set_=_merge_columns(table, insert_statement.excluded)
+    )
+    connection.execute(statement, rows)
@@ -0,0 +1,76 @@
+"""
+Constant-memory readers for long histories
+Rows are read in keyset pages on (timestamp, id) through server-side cursors instead of being loaded at once
+"""
+
+import logging
+from typing import Dict, Iterator, List, Sequence
+from sqlalchemy import Column, Select, and_, or_
+from sqlalchemy.engine import Engine, Row
+from arbitrage_app.sample_trading import STREAM_PAGE_SIZE
+
+logger = logging.getLogger(__name__)
+
+def keyset_after(time_column: Column, id_column: Column, last_row: Row, descending: bool):
+    """Condition selecting the rows after `last_row` in (time, id) order"""
+    last_time, last_id = last_row._mapping[time_column.name], last_row._mapping[id_column.name]
+    if descending:
+        return or_(time_column < last_time, and_(time_column == last_time, id_column < last_id))
+    return or_(time_column > last_time, and_(time_column == last_time, id_column > last_id))
+
+def stream_rows(engine: Engine, query: Select, time_column: Column, id_column: Column,
+                page_size: int = STREAM_PAGE_SIZE, descending: bool = False) -> Iterator[Row]:
+    """
+    Yield the rows of a query in (time, id) order, one keyset page at a time
+
+    Each page is its own short query continuing after the last row seen, so
+    no transaction stays open between pages and rows inserted meanwhile are
+    neither skipped nor repeated. Within a page rows come off a server-side
+    cursor (stream_results) rather than being fetched all at once.
+
+    Args:
+        engine: Engine to read through
+        query: Select including both keyset columns, without ORDER BY or LIMIT
+        time_column: Timestamp column of the keyset
+        id_column: Unique id column breaking timestamp ties
+        page_size: Rows per page
+        descending: Newest first instead of oldest first
+
+    Yields:
+        Lightweight Row tuples
+    """
+    order = [time_column.desc(), id_column.desc()] if descending else [time_column.asc(), id_column.asc()]
+    last_row = None
+    while True:
+        page_query = query if last_row is None else query.where(keyset_after(time_column, id_column, last_row, descending))
+        with engine.connect() as connection:
+            result = connection.execution_options(stream_results=True, yield_per=page_size).execute(
+                page_query.order_by(*order).limit(page_size)
+            )
+            page_rows = 0
+            for row in result:
+                page_rows += 1
+                last_row = row
+                yield row
+        if page_rows < page_size:
+            return
+
+def column_batches(rows: Iterator[Row], columns: Sequence[str], batch_size: int = STREAM_PAGE_SIZE) -> Iterator[Dict[str, List]]:
+    """
+    Group rows into column batches, e.g. for pyarrow.RecordBatch.from_pydict
+
+    Yields:
+        Dictionaries mapping every column name to that column's values in the batch
+    """
+    batch = {name: [] for name in columns}
+    batch_rows = 0
+    for row in rows:
+        for name, value in zip(columns, row):
+            batch[name].append(value)
+        batch_rows += 1
+        if batch_rows == batch_size:
+            yield batch
+            batch = {name: [] for name in columns}
+            batch_rows = 0
+    if batch_rows:
+        yield batch
@@ -0,0 +1,138 @@
+"""
+Test script for the Parquet archive
+This script archives aged rows of a throwaway SQLite database and reads archive and database back together
+"""
+
+import os
+import tempfile
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, insert, select, func
+from arbitrage_app.database import archive as archive_module
+from arbitrage_app.database.models import DatabaseManager, PriceDataTable
+from arbitrage_app.database.archive import ArchiveManager
+from arbitrage_app.database.partitioning import partition_name
+
+class DailyPartitions:
+    """PartitionManager stand-in reporting price_data as partitioned by day and recording dropped partitions"""
+
+    enabled = True
+    tables = {"price_data": {"column": "timestamp", "interval": "day"}}
+
+    def __init__(self, starts):
+        self.starts = starts
+        self.dropped = []
+
+    def is_partitioned(self, table):
+        return True
+
+    def list_partitions(self, table):
+        return {partition_name(table, start): start for start in self.starts}
+
+    def partitions_before(self, table, cutoff):
+        return sorted(name for name, start in self.list_partitions(table).items() if start + timedelta(days=1) <= cutoff)
+
+    def drop_partitions(self, table, names):
+        self.dropped.extend(names)
+        return names
+
+def make_archive(path):
+    """Archive over an in-memory database holding 4 days of prices for two symbols"""
+    manager = DatabaseManager(create_engine("sqlite://"))
+    manager.create_schema()
+    start = datetime(2024, 6, 10)
+    price_rows = [
+        {"symbol": symbol, "exchange": "nobitex", "price": float(hour), "timestamp": start + timedelta(hours=hour)}
+        for hour in range(0, 96, 6)
+        for symbol in ("BTCUSDT", "ETHUSDT")
+    ]
+    assert manager.store_price_data_batch(price_rows)
+    archive = ArchiveManager(manager, path=path, tables={"price_data": {"after_days": 2}})
+    return archive, manager, start
+
+def count_rows(manager):
+    with manager.engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(PriceDataTable.__table__)).scalar()
+
+def test_archive_and_scan():
+    """Aged days move to per-date, per-symbol files and read back seamlessly with the database"""
+    print("Testing archive...")
+
+    with tempfile.TemporaryDirectory() as path:
+        archive, manager, start = make_archive(path)
+        archived = archive.archive(now=start + timedelta(days=4, hours=1))
+        print(f"  archived: {archived}")
+        assert archived == {"price_data": 16}
+        assert count_rows(manager) == 16
+        assert archive.archived_days("price_data") == ["2024-06-10", "2024-06-11"]
+        assert sorted(os.listdir(os.path.join(path, "price_data", "date=2024-06-10"))) == ["symbol=BTCUSDT", "symbol=ETHUSDT"]
+
+        # Nothing left to archive; file names are stable
+        assert archive.archive(now=start + timedelta(days=4, hours=1)) == {"price_data": 0}
+
+        batches = list(archive.scan("price_data", start + timedelta(hours=12), start + timedelta(days=3), symbol="BTCUSDT", batch_size=3))
+        prices = [price for batch in batches for price in batch["price"]]
+        timestamps = [timestamp for batch in batches for timestamp in batch["timestamp"]]
+        assert prices == [float(hour) for hour in range(12, 72, 6)]
+        assert timestamps == sorted(timestamps)
+        assert set(batches[0]) == set(PriceDataTable.__table__.columns.keys())
+        assert {symbol for batch in batches for symbol in batch["symbol"]} == {"BTCUSDT"}
+        print("  ✅ Archive and database read back as one history")
+
+def test_late_rows_are_kept():
+    """A row committed after its day was streamed, with an id inside the archived range, is not deleted"""
+    print("\nTesting late-committed rows...")
+
+    with tempfile.TemporaryDirectory() as path:
+        manager = DatabaseManager(create_engine("sqlite://"))
+        manager.create_schema()
+        table = PriceDataTable.__table__
+        day = datetime(2024, 6, 10)
+        row = {"symbol": "BTCUSDT", "exchange": "nobitex", "price": 1.0}
+        with manager.engine.begin() as connection:
+            connection.execute(insert(table), [dict(row, id=10, timestamp=day), dict(row, id=30, timestamp=day + timedelta(hours=2))])
+
+        original_stream_rows = archive_module.stream_rows
+
+        def stream_then_commit_late_row(*args, **kwargs):
+            yield from original_stream_rows(*args, **kwargs)
+            with manager.engine.begin() as connection:
+                connection.execute(insert(table), [dict(row, id=20, timestamp=day + timedelta(hours=1))])
+
+        archive_module.stream_rows = stream_then_commit_late_row
+        try:
+            archived = ArchiveManager(manager, path=path).archive_day("price_data", day)
+        finally:
+            archive_module.stream_rows = original_stream_rows
+
+        with manager.engine.connect() as connection:
+            remaining = [row_id for (row_id,) in connection.execute(select(table.c.id))]
+        print(f"  archived {archived} rows, kept ids {remaining}")
+        assert archived == 2
+        assert remaining == [20]
+        assert os.listdir(os.path.join(path, "price_data", "date=2024-06-10", "symbol=BTCUSDT")) == ["part-10-30.parquet"]
+        print("  ✅ Late rows stay in the database")
+
+def test_partitioned_days_are_dropped():
+    """Days in a whole partition are archived and the partition dropped; days in the default partition are deleted by id"""
+    print("\nTesting partitioned archive...")
+
+    with tempfile.TemporaryDirectory() as path:
+        archive, manager, start = make_archive(path)
+        # 2024-06-10 has no partition of its own, so its rows sit in the default partition
+        partitions = DailyPartitions([start + timedelta(days=day) for day in range(1, 5)])
+        manager.partition_manager = partitions
+
+        archived = archive.archive(now=start + timedelta(days=4, hours=1))
+        print(f"  archived: {archived}, dropped: {partitions.dropped}")
+        assert archived == {"price_data": 16}
+        assert partitions.dropped == ["price_data_p20240611"]
+        # Only the default partition's day was deleted row by row
+        assert count_rows(manager) == 24
+        assert archive.archived_days("price_data") == ["2024-06-10", "2024-06-11"]
+        print("  ✅ Archived partition dropped instead of deleting its rows")
+
+if __name__ == "__main__":
+    test_archive_and_scan()
+    test_late_rows_are_kept()
+    test_partitioned_days_are_dropped()
+    print("\n✅ All archive tests completed successfully!")
@@ -10,6 +10,7 @@ from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
 
+from arbitrage_app.database.models import init_database
 from arbitrage_app.database.integration import DatabaseIntegrationService
 from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageOpportunity
 
@@ -21,7 +22,7 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-database_integration_service = DatabaseIntegrationService()
+database_integration_service = DatabaseIntegrationService(db_manager=init_database())
 def test_database_tables():
     """Test database table creation and basic operations"""
     print("\n📊 Testing Database Tables")
@@ -62,6 +63,33 @@ def test_database_tables():
         logger.error(f"Database table test error: {e}")
         return False
 
+def test_batch_price_data():
+    """Test storing the prices of a whole scan in one transaction"""
+    logger.info("Testing Batched Price Data")
+    
+    try:
+        timestamp = datetime.utcnow()
+        price_batch = [
+            (f'BATCH{index}', {'nobitex': 100.0 + index, 'wallex': 101.0 + index, 'other': None}, timestamp)
+            for index in range(50)
+        ]
+        
+        if not database_integration_service.store_price_batch(price_batch):
+            logger.error("Failed to store price batch")
+            return False
+        
+        history = database_integration_service.get_price_history('BATCH7', 'wallex', 1)
+        if not history or history[0].price != 108.0:
+            logger.error("Batched price data not found")
+            return False
+        
+        logger.info("Price batch stored successfully")
+        return True
+        
+    except Exception as e:
+        logger.error(f"Batched price data test error: {e}")
+        return False
+
 def test_database_queries():
     """Test database query operations"""
     logger.info("Testing Database Queries")
@@ -132,6 +160,7 @@ def main():
     # Run tests
     tests = [
         test_database_tables,
+        test_batch_price_data,
         test_database_queries,
         test_postgres_exporter_metrics
     ]
@@ -0,0 +1,63 @@
+"""
+Test script for the keyset-paginated streaming readers
+This script streams histories in small pages on a throwaway SQLite database
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from arbitrage_app.database.models import DatabaseManager
+
+def make_manager():
+    """DatabaseManager with 10 prices, timestamps repeating in pairs across page boundaries"""
+    manager = DatabaseManager(create_engine("sqlite://"))
+    manager.create_schema()
+    start = datetime(2024, 6, 10, 12, 0, 0)
+    price_rows = [
+        {"symbol": "BTCUSDT", "exchange": "nobitex", "price": 60000.0 + index, "timestamp": start + timedelta(seconds=index // 2)}
+        for index in range(10)
+    ]
+    price_rows.append({"symbol": "BTCUSDT", "exchange": "wallex", "price": 1.0, "timestamp": start})
+    assert manager.store_price_data_batch(price_rows)
+    return manager, start
+
+def test_keyset_pages():
+    """Every row comes back exactly once in (timestamp, id) order, whatever the page size"""
+    print("Testing keyset streaming...")
+
+    manager, start = make_manager()
+    for page_size in (1, 3, 5, 10, 100):
+        prices = [row.price for row in manager.stream_price_history("BTCUSDT", "nobitex", page_size=page_size)]
+        assert prices == [60000.0 + index for index in range(10)], (page_size, prices)
+
+    newest = [row.price for row in manager.stream_price_history("BTCUSDT", "nobitex", page_size=3, descending=True)]
+    assert newest == [60000.0 + index for index in reversed(range(10))]
+
+    ranged = list(manager.stream_price_history("BTCUSDT", "nobitex", start=start + timedelta(seconds=1), end=start + timedelta(seconds=3), page_size=2))
+    assert [row.price for row in ranged] == [60002.0, 60003.0, 60004.0, 60005.0]
+    assert tuple(ranged[0]) == (3, start + timedelta(seconds=1), 60002.0)
+    print("  ✅ Pages join up without gaps or repeats")
+
+def test_column_batches():
+    """Batches hold columns, and opportunities stream as plain rows"""
+    print("\nTesting column batches...")
+
+    manager, start = make_manager()
+    batches = list(manager.price_history_batches("BTCUSDT", "nobitex", page_size=4))
+    assert [len(batch["price"]) for batch in batches] == [4, 4, 2]
+    assert batches[0]["timestamp"][:2] == [start, start]
+
+    for index in range(5):
+        manager.store_arbitrage_opportunity({
+            "symbol": "BTCUSDT" if index % 2 else "ETHUSDT", "profit_percentage": 1.0, "profit_amount": float(index),
+            "buy_exchange": "nobitex", "sell_exchange": "wallex", "timestamp": start + timedelta(minutes=index)
+        })
+    assert [row.profit_amount for row in manager.stream_opportunities("BTCUSDT", page_size=1)] == [1.0, 3.0]
+    opportunity_batches = list(manager.opportunity_batches(page_size=2))
+    assert len(opportunity_batches) == 3
+    assert opportunity_batches[2]["profit_amount"] == [4.0]
+    print("  ✅ Column batches are correct")
+
+if __name__ == "__main__":
+    test_keyset_pages()
+    test_column_batches()
+    print("\n✅ All streaming tests completed successfully!")
@@ -0,0 +1,52 @@
+"""
+Test script for lazy database initialization
+This script imports the application in fresh interpreters and checks the database is left alone
+"""
+
+import os
+import subprocess
+import sys
+from sqlalchemy import create_engine, inspect
+from arbitrage_app.database.models import DatabaseManager
+
+IMPORT_CHECK = (
+    "import os\n"
+    "import arbitrage_app.main\n"
+    "from arbitrage_app.database import models\n"
+    "from arbitrage_app.database.integration import DatabaseIntegrationService\n"
+    "DatabaseIntegrationService()\n"
+    "assert models._engine is None\n"
+    "os.environ.pop('DATABASE_URL', None)  # in case load_dotenv found one\n"
+    "try:\n"
+    "    models.init_database()\n"
+    "except RuntimeError as e:\n"
+    "    print(e)\n"
+)
+
+def test_import_without_database_url():
+    """The app imports and builds its services without DATABASE_URL; only initialization needs it"""
+    print("Testing import without DATABASE_URL...")
+
+    environment = {name: value for name, value in os.environ.items() if name != "DATABASE_URL"}
+    result = subprocess.run([sys.executable, "-c", IMPORT_CHECK], env=environment, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), timeout=60)
+    print(f"  output: {result.stdout.strip()} {result.stderr.strip()[-200:]}")
+    assert result.returncode == 0
+    assert "DATABASE_URL is not set" in result.stdout
+    print("  ✅ Importing the app does not touch the database")
+
+def test_schema_created_explicitly():
+    """A manager creates no tables until create_schema is called"""
+    print("\nTesting explicit schema setup...")
+
+    engine = create_engine("sqlite://")
+    manager = DatabaseManager(engine)
+    assert inspect(engine).get_table_names() == []
+    manager.create_schema()
+    assert "price_data" in inspect(engine).get_table_names()
+    print("  ✅ Tables appear only on create_schema")
+
+if __name__ == "__main__":
+    test_import_without_database_url()
+    test_schema_created_explicitly()
+    print("\n✅ All lazy initialization tests completed successfully!")
@@ -0,0 +1,73 @@
+"""
+Test script for time partitioning
+This script checks partition ranges and names, and that other databases are left alone
+Set DATABASE_URL to a PostgreSQL database to also run the partition maintenance against it
+"""
+
+import os
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, inspect, text
+from arbitrage_app.database.models import DatabaseManager
+from arbitrage_app.database.partitioning import PartitionManager, period_start, partition_name
+
+def test_partition_ranges():
+    """Daily partitions start at midnight, weekly ones on Monday"""
+    print("Testing partition ranges...")
+
+    moment = datetime(2024, 6, 13, 17, 45)  # a Thursday
+    assert period_start(moment, "day") == datetime(2024, 6, 13)
+    assert period_start(moment, "week") == datetime(2024, 6, 10)
+    assert period_start(datetime(2024, 6, 10), "week") == datetime(2024, 6, 10)
+    assert partition_name("price_data", period_start(moment, "week")) == "price_data_p20240610"
+    print("  ✅ Ranges and names are correct")
+
+def test_sqlite_not_partitioned():
+    """Partitioning is skipped outside PostgreSQL"""
+    print("\nTesting SQLite fallback...")
+
+    engine = create_engine("sqlite://")
+    manager = DatabaseManager(engine)
+    manager.create_schema()
+    assert not manager.partition_manager.enabled
+    assert PartitionManager(engine, enabled=True).maintain() == {}
+    assert {"price_data", "arbitrage_opportunities"} <= set(inspect(engine).get_table_names())
+    print("  ✅ SQLite tables stay plain")
+
+def test_partition_over_default_rows():
+    """A partition is created for a range the default partition already holds rows for (PostgreSQL only)"""
+    print("\nTesting partition creation over default partition rows...")
+
+    url = os.getenv("DATABASE_URL", "")
+    if not url.startswith("postgresql"):
+        print("  Skipped: DATABASE_URL is not a PostgreSQL database")
+        return
+
+    engine = create_engine(url)
+    table = "partition_probe"
+    manager = PartitionManager(engine, {table: {"column": "ts", "interval": "day"}}, enabled=True, ahead=1)
+    now = datetime(2024, 6, 10, 12, 0)
+    later = now + timedelta(days=5)
+    with engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+        connection.execute(text(f"CREATE TABLE {table} (id SERIAL PRIMARY KEY, ts TIMESTAMP, created_at TIMESTAMP)"))
+    try:
+        manager.convert_to_partitioned(table, now)
+        with engine.begin() as connection:
+            connection.execute(text(f"INSERT INTO {table} (ts) VALUES (:ts)"), {"ts": later})
+            assert connection.execute(text(f"SELECT count(*) FROM {table}_default")).scalar() == 1
+
+        assert table in manager.maintain(later)
+        assert partition_name(table, period_start(later, "day")) in manager.list_partitions(table)
+        with engine.connect() as connection:
+            assert connection.execute(text(f"SELECT count(*) FROM {table}_default")).scalar() == 0
+            assert connection.execute(text(f"SELECT count(*) FROM {partition_name(table, period_start(later, 'day'))}")).scalar() == 1
+        print("  ✅ Default partition rows moved into the new partition")
+    finally:
+        with engine.begin() as connection:
+            connection.execute(text(f"DROP TABLE IF EXISTS {table} CASCADE"))
+
+if __name__ == "__main__":
+    test_partition_ranges()
+    test_sqlite_not_partitioned()
+    test_partition_over_default_rows()
+    print("\n✅ All partitioning tests completed successfully!")
@@ -0,0 +1,102 @@
+"""
+Test script for the incremental price rollups
+This script folds batches into rollups on a throwaway SQLite database and checks the merged buckets
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select, func, text
+from arbitrage_app.database.models import DatabaseManager, PriceDataTable, PriceSnapshotTable, ArbitrageOpportunityTable
+from arbitrage_app.database.integration import DatabaseIntegrationService
+from arbitrage_app.database.rollups import bucket_start, exchange_spreads
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageOpportunity
+
+def test_buckets_and_spreads():
+    """Buckets align to the epoch and spreads compare against the cheapest other exchange"""
+    print("Testing buckets and spreads...")
+
+    moment = datetime(2024, 6, 10, 12, 34, 56, 789)
+    assert bucket_start(moment, 60) == datetime(2024, 6, 10, 12, 34)
+    assert bucket_start(moment, 3600) == datetime(2024, 6, 10, 12, 0)
+    assert bucket_start(moment, 86400) == datetime(2024, 6, 10)
+
+    spreads = exchange_spreads({"nobitex": 100.0, "wallex": 102.0, "ramzinex": None})
+    assert spreads == {"nobitex": -100 * 2 / 102, "wallex": 2.0}
+    assert exchange_spreads({"nobitex": 100.0, "wallex": None}) == {"nobitex": None}
+    print("  ✅ Buckets and spreads are correct")
+
+def test_incremental_merge():
+    """Batches merge into the same buckets in any order, and opportunities are counted"""
+    print("\nTesting incremental rollups...")
+
+    manager = DatabaseManager(create_engine("sqlite://"))
+    manager.create_schema()
+    service = DatabaseIntegrationService(db_manager=manager)
+    start = datetime(2024, 6, 10, 12, 0, 0)
+    prices = [100.0, 104.0, 98.0, 101.0]
+    price_batches = [
+        [("BTCUSDT", {"nobitex": price, "wallex": 100.0}, start + timedelta(seconds=10 * index))]
+        for index, price in enumerate(prices)
+    ]
+    # The last batch lands first
+    for price_batch in [price_batches[3]] + price_batches[:3]:
+        assert service.store_price_batch(price_batch)
+
+    minute = service.get_rollups("BTCUSDT", "nobitex", "1m")
+    print(f"  1m bucket: {minute}")
+    assert len(minute) == 1
+    bucket = minute[0]
+    assert bucket["bucket"] == start
+    assert (bucket["open"], bucket["high"], bucket["low"], bucket["close"]) == (100.0, 104.0, 98.0, 101.0)
+    assert bucket["sample_count"] == 4
+    assert (bucket["spread_min"], bucket["spread_max"]) == (-2.0, 4.0)
+    assert abs(bucket["spread_mean"] - 0.75) < 1e-9
+    assert service.get_rollups("BTCUSDT", "wallex", "1d")[0]["close"] == 100.0
+
+    opportunity = {"symbol": "BTCUSDT", "buy_exchange": "wallex", "sell_exchange": "nobitex", "timestamp": start + timedelta(seconds=15)}
+    assert manager.update_opportunity_rollups([opportunity, dict(opportunity, timestamp=start + timedelta(hours=2))])
+    assert service.get_rollups("BTCUSDT", "nobitex", "1m")[0]["sell_opportunities"] == 1
+    assert service.get_opportunity_counts("BTCUSDT", "1h") == [(start + timedelta(hours=2), 1), (start, 1)]
+    assert service.get_opportunity_counts("BTCUSDT", "1d", start=start + timedelta(days=1)) == []
+    print("  ✅ Rollups merged incrementally")
+
+def test_batch_is_one_transaction():
+    """A batch or opportunity whose rollups fail leaves no rows behind, so storing it again counts it once"""
+    print("\nTesting batch atomicity...")
+
+    manager = DatabaseManager(create_engine("sqlite://"))
+    manager.create_schema()
+    service = DatabaseIntegrationService(price_storage="both", db_manager=manager)
+    price_batch = [("BTCUSDT", {"nobitex": 100.0, "wallex": 101.0}, datetime(2024, 6, 10, 12, 0, 0))]
+    opportunity = ArbitrageOpportunity(
+        symbol="BTCUSDT", nobitex_price=100.0, wallex_price=101.0, profit_percentage=1.0, profit_amount=1.0,
+        buy_exchange="nobitex", sell_exchange="wallex", timestamp=datetime(2024, 6, 10, 12, 0, 0),
+        buy_price=100.0, sell_price=101.0
+    )
+
+    def stored():
+        with manager.engine.connect() as connection:
+            return tuple(
+                connection.execute(select(func.count()).select_from(table.__table__)).scalar()
+                for table in (PriceDataTable, PriceSnapshotTable, ArbitrageOpportunityTable)
+            )
+
+    with manager.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE price_rollups RENAME TO price_rollups_away"))
+    assert not service.store_price_batch(price_batch)
+    assert not service.store_arbitrage_opportunity(opportunity)
+    assert stored() == (0, 0, 0)
+
+    with manager.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE price_rollups_away RENAME TO price_rollups"))
+    assert service.store_price_batch(price_batch)
+    assert service.store_arbitrage_opportunity(opportunity)
+    assert stored() == (2, 1, 1)
+    assert service.get_rollups("BTCUSDT", "nobitex", "1m")[0]["sample_count"] == 1
+    assert [count for _, count in service.get_opportunity_counts("BTCUSDT", "1m")] == [1]
+    print("  ✅ Rejected batch and opportunity were rolled back as a whole")
+
+if __name__ == "__main__":
+    test_buckets_and_spreads()
+    test_incremental_merge()
+    test_batch_is_one_transaction()
+    print("\n✅ All rollup tests completed successfully!")
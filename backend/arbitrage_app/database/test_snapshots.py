@@ -0,0 +1,104 @@
+"""
+Test script for the compact price snapshot table
+This script writes, migrates and reads snapshots on a throwaway SQLite database
+"""
+
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine, select, func
+from arbitrage_app.database.models import DatabaseManager, PriceDataTable, PriceSnapshotTable, SymbolTable
+from arbitrage_app.database.integration import DatabaseIntegrationService
+
+def make_manager():
+    """DatabaseManager on its own in-memory database"""
+    manager = DatabaseManager(create_engine("sqlite://"))
+    manager.create_schema()
+    return manager
+
+def count(manager, table):
+    with manager.engine.connect() as connection:
+        return connection.execute(select(func.count()).select_from(table.__table__)).scalar()
+
+def test_snapshot_roundtrip():
+    """Snapshots store one row per symbol and read back per exchange, with spreads from single rows"""
+    print("Testing snapshot storage...")
+
+    manager = make_manager()
+    start = datetime(2024, 6, 10, 12, 0, 0)
+    price_batch = [
+        ("BTCUSDT", {"nobitex": 60000.0, "wallex": 60600.0}, start),
+        ("ETHUSDT", {"nobitex": 3000.0, "wallex": None}, start),
+        ("BTCUSDT", {"nobitex": 60100.0, "wallex": 60000.0}, start + timedelta(seconds=60)),
+    ]
+    assert manager.store_price_snapshots(price_batch)
+
+    assert count(manager, PriceSnapshotTable) == 3
+    assert manager.get_symbol_ids(["BTCUSDT", "ETHUSDT"]) == {"BTCUSDT": 1, "ETHUSDT": 2}
+
+    history = manager.get_snapshot_history("BTCUSDT")
+    assert [snapshot["timestamp"] for snapshot in history] == [start + timedelta(seconds=60), start]
+    assert history[1]["prices"] == {"nobitex": 60000.0, "wallex": 60600.0}
+
+    latest = manager.get_latest_snapshots()
+    assert latest["BTCUSDT"]["prices"]["nobitex"] == 60100.0
+    assert latest["ETHUSDT"]["prices"] == {"nobitex": 3000.0, "wallex": None}
+
+    spreads = manager.get_spread_history("BTCUSDT", "nobitex", "wallex")
+    print(f"  spreads: {spreads}")
+    assert spreads[1] == (start, 1.0)
+    assert manager.get_spread_history("ETHUSDT", "nobitex", "wallex") == []
+    print("  ✅ Snapshots stored and read")
+
+def test_migration_from_price_data():
+    """price_data rows written together become one snapshot, and re-running adds nothing"""
+    print("\nTesting price_data migration...")
+
+    manager = make_manager()
+    start = datetime(2024, 6, 10, 12, 0, 0)
+    price_rows = []
+    for minute in range(3):
+        timestamp = start + timedelta(minutes=minute)
+        price_rows.append({"symbol": "BTCUSDT", "exchange": "nobitex", "price": 60000.0 + minute, "timestamp": timestamp})
+        price_rows.append({"symbol": "BTCUSDT", "exchange": "wallex", "price": 60500.0 + minute, "timestamp": timestamp})
+    price_rows.append({"symbol": "XRPUSDT", "exchange": "wallex", "price": 0.5, "timestamp": start})
+    assert manager.store_price_data_batch(price_rows)
+
+    assert manager.migrate_price_data_to_snapshots() == 4
+    assert manager.migrate_price_data_to_snapshots() == 0
+    assert manager.get_snapshot_history("BTCUSDT")[0]["prices"] == {"nobitex": 60002.0, "wallex": 60502.0}
+    assert manager.get_latest_snapshots()["XRPUSDT"]["prices"] == {"nobitex": None, "wallex": 0.5}
+
+    assert manager.migrate_price_data_to_snapshots(delete_source=True) == 0
+    assert count(manager, PriceDataTable) == 0
+    assert count(manager, PriceSnapshotTable) == 4
+    assert count(manager, SymbolTable) == 2
+    print("  ✅ 7 price_data rows migrated into 4 snapshots")
+
+def test_integration_storage_modes():
+    """The integration service writes rows, snapshots or both"""
+    print("\nTesting price storage modes...")
+
+    manager = make_manager()
+    service = DatabaseIntegrationService(price_storage="both", db_manager=manager)
+    timestamp = datetime(2024, 6, 10, 12, 0, 0)
+
+    assert service.store_price_batch([("BTCUSDT", {"nobitex": 1.0, "wallex": 2.0}, timestamp)])
+    assert service.store_exchange_prices("ETHUSDT", {"nobitex": 3.0, "wallex": 4.0}, timestamp)
+    assert (count(manager, PriceDataTable), count(manager, PriceSnapshotTable)) == (4, 2)
+
+    service.price_storage = "snapshots"
+    assert service.store_price_batch([("BTCUSDT", {"nobitex": 1.5, "wallex": 2.5}, timestamp + timedelta(seconds=1))])
+    assert (count(manager, PriceDataTable), count(manager, PriceSnapshotTable)) == (4, 3)
+
+    try:
+        DatabaseIntegrationService(price_storage="columns")
+    except ValueError as e:
+        print(f"  Rejected: {e}")
+    else:
+        raise AssertionError("Unknown price storage should be rejected")
+    print("  ✅ Storage modes work")
+
+if __name__ == "__main__":
+    test_snapshot_roundtrip()
+    test_migration_from_price_data()
+    test_integration_storage_modes()
+    print("\n✅ All snapshot tests completed successfully!")
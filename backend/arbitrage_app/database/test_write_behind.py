@@ -0,0 +1,177 @@
+"""
+Test script for the write-behind persistence queue
+This script runs the queue against an in-memory database stand-in that can be slowed down or failed
+"""
+
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime
+from arbitrage_app.database.write_behind import WriteBehindDatabaseService
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageOpportunity
+
+class SlowDatabase:
+    """Stores writes in memory after an optional delay, or rejects them while failing"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.failing = False
+        self.failing_opportunities = False
+        self.price_batches = []
+        self.opportunities = []
+        self.released = threading.Event()
+        self.released.set()
+
+    def store_price_batch(self, price_batch):
+        self.released.wait()
+        time.sleep(self.delay)
+        if self.failing:
+            return False
+        self.price_batches.append(list(price_batch))
+        return True
+
+    def store_arbitrage_opportunity(self, opportunity):
+        if self.failing or self.failing_opportunities:
+            return False
+        self.opportunities.append(opportunity)
+        return True
+
+    def stored_symbols(self):
+        return [symbol for batch in self.price_batches for symbol, prices, timestamp in batch]
+
+def sample_opportunity(symbol="BTCUSDT"):
+    return ArbitrageOpportunity(
+        symbol=symbol,
+        nobitex_price=60000.0,
+        wallex_price=61000.0,
+        profit_percentage=1.67,
+        profit_amount=1000.0,
+        buy_exchange="nobitex",
+        sell_exchange="wallex",
+        timestamp=datetime.utcnow()
+    )
+
+def test_writes_do_not_wait_for_database():
+    """Queued writes return at once and are stored in batches, the rest on close"""
+    print("Testing write-behind batching...")
+
+    database = SlowDatabase(delay=0.2)
+    service = WriteBehindDatabaseService(database, batch_size=50, flush_interval=0.05)
+
+    start_time = time.monotonic()
+    for index in range(100):
+        service.store_exchange_prices(f"SYM{index}", {"nobitex": 1.0, "wallex": 1.1}, datetime.utcnow())
+    service.store_arbitrage_opportunity(sample_opportunity())
+    enqueue_time = time.monotonic() - start_time
+    service.close()
+
+    print(f"  101 writes queued in {enqueue_time * 1000:.1f} ms, stored in {len(database.price_batches)} transactions")
+    assert enqueue_time < 0.2
+    assert database.stored_symbols() == [f"SYM{index}" for index in range(100)]
+    assert len(database.price_batches) <= 3
+    assert len(database.opportunities) == 1
+
+    # After close, writes are stored synchronously instead of being lost
+    service.store_exchange_prices("LATE", {"nobitex": 1.0}, datetime.utcnow())
+    assert database.stored_symbols()[-1] == "LATE"
+
+def test_full_queue_policies():
+    """A full queue drops under 'drop' and spills to disk under 'spill', replaying once the database recovers"""
+    print("\nTesting full-queue policies...")
+
+    database = SlowDatabase()
+    database.released.clear()
+    service = WriteBehindDatabaseService(database, max_size=2, batch_size=1, flush_interval=0.05, full_policy="drop")
+    results = [service.store_exchange_prices(f"SYM{index}", {"nobitex": 1.0}, datetime.utcnow()) for index in range(10)]
+    database.released.set()
+    service.close()
+    print(f"  drop: {results.count(True)} queued, {service.dropped_writes} dropped")
+    assert service.dropped_writes == results.count(False) > 0
+    assert len(database.stored_symbols()) == results.count(True)
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        spill_path = os.path.join(spill_dir, "spill.jsonl")
+        database = SlowDatabase()
+        database.failing = True
+        service = WriteBehindDatabaseService(database, batch_size=10, flush_interval=0.05,
+                                             full_policy="spill", spill_path=spill_path)
+        service.store_exchange_prices("BTCUSDT", {"nobitex": 1.0, "wallex": 1.1}, datetime.utcnow())
+        service.store_arbitrage_opportunity(sample_opportunity())
+
+        # The failed flush spills both writes, and replays keep failing until the database is back
+        deadline = time.monotonic() + 5
+        while service.spilled_writes < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert service.spilled_writes >= 2
+        database.failing = False
+        while not database.opportunities and time.monotonic() < deadline:
+            time.sleep(0.01)
+        service.close()
+
+        print(f"  spill: {service.spilled_writes} spilled, replayed {database.stored_symbols()} and {len(database.opportunities)} opportunity")
+        assert database.stored_symbols() == ["BTCUSDT"]
+        assert database.opportunities[0].symbol == "BTCUSDT"
+        assert isinstance(database.opportunities[0].timestamp, datetime)
+        assert not os.path.exists(spill_path)
+        assert service.dropped_writes == 0
+
+def test_partial_failure_spills_only_failed_writes():
+    """When only the opportunities are rejected, the stored prices are not spilled and written twice"""
+    print("\nTesting partial batch failure...")
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        spill_path = os.path.join(spill_dir, "spill.jsonl")
+        database = SlowDatabase()
+        database.failing_opportunities = True
+        service = WriteBehindDatabaseService(database, batch_size=10, flush_interval=0.05,
+                                             full_policy="spill", spill_path=spill_path)
+        service.store_exchange_prices("BTCUSDT", {"nobitex": 1.0, "wallex": 1.1}, datetime.utcnow())
+        service.store_arbitrage_opportunity(sample_opportunity())
+
+        deadline = time.monotonic() + 5
+        while service.spilled_writes < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        database.failing_opportunities = False
+        while not database.opportunities and time.monotonic() < deadline:
+            time.sleep(0.01)
+        service.close()
+
+        print(f"  stored {database.stored_symbols()}, spilled {service.spilled_writes} writes")
+        assert database.stored_symbols() == ["BTCUSDT"]
+        assert len(database.opportunities) == 1
+        assert not os.path.exists(spill_path)
+
+def test_leftover_replay_file_is_recovered():
+    """A replay file left by a crash is replayed at startup, malformed lines are skipped and the spill file is kept"""
+    print("\nTesting leftover replay file...")
+
+    with tempfile.TemporaryDirectory() as spill_dir:
+        spill_path = os.path.join(spill_dir, "spill.jsonl")
+        timestamp = datetime.utcnow().isoformat()
+        with open(f"{spill_path}.replay", "w", encoding="utf-8") as replay_file:
+            replay_file.write(json.dumps({"kind": "prices", "rows": [["BTCUSDT", {"nobitex": 1.0}, timestamp]]}) + "\n")
+            replay_file.write('{"kind": "prices", "rows": [["ETHUSDT"\n')
+        with open(spill_path, "w", encoding="utf-8") as spill_file:
+            spill_file.write(json.dumps({"kind": "prices", "rows": [["XRPUSDT", {"nobitex": 2.0}, timestamp]]}) + "\n")
+
+        database = SlowDatabase()
+        service = WriteBehindDatabaseService(database, batch_size=10, flush_interval=0.05,
+                                             full_policy="spill", spill_path=spill_path)
+        deadline = time.monotonic() + 5
+        while len(database.stored_symbols()) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        service.close()
+
+        print(f"  replayed {database.stored_symbols()}, dropped {service.dropped_writes} malformed")
+        assert database.stored_symbols() == ["BTCUSDT", "XRPUSDT"]
+        assert service.dropped_writes == 1
+        assert not os.path.exists(spill_path) and not os.path.exists(f"{spill_path}.replay")
+
+if __name__ == "__main__":
+    test_writes_do_not_wait_for_database()
+    test_full_queue_policies()
+    test_partial_failure_spills_only_failed_writes()
+    test_leftover_replay_file_is_recovered()
+    print("\n✅ All write-behind tests completed successfully!")
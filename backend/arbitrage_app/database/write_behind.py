@@ -0,0 +1,333 @@
+"""
+Write-behind persistence queue for arbitrage data
+Detection hands writes to a bounded queue and a background thread applies them in batches
+"""
+
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from dataclasses import asdict
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from arbitrage_app.database.models import ArbitrageOpportunityTable, PriceDataTable
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageOpportunity
+from arbitrage_app.sample_trading import (
+    WRITE_QUEUE_MAX_SIZE,
+    WRITE_BATCH_SIZE,
+    WRITE_FLUSH_INTERVAL_SECONDS,
+    WRITE_QUEUE_FULL_POLICY,
+    WRITE_QUEUE_BLOCK_TIMEOUT_SECONDS,
+    WRITE_SPILL_PATH
+)
+
+logger = logging.getLogger(__name__)
+
+FULL_POLICIES = ("block", "drop", "spill")
+
+class WriteBehindDatabaseService:
+    """
+    Drop-in replacement for DatabaseIntegrationService that never waits on the database
+
+    Writes are queued and a background thread stores them once `batch_size`
+    writes are waiting or `flush_interval` seconds after the first one, all
+    prices of a flush in one transaction. When the queue is full the
+    `full_policy` decides what happens to a new write:
+      block: wait up to `block_timeout` seconds for room, then drop it
+      drop: drop it immediately
+      spill: append it to `spill_path`; spilled writes are replayed once the
+        queue is idle and the database accepts them again
+    Batches the database rejects are spilled under the spill policy and
+    dropped otherwise. Queue depth, flush latency and dropped writes are
+    exported through the metrics collector.
+    """
+
+    def __init__(self, database_service, metrics_collector=None, max_size: int = WRITE_QUEUE_MAX_SIZE,
+                 batch_size: int = WRITE_BATCH_SIZE, flush_interval: float = WRITE_FLUSH_INTERVAL_SECONDS,
+                 full_policy: str = WRITE_QUEUE_FULL_POLICY, block_timeout: float = WRITE_QUEUE_BLOCK_TIMEOUT_SECONDS,
+                 spill_path: str = WRITE_SPILL_PATH):
+        if full_policy not in FULL_POLICIES:
+            raise ValueError(f"Unknown write queue policy: {full_policy}. Use one of {', '.join(FULL_POLICIES)}")
+
+        self.database_service = database_service
+        self.metrics = metrics_collector
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.full_policy = full_policy
+        self.block_timeout = block_timeout
+        self.spill_path = spill_path
+        self.queue = queue.Queue(maxsize=max_size)
+        self.closed = False
+        self.dropped_writes = 0
+        self.spilled_writes = 0
+        self._spill_lock = threading.Lock()
+        self._writer = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._writer.start()
+
+    def store_arbitrage_opportunity(self, opportunity: ArbitrageOpportunity) -> bool:
+        """Queue an arbitrage opportunity for storage"""
+        return self._enqueue(("opportunity", opportunity))
+
+    def store_price_data(self, symbol: str, nobitex_price: Optional[float], wallex_price: Optional[float], timestamp: datetime) -> bool:
+        """Queue price data from both exchanges for storage"""
+        return self.store_exchange_prices(symbol, {'nobitex': nobitex_price, 'wallex': wallex_price}, timestamp)
+
+    def store_exchange_prices(self, symbol: str, prices: Dict[str, Optional[float]], timestamp: datetime) -> bool:
+        """Queue price data from any number of exchanges for storage"""
+        return self.store_price_batch([(symbol, prices, timestamp)])
+
+    def store_price_batch(self, price_batch: List[Tuple[str, Dict[str, Optional[float]], datetime]]) -> bool:
+        """Queue the prices of many symbols for storage as one write"""
+        return self._enqueue(("prices", price_batch))
+
+    def get_recent_opportunities(self, limit: int = 100) -> List[ArbitrageOpportunityTable]:
+        """Get recent arbitrage opportunities from database"""
+        return self.database_service.get_recent_opportunities(limit)
+
+    def get_opportunities_by_symbol(self, symbol: str, limit: int = 50) -> List[ArbitrageOpportunityTable]:
+        """Get arbitrage opportunities for a specific symbol"""
+        return self.database_service.get_opportunities_by_symbol(symbol, limit)
+
+    def get_price_history(self, symbol: str, exchange: str, limit: int = 100) -> List[PriceDataTable]:
+        """Get price history for a symbol and exchange"""
+        return self.database_service.get_price_history(symbol, exchange, limit)
+
+    def stream_price_history(self, symbol: str, exchange: str, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None, descending: bool = False) -> Iterator[tuple]:
+        """Stream (id, timestamp, price) rows of a symbol on an exchange in constant memory, oldest first"""
+        return self.database_service.stream_price_history(symbol, exchange, start, end, descending)
+
+    def stream_opportunities(self, symbol: Optional[str] = None, start: Optional[datetime] = None,
+                             end: Optional[datetime] = None, descending: bool = False) -> Iterator[tuple]:
+        """Stream arbitrage opportunity rows in constant memory, oldest first"""
+        return self.database_service.stream_opportunities(symbol, start, end, descending)
+
+    def price_history_batches(self, symbol: str, exchange: str, start: Optional[datetime] = None,
+                              end: Optional[datetime] = None) -> Iterator[Dict[str, list]]:
+        """Stream the price history of a symbol on an exchange as column batches"""
+        return self.database_service.price_history_batches(symbol, exchange, start, end)
+
+    def opportunity_batches(self, symbol: Optional[str] = None, start: Optional[datetime] = None,
+                            end: Optional[datetime] = None) -> Iterator[Dict[str, list]]:
+        """Stream arbitrage opportunities as column batches"""
+        return self.database_service.opportunity_batches(symbol, start, end)
+
+    def scan_history(self, table_name: str, start: datetime, end: datetime, symbol: Optional[str] = None) -> Iterator[Dict[str, list]]:
+        """Read a time range of price_data or arbitrage_opportunities from the Parquet archive and the database as one history"""
+        return self.database_service.scan_history(table_name, start, end, symbol)
+
+    def get_snapshot_history(self, symbol: str, limit: int = 100) -> List[dict]:
+        """Get price snapshots of a symbol with every exchange's price, newest first"""
+        return self.database_service.get_snapshot_history(symbol, limit)
+
+    def get_latest_snapshots(self) -> Dict[str, dict]:
+        """Get the latest price snapshot of every symbol"""
+        return self.database_service.get_latest_snapshots()
+
+    def get_spread_history(self, symbol: str, buy_exchange: str, sell_exchange: str, limit: int = 100) -> List[Tuple[datetime, float]]:
+        """Get the spread between two exchanges for a symbol, newest first"""
+        return self.database_service.get_spread_history(symbol, buy_exchange, sell_exchange, limit)
+
+    def get_rollups(self, symbol: str, exchange: str, resolution: str = "1h", start: Optional[datetime] = None,
+                    end: Optional[datetime] = None, limit: int = 1000) -> List[dict]:
+        """Get OHLC, spread and opportunity-count buckets of a symbol on an exchange, newest first"""
+        return self.database_service.get_rollups(symbol, exchange, resolution, start, end, limit)
+
+    def get_opportunity_counts(self, symbol: str, resolution: str = "1h", start: Optional[datetime] = None,
+                               end: Optional[datetime] = None) -> List[Tuple[datetime, int]]:
+        """Get the number of arbitrage opportunities on a symbol per bucket, newest first"""
+        return self.database_service.get_opportunity_counts(symbol, resolution, start, end)
+
+    def close(self, timeout: Optional[float] = None):
+        """
+        Flush every queued write and stop the writer thread
+
+        Writes arriving after close are stored synchronously.
+
+        Args:
+            timeout: Seconds to wait for the flush; waits until done if None
+        """
+        if self.closed:
+            return
+        self.closed = True
+        # The sentinel queues behind every pending write
+        self.queue.put(None)
+        self._writer.join(timeout)
+        if self._writer.is_alive():
+            logger.warning(f"Write-behind queue still flushing {self.queue.qsize()} writes after {timeout} seconds")
+        else:
+            logger.info("Write-behind queue flushed")
+
+    def _enqueue(self, write) -> bool:
+        """Hand a write to the writer thread, applying the full-queue policy"""
+        if self.closed:
+            return not self._apply([write])
+
+        try:
+            if self.full_policy == "block":
+                self.queue.put(write, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(write)
+        except queue.Full:
+            if self.full_policy == "spill":
+                return self._spill([write])
+            self._drop(1, "queue_full")
+            return False
+
+        if self.metrics:
+            self.metrics.record_write_queue_depth(self.queue.qsize())
+        return True
+
+    def _run(self):
+        """Writer thread: collect writes into batches and store them"""
+        while True:
+            try:
+                first_write = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._replay_spill()
+                continue
+
+            if first_write is None:
+                return
+
+            batch = [first_write]
+            deadline = time.monotonic() + self.flush_interval
+            stop = False
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    write = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if write is None:
+                    stop = True
+                    break
+                batch.append(write)
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[tuple]):
+        """Store one batch of writes and record how long it took"""
+        start_time = time.monotonic()
+        failed = self._apply(batch)
+        flush_time = time.monotonic() - start_time
+
+        if self.metrics:
+            self.metrics.record_write_flush(flush_time, len(batch))
+            self.metrics.record_write_queue_depth(self.queue.qsize())
+
+        if failed:
+            if self.full_policy == "spill":
+                self._spill(failed)
+            else:
+                self._drop(len(failed), "write_failed")
+
+    def _apply(self, batch: List[tuple]) -> List[tuple]:
+        """
+        Store a list of writes: all prices in one transaction, then each opportunity on its own
+
+        Returns:
+            The writes that were not stored; stored ones must not be written again
+        """
+        price_writes = [write for write in batch if write[0] == "prices"]
+        opportunity_writes = [write for write in batch if write[0] == "opportunity"]
+        failed = []
+
+        price_batch = [row for kind, payload in price_writes for row in payload]
+        if price_batch and not self._store(self.database_service.store_price_batch, price_batch, f"{len(price_writes)} queued price writes"):
+            failed.extend(price_writes)
+        for write in opportunity_writes:
+            if not self._store(self.database_service.store_arbitrage_opportunity, write[1], "a queued opportunity"):
+                failed.append(write)
+        return failed
+
+    def _store(self, store, payload, description: str) -> bool:
+        """Call a storage method, treating an exception like a rejected write"""
+        try:
+            return store(payload)
+        except Exception as e:
+            logger.error(f"Error storing {description}: {e}")
+            return False
+
+    def _drop(self, count: int, reason: str):
+        """Count writes that will never be stored"""
+        self.dropped_writes += count
+        logger.warning(f"Dropped {count} database writes ({reason})")
+        if self.metrics:
+            self.metrics.record_write_dropped(reason, count)
+
+    def _spill(self, batch: List[tuple]) -> bool:
+        """Append writes to the spill file for a later replay"""
+        try:
+            with self._spill_lock, open(self.spill_path, "a", encoding="utf-8") as spill_file:
+                for kind, payload in batch:
+                    if kind == "prices":
+                        rows = [[symbol, prices, timestamp.isoformat()] for symbol, prices, timestamp in payload]
+                        spill_file.write(json.dumps({"kind": kind, "rows": rows}) + "\n")
+                    else:
+                        spill_file.write(json.dumps({"kind": kind, "opportunity": asdict(payload)}, default=str) + "\n")
+        except OSError as e:
+            logger.error(f"Error spilling {len(batch)} database writes to {self.spill_path}: {e}")
+            self._drop(len(batch), "spill_failed")
+            return False
+
+        self.spilled_writes += len(batch)
+        if self.metrics:
+            self.metrics.record_write_spilled(len(batch))
+        return True
+
+    def _replay_spill(self):
+        """
+        Store spilled writes again while the queue is idle; keep them if the database still fails
+
+        The spill file is renamed to `<spill_path>.replay` first, so writes
+        spilled during the replay go to a fresh file. A replay file left by an
+        earlier run or a failed read is replayed before the spill file is
+        touched again, so it is never overwritten.
+        """
+        replay_path = f"{self.spill_path}.replay"
+        with self._spill_lock:
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spill_path):
+                    return
+                os.replace(self.spill_path, replay_path)
+
+        batch = []
+        try:
+            with open(replay_path, encoding="utf-8") as replay_file:
+                for line_number, line in enumerate(replay_file, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        batch.append(self._load_spilled(json.loads(line)))
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.error(f"Skipping malformed spilled write on line {line_number} of {replay_path}: {e}")
+                        self._drop(1, "spill_malformed")
+        except OSError as e:
+            # The replay file stays in place and is read again on the next idle period
+            logger.error(f"Error reading spilled writes from {replay_path}: {e}")
+            return
+
+        for start in range(0, len(batch), self.batch_size):
+            failed = self._apply(batch[start:start + self.batch_size])
+            if failed:
+                # Keep what is left for the next idle period
+                self._spill(failed + batch[start + self.batch_size:])
+                break
+        else:
+            logger.info(f"Replayed {len(batch)} spilled database writes")
+        os.remove(replay_path)
+
+    def _load_spilled(self, record: dict) -> tuple:
+        """Turn a spill file record back into a queued write"""
+        if record["kind"] == "prices":
+            return "prices", [(symbol, prices, datetime.fromisoformat(timestamp)) for symbol, prices, timestamp in record["rows"]]
+
+        opportunity = record["opportunity"]
+        timestamp = opportunity["timestamp"]
+        opportunity["timestamp"] = datetime.fromisoformat(timestamp) if isinstance(timestamp, str) else timestamp
+        return "opportunity", ArbitrageOpportunity(**opportunity)
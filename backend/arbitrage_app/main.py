@@ -6,13 +6,18 @@ Main application that runs the arbitrage detection service continuously
 import sys
 import time
 import signal
+import asyncio
 import logging
 from datetime import datetime
+from typing import List, Optional
 
 from arbitrage_app.bot.notifier.notification_service import ArbitrageNotificationService
-from arbitrage_app.sample_trading import CHECK_INTERVAL_SECONDS
+from arbitrage_app.sample_trading import CHECK_INTERVAL_SECONDS, WRITE_BEHIND_ENABLED, PARTITION_MAINTENANCE_INTERVAL_SECONDS, METRICS_PORT, WRITE_SPILL_PATH
 from arbitrage_app.prometheus_adapter.metrics import PrometheusMetrics, start_metrics_server
 from arbitrage_app.database.integration import DatabaseIntegrationService
+from arbitrage_app.database.write_behind import WriteBehindDatabaseService
+from arbitrage_app.database.models import init_database
+from arbitrage_app.database.partitioning import PartitionMaintenanceThread
 
 # Configure logging
 logging.basicConfig(
@@ -25,11 +30,27 @@ logger = logging.getLogger(__name__)
 class ArbitrageApp:
     """Main application class for continuous arbitrage detection"""
     
-    def __init__(self):
+    def __init__(self, trading_pairs: Optional[List[str]] = None, metrics_port: Optional[int] = METRICS_PORT, primary: bool = True,
+                 spill_path: str = WRITE_SPILL_PATH):
+        """
+        Args:
+            trading_pairs: Pairs to scan, TRADING_PAIRS by default; sharded workers scan a slice
+            metrics_port: Port of the metrics server, or None when a supervisor exports the metrics
+            primary: Whether this process sends start and stop notifications and maintains partitions
+            spill_path: File the write-behind queue spills to; every process needs its own
+        """
         self.start_time = time.time()
+        self.metrics_port = metrics_port
+        self.primary = primary
         self.metrics = PrometheusMetrics(self.start_time)
-        self.database_service = DatabaseIntegrationService()
-        self.service = ArbitrageNotificationService(self.metrics, self.database_service)
+        # The only place the schema is set up; importing the app never touches the database
+        self.db_manager = init_database()
+        self.database_service = DatabaseIntegrationService(db_manager=self.db_manager)
+        if WRITE_BEHIND_ENABLED:
+            # Detection only queues writes; a slow database no longer delays it
+            self.database_service = WriteBehindDatabaseService(self.database_service, self.metrics, spill_path=spill_path)
+        self.service = ArbitrageNotificationService(self.metrics, self.database_service, trading_pairs=trading_pairs)
+        self.partition_maintenance = None
         self.running = False
         self.scan_count = 0
         self.total_opportunities = 0
@@ -52,9 +73,15 @@ class ArbitrageApp:
         self.running = True
         self.start_time = time.time()
         
+        # Keep partitions created ahead of time and drop expired ones (PostgreSQL only)
+        if self.primary and self.db_manager.partition_manager.enabled:
+            self.partition_maintenance = PartitionMaintenanceThread(self.db_manager.partition_manager, PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+            self.partition_maintenance.start()
+        
         # Send startup notification
         try:
-            self.service.send_startup_notification()
+            if self.primary:
+                self.service.send_startup_notification()
         except Exception as e:
             logger.warning(f"Failed to send startup notification: {e}")
         
@@ -64,25 +91,34 @@ class ArbitrageApp:
         logger.info(f"  Bale configured: {status['bale_configured']}")
         logger.info(f"  Trading pairs: {status['trading_pairs_count']}")
         logger.info(f"  Arbitrage threshold: {status['arbitrage_threshold']*100}%")
+        logger.info(f"  Scan mode: {status['scan_mode']}")
+        logger.info(f"  Run mode: {status['run_mode']}")
         logger.info(f"  Check interval: {CHECK_INTERVAL_SECONDS} seconds")        
         # Start Prometheus metrics server
-        metrics_port = 8000
-        start_metrics_server(metrics_port)
+        if self.metrics_port is not None:
+            start_metrics_server(self.metrics_port)
         
         logger.info(f"✅ Service started successfully!")
         logger.info(f"🔄 Monitoring {status['trading_pairs_count']} trading pairs every {CHECK_INTERVAL_SECONDS} seconds")
-        logger.info(f"📊 Prometheus metrics available at http://localhost:{metrics_port}/metrics")
+        if self.metrics_port is not None:
+            logger.info(f"📊 Prometheus metrics available at http://localhost:{self.metrics_port}/metrics")
         logger.info("Press Ctrl+C to stop the service")
         logger.info("-" * 60)
         
         # Main loop
         try:
-            while self.running:
-                running_time = time.time()
-                self._scan_cycle()
-                elapsed_time = time.time() - running_time
-                if elapsed_time < CHECK_INTERVAL_SECONDS:
-                    time.sleep(CHECK_INTERVAL_SECONDS - elapsed_time)
+            if self.service.run_mode == "async":
+                asyncio.run(self._async_main_loop())
+            elif self.service.run_mode == "stream":
+                asyncio.run(self._stream_main_loop())
+            else:
+                while self.running:
+                    running_time = time.time()
+                    self._scan_cycle()
+                    elapsed_time = time.time() - running_time
+                    self.metrics.record_scan_duration(elapsed_time, CHECK_INTERVAL_SECONDS)
+                    if elapsed_time < CHECK_INTERVAL_SECONDS:
+                        time.sleep(CHECK_INTERVAL_SECONDS - elapsed_time)
                 
         except KeyboardInterrupt:
             logger.info("Received keyboard interrupt. Shutting down...")
@@ -111,7 +147,7 @@ class ArbitrageApp:
         
         # Send shutdown notification if possible
         try:
-            if self.service.bale_notifier:
+            if self.primary and self.service.bale_notifier:
                 shutdown_message = f"""
 🛑 * Arbitrage Detection Service Stopped *
 
@@ -127,29 +163,103 @@ _ Service has been stopped. _
         except Exception as e:
             logger.warning(f"Failed to send shutdown notification: {e}")
         
+        # Release pooled HTTP connections
+        try:
+            self.service.close()
+        except Exception as e:
+            logger.warning(f"Failed to close HTTP sessions: {e}")
+        
+        # Store everything still waiting in the write-behind queue
+        try:
+            self.database_service.close()
+        except Exception as e:
+            logger.warning(f"Failed to flush database writes: {e}")
+        
+        if self.partition_maintenance:
+            self.partition_maintenance.stop()
+        
         logger.info("✅ Service stopped successfully")
     
+    async def _async_main_loop(self):
+        """Run scan cycles on the event loop until the service is stopped"""
+        try:
+            while self.running:
+                running_time = time.time()
+                await self._async_scan_cycle()
+                elapsed_time = time.time() - running_time
+                self.metrics.record_scan_duration(elapsed_time, CHECK_INTERVAL_SECONDS)
+                if elapsed_time < CHECK_INTERVAL_SECONDS:
+                    await asyncio.sleep(CHECK_INTERVAL_SECONDS - elapsed_time)
+        finally:
+            await self.service.async_close()
+    
+    async def _stream_main_loop(self):
+        """Detect opportunities tick by tick from the exchange streams until the service is stopped"""
+        stream_task = asyncio.create_task(self.service.stream_and_notify(self._record_stream_opportunity))
+        try:
+            while self.running and not stream_task.done():
+                await asyncio.sleep(1)
+            if stream_task.done():
+                stream_task.result()
+        finally:
+            self.service.detector.stop()
+            stream_task.cancel()
+            await asyncio.gather(stream_task, return_exceptions=True)
+    
+    def _record_stream_opportunity(self, opportunity):
+        """Count an opportunity found by the streaming detector"""
+        self.total_opportunities += 1
+        self.last_scan_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    
     def _scan_cycle(self):
         """Execute one arbitrage scanning cycle"""
         if not self.running:
             return
             
         try:
-            self.scan_count += 1
-            self.last_scan_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            logger.info(f"🔍 Starting scan #{self.scan_count} at {self.last_scan_time}")
+            self._begin_scan()
             
             # Run the arbitrage scan
             opportunities = self.service.scan_and_notify()
             
-            # Update statistics
-            self.total_opportunities += len(opportunities)
+            self._finish_scan(opportunities)
+                
+        except Exception as e:
+            self._handle_scan_error(e)
+    
+    async def _async_scan_cycle(self):
+        """Execute one arbitrage scanning cycle on the event loop"""
+        if not self.running:
+            return
+            
+        try:
+            self._begin_scan()
             
-            # Update Prometheus metrics
-            self.metrics.update_service_metrics(self.scan_count)
+            # Run the arbitrage scan
+            opportunities = await self.service.async_scan_and_notify()
             
-            # Log results
+            self._finish_scan(opportunities)
+                
+        except Exception as e:
+            await asyncio.get_running_loop().run_in_executor(None, self._handle_scan_error, e)
+    
+    def _begin_scan(self):
+        """Count and log the start of a scan"""
+        self.scan_count += 1
+        self.last_scan_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        
+        logger.info(f"🔍 Starting scan #{self.scan_count} at {self.last_scan_time}")
+    
+    def _finish_scan(self, opportunities):
+        """Update statistics and metrics and log the results of a scan"""
+        # Update statistics
+        self.total_opportunities += len(opportunities)
+        
+        # Update Prometheus metrics
+        self.metrics.update_service_metrics(self.scan_count)
+        
+        # Log results
+        with self.metrics.time_stage("logging"):
             if opportunities:
                 logger.info(f"🎯 Found {len(opportunities)} arbitrage opportunities:")
                 for opp in opportunities:
@@ -161,16 +271,17 @@ _ Service has been stopped. _
             # Log periodic statistics
             if self.scan_count % 10 == 0:  # Every 10 scans
                 self._log_periodic_stats()
-                
-        except Exception as e:
-            logger.error(f"Error in scan cycle #{self.scan_count}: {e}")
-            
-            # Send error notification
-            try:
-                if self.service.bale_notifier:
-                    self.service.bale_notifier.send_error_notification(f"Scan error: {str(e)}")
-            except Exception as notify_error:
-                logger.error(f"Failed to send error notification: {notify_error}")
+    
+    def _handle_scan_error(self, error: Exception):
+        """Log a failed scan cycle and send an error notification"""
+        logger.error(f"Error in scan cycle #{self.scan_count}: {error}")
+        
+        # Send error notification
+        try:
+            if self.service.bale_notifier:
+                self.service.bale_notifier.send_error_notification(f"Scan error: {str(error)}")
+        except Exception as notify_error:
+            logger.error(f"Failed to send error notification: {notify_error}")
     
     def _log_periodic_stats(self):
         """Log periodic statistics"""
@@ -0,0 +1,76 @@
+"""
+Benchmark of /metrics render time against the number of per-symbol series
+Run directly: python -m arbitrage_app.prometheus_adapter.bench_metrics [runs]
+
+For growing symbol universes on three exchanges, fills a scratch registry with the
+service's per-symbol metrics, once with every symbol labelled and once through
+SymbolLabelLimiter with METRICS_SYMBOL_TOP_K, and times generate_latest.
+"""
+
+import random
+import statistics
+import sys
+import time
+from itertools import permutations
+from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from arbitrage_app.prometheus_adapter.cardinality import SymbolLabelLimiter
+from arbitrage_app.sample_trading import METRICS_SYMBOL_TOP_K, METRICS_SYMBOL_ALLOWLIST
+
+SYMBOL_COUNTS = [15, 100, 500, 1000, 5000]
+EXCHANGES = ["nobitex", "wallex", "third"]
+
+def build_registry():
+    """Scratch registry with the shapes of the service's per-symbol metrics"""
+    registry = CollectorRegistry()
+    metrics = {
+        "price": Gauge("exchange_price", "Price", ["symbol", "exchange"], registry=registry),
+        "difference": Gauge("price_difference_percentage", "Difference", ["symbol"], registry=registry),
+        "opportunities": Counter("arbitrage_opportunities_total", "Opportunities",
+                                 ["symbol", "buy_exchange", "sell_exchange"], registry=registry),
+        "age": Histogram("quote_age_seconds", "Quote age", ["symbol", "exchange"], registry=registry,
+                         buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0])
+    }
+    return registry, metrics
+
+def fill(metrics, symbols, limiter):
+    """Record one scan of every symbol, with an opportunity on every tenth"""
+    randomizer = random.Random(0)
+    exchange_pairs = list(permutations(EXCHANGES, 2))
+    for index, symbol in enumerate(symbols):
+        if index % 10 == 0:
+            limiter.observe(symbol, randomizer.randint(1, 100))
+            buy_exchange, sell_exchange = randomizer.choice(exchange_pairs)
+            limiter.record(metrics["opportunities"], symbol, lambda series: series.inc(), buy_exchange, sell_exchange)
+        for exchange in EXCHANGES:
+            age, price = randomizer.random() * 10, randomizer.random() * 1000
+            limiter.record(metrics["age"], symbol, lambda series: series.observe(age), exchange)
+            limiter.record(metrics["price"], symbol, lambda series: series.set(price), exchange, other=False)
+        difference = randomizer.random()
+        limiter.record(metrics["difference"], symbol, lambda series: series.set(difference), other=False)
+
+def render(symbol_count, top_k, runs):
+    """Series count, payload size and render times for one symbol universe"""
+    registry, metrics = build_registry()
+    limiter = SymbolLabelLimiter(top_k, METRICS_SYMBOL_ALLOWLIST)
+    fill(metrics, [f"SYM{index}USDT" for index in range(symbol_count)], limiter)
+
+    series = sum(len(metric.samples) for metric in registry.collect())
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        payload = generate_latest(registry)
+        timings.append((time.perf_counter() - start) * 1000)
+    return series, len(payload), timings
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    print(f"generate_latest over {len(EXCHANGES)} exchanges, median of {runs} renders")
+    print(f"  {'symbols':>7}  {'labels':<12} {'series':>8} {'payload':>10} {'render':>10}")
+    for symbol_count in SYMBOL_COUNTS:
+        for name, top_k in (("all", None), (f"top {METRICS_SYMBOL_TOP_K}", METRICS_SYMBOL_TOP_K)):
+            series, payload_bytes, timings = render(symbol_count, top_k, runs)
+            print(f"  {symbol_count:>7}  {name:<12} {series:>8} {payload_bytes / 1024:>7.0f} KB "
+                  f"{statistics.median(timings):>7.2f} ms")
+
+if __name__ == "__main__":
+    main()
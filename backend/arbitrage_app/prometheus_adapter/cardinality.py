@@ -0,0 +1,99 @@
+"""
+Bounded symbol labels for per-symbol metrics
+Only the allow-listed symbols and the top-K symbols by opportunities get their own series; the rest share OTHER_SYMBOL
+"""
+
+import threading
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+from arbitrage_app.sample_trading import METRICS_SYMBOL_TOP_K, METRICS_SYMBOL_ALLOWLIST
+
+OTHER_SYMBOL = "other"
+
+class SymbolLabelLimiter:
+    """
+    Decides which symbols are exported under their own label
+
+    Allow-listed symbols are always tracked. Up to `top_k` more are tracked,
+    first come first served until the slots fill; after that an untracked
+    symbol takes the slot of the lowest-scoring tracked one once its score is
+    strictly higher, so ties never churn series. Scores only grow.
+
+    Series written through record() are remembered per tracked symbol and
+    removed with metric.remove() when the symbol is evicted. Eviction and
+    record() take the same lock, so an evicted symbol's series cannot be
+    recreated between choosing its label and updating it.
+    """
+
+    def __init__(self, top_k: Optional[int] = METRICS_SYMBOL_TOP_K, allowlist: Iterable[str] = METRICS_SYMBOL_ALLOWLIST):
+        self.top_k = top_k
+        self.allowlist = set(allowlist)
+        self.scores = Counter()
+        self.tracked = set()
+        # Tracked symbol -> (metric, label values) of every series written for it
+        self.series: Dict[str, Set[Tuple[object, Tuple[str, ...]]]] = {}
+        self._lock = threading.Lock()
+
+    def label(self, symbol: str) -> str:
+        """Label value to export a symbol under, claiming a free slot if one is left"""
+        if self.top_k is None or symbol in self.allowlist or symbol in self.tracked:
+            return symbol
+        with self._lock:
+            return self._claim(symbol)
+
+    def _claim(self, symbol: str) -> str:
+        """label() for a caller holding the lock"""
+        if self.top_k is None or symbol in self.allowlist or symbol in self.tracked:
+            return symbol
+        if len(self.tracked) < self.top_k:
+            self.tracked.add(symbol)
+            return symbol
+        return OTHER_SYMBOL
+
+    def record(self, metric, symbol: str, update: Callable, *labels: str, other: bool = True):
+        """
+        Update the series of a symbol in a per-symbol metric
+
+        Args:
+            metric: Counter, Gauge or Histogram whose first label is the symbol
+            symbol: Trading pair symbol
+            update: Called with the labelled series, e.g. lambda series: series.inc()
+            labels: Values of the metric's other labels, in order
+            other: Record untracked symbols under OTHER_SYMBOL; gauges pass False,
+                since one last value shared by many symbols means nothing
+        """
+        with self._lock:
+            label = self._claim(symbol)
+            if label == OTHER_SYMBOL and not other:
+                return
+            values = (label, *labels)
+            if symbol in self.tracked:
+                self.series.setdefault(symbol, set()).add((metric, values))
+            update(metric.labels(*values))
+
+    def observe(self, symbol: str, weight: float = 1.0) -> Optional[str]:
+        """
+        Add to a symbol's score, promoting it into the top K if it now outranks a tracked symbol
+
+        Returns:
+            The evicted symbol, whose recorded series were removed, or None
+        """
+        if self.top_k is None or symbol in self.allowlist:
+            return None
+        with self._lock:
+            self.scores[symbol] += weight
+            if symbol in self.tracked:
+                return None
+            if len(self.tracked) < self.top_k:
+                self.tracked.add(symbol)
+                return None
+            if not self.tracked:
+                return None
+            lowest = min(self.tracked, key=lambda tracked: self.scores[tracked])
+            if self.scores[symbol] <= self.scores[lowest]:
+                return None
+            self.tracked.remove(lowest)
+            self.tracked.add(symbol)
+            for metric, values in self.series.pop(lowest, ()):
+                metric.remove(*values)
+            return lowest
@@ -2,10 +2,19 @@
 Prometheus metrics collection for Arbitrage Detection Service
 """
 
+import os
 import time
 import logging
-from prometheus_client import Counter, Histogram, Gauge, start_http_server, generate_latest
+import threading
+from contextlib import contextmanager
+from wsgiref.simple_server import WSGIRequestHandler, make_server
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Histogram, Gauge, make_wsgi_app, generate_latest
+from prometheus_client.exposition import ThreadingWSGIServer
 from typing import Dict, Optional
+from arbitrage_app.prometheus_adapter.cardinality import SymbolLabelLimiter
+from arbitrage_app.prometheus_adapter.multiprocess import MULTIPROCESS_ENV
+from arbitrage_app.prometheus_adapter.profiler import PROFILE_PATH, profiler_app
+from arbitrage_app.sample_trading import PROFILER_ENABLED, METRICS_PORT, METRICS_SYMBOL_TOP_K
 
 logger = logging.getLogger(__name__)
 
@@ -47,17 +56,23 @@ arbitrage_discovery_rate = Counter(
     'Rate of arbitrage opportunity discoveries per interval'
 )
 
+# Gauges say how sharded workers combine in multiprocess mode (see multiprocess.py): per-symbol
+# values come from the one worker scanning the symbol, budgets and queues add up, and the
+# "live" modes drop the values of workers that have exited. Single-process mode ignores it.
+
 # Price difference metrics for each currency pair
 price_difference_gauge = Gauge(
     'price_difference_percentage',
     'Last observed price difference percentage between exchanges',
-    ['symbol']
+    ['symbol'],
+    multiprocess_mode='livemostrecent'
 )
 
 # Service health metrics
 service_uptime = Gauge(
     'service_uptime_seconds',
-    'Service uptime in seconds'
+    'Service uptime in seconds',
+    multiprocess_mode='livemax'
 )
 
 service_scans_total = Counter(
@@ -69,21 +84,181 @@ service_scans_total = Counter(
 nobitex_price_gauge = Gauge(
     'nobitex_price',
     'Last observed price from Nobitex',
-    ['symbol']
+    ['symbol'],
+    multiprocess_mode='livemostrecent'
 )
 
 wallex_price_gauge = Gauge(
     'wallex_price',
     'Last observed price from Wallex',
+    ['symbol'],
+    multiprocess_mode='livemostrecent'
+)
+
+exchange_price_gauge = Gauge(
+    'exchange_price',
+    'Last observed price from any configured exchange',
+    ['symbol', 'exchange'],
+    multiprocess_mode='livemostrecent'
+)
+
+# HTTP connection pool metrics
+http_connections_opened_total = Counter(
+    'http_connections_opened_total',
+    'Total number of new HTTP connections opened by pooled sessions',
+    ['client']  # 'nobitex', 'wallex' or 'bale'
+)
+
+http_pooled_requests_total = Counter(
+    'http_pooled_requests_total',
+    'Total number of HTTP requests sent through pooled sessions',
+    ['client']
+)
+
+# Rate limiter metrics
+rate_limiter_wait_seconds = Histogram(
+    'rate_limiter_wait_seconds',
+    'Time requests waited for a rate limiter token',
+    ['exchange', 'endpoint'],
+    buckets=[0.0, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0]
+)
+
+rate_limiter_tokens_remaining = Gauge(
+    'rate_limiter_tokens_remaining',
+    'Tokens left in the rate limiter bucket after the last request',
+    ['exchange', 'endpoint'],
+    multiprocess_mode='livesum'
+)
+
+rate_limiter_learned_requests_per_minute = Gauge(
+    'rate_limiter_learned_requests_per_minute',
+    'Request budget the adaptive rate limiter currently allows',
+    ['exchange', 'endpoint'],
+    multiprocess_mode='livesum'
+)
+
+rate_limiter_throttled_total = Counter(
+    'rate_limiter_throttled_total',
+    'Total number of HTTP 429 responses received from exchanges',
+    ['exchange', 'endpoint']
+)
+
+# Streaming metrics
+stream_ticks_total = Counter(
+    'stream_ticks_total',
+    'Total number of trade ticks received from exchange WebSocket streams',
+    ['exchange']
+)
+
+arbitrage_detection_latency_seconds = Histogram(
+    'arbitrage_detection_latency_seconds',
+    'Time from receiving a streamed tick to finishing arbitrage evaluation of its symbol',
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5]
+)
+
+# Database write-behind queue metrics
+write_queue_depth = Gauge(
+    'write_queue_depth',
+    'Database writes waiting in the write-behind queue',
+    multiprocess_mode='livesum'
+)
+
+write_queue_flush_seconds = Histogram(
+    'write_queue_flush_seconds',
+    'Time taken to store one batch of queued database writes',
+    buckets=[0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0]
+)
+
+write_queue_flushed_total = Counter(
+    'write_queue_flushed_total',
+    'Total number of queued database writes handed to the database'
+)
+
+write_queue_dropped_total = Counter(
+    'write_queue_dropped_total',
+    'Total number of database writes dropped by the write-behind queue',
+    ['reason']  # 'queue_full', 'write_failed', 'spill_failed' or 'spill_malformed'
+)
+
+write_queue_spilled_total = Counter(
+    'write_queue_spilled_total',
+    'Total number of database writes spilled to disk by the write-behind queue'
+)
+
+# Scan pipeline metrics. Stages nest: fetch covers rate_limit_wait, http and json_decode,
+# evaluate covers db_write; notify and logging follow them.
+scan_stage_seconds = Histogram(
+    'scan_stage_seconds',
+    'Time spent in one stage of the scan pipeline',
+    ['stage', 'exchange'],  # exchange is 'all' for stages not tied to one exchange
+    buckets=[0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0]
+)
+
+scan_duration_seconds = Histogram(
+    'scan_duration_seconds',
+    'Time taken by one complete scan cycle',
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 15.0, 30.0, 60.0, 120.0]
+)
+
+scan_interval_utilization = Gauge(
+    'scan_interval_utilization_ratio',
+    'Duration of the last scan divided by CHECK_INTERVAL_SECONDS; above 1 the scan overran its interval',
+    multiprocess_mode='livemax'
+)
+
+scan_overruns_total = Counter(
+    'scan_overruns_total',
+    'Total number of scans that took longer than CHECK_INTERVAL_SECONDS'
+)
+
+# Quote freshness: a quote's time is its exchange trade time, or its receive time if the exchange reports none
+quote_age_seconds = Histogram(
+    'quote_age_seconds',
+    'Age of a quote when it is evaluated for arbitrage',
+    ['symbol', 'exchange'],
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0]
+)
+
+quote_age_gauge = Gauge(
+    'quote_age_last_seconds',
+    'Age of the last quote of a symbol evaluated for arbitrage',
+    ['symbol', 'exchange'],
+    multiprocess_mode='livemostrecent'
+)
+
+quote_skew_seconds = Histogram(
+    'quote_skew_seconds',
+    'Time between the oldest and newest quote compared for a symbol (Nobitex vs Wallex with two exchanges)',
+    ['symbol'],
+    buckets=[0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0, 3600.0]
+)
+
+quote_skew_gauge = Gauge(
+    'quote_skew_last_seconds',
+    'Time between the oldest and newest quote in the last evaluation of a symbol',
+    ['symbol'],
+    multiprocess_mode='livemostrecent'
+)
+
+stale_quotes_discarded_total = Counter(
+    'stale_quotes_discarded_total',
+    'Total number of evaluations discarded because the quotes were further apart than MAX_QUOTE_SKEW_SECONDS',
     ['symbol']
 )
 
+# Metrics labelled per symbol are written through SymbolLabelLimiter.record (see cardinality.py).
+# Symbols outside the top K are counted under symbol="other" in counters and histograms and are
+# not exported by gauges; evicted symbols lose their series. Sharded workers label every symbol
+# they scan and the exporter applies the top K across all workers (see multiprocess.py).
+symbol_labels = SymbolLabelLimiter(None if os.environ.get(MULTIPROCESS_ENV) else METRICS_SYMBOL_TOP_K)
+
 class PrometheusMetrics:
     """Prometheus metrics collector for the arbitrage service"""
     
     def __init__(self, start_time: float):
         self.start_time = start_time
         self.last_arbitrage_count = 0
+        self.symbol_labels = symbol_labels
     
     def record_nobitex_request(self, success: bool, response_time: float):
         """Record a Nobitex API request"""
@@ -101,27 +276,107 @@ class PrometheusMetrics:
         if success:
             wallex_response_time.observe(response_time)
     
+    def record_http_pool_usage(self, client: str, new_connections: int, requests_sent: int):
+        """Record connections opened and requests sent by a pooled HTTP session"""
+        if new_connections:
+            http_connections_opened_total.labels(client=client).inc(new_connections)
+        if requests_sent:
+            http_pooled_requests_total.labels(client=client).inc(requests_sent)
+    
+    def record_rate_limit_wait(self, exchange: str, endpoint: str, wait_time: float, tokens_left: float):
+        """Record time spent waiting for a rate limiter token and the tokens left"""
+        rate_limiter_wait_seconds.labels(exchange=exchange, endpoint=endpoint).observe(wait_time)
+        scan_stage_seconds.labels(stage='rate_limit_wait', exchange=exchange).observe(wait_time)
+        rate_limiter_tokens_remaining.labels(exchange=exchange, endpoint=endpoint).set(tokens_left)
+    
+    def record_rate_limit_budget(self, exchange: str, endpoint: str, requests_per_minute: float, throttled: bool):
+        """Record the learned request budget and whether the exchange throttled us"""
+        rate_limiter_learned_requests_per_minute.labels(exchange=exchange, endpoint=endpoint).set(requests_per_minute)
+        if throttled:
+            rate_limiter_throttled_total.labels(exchange=exchange, endpoint=endpoint).inc()
+    
+    def record_stream_tick(self, exchange: str):
+        """Record a trade tick received from an exchange stream"""
+        stream_ticks_total.labels(exchange=exchange).inc()
+    
+    def record_detection_latency(self, latency: float):
+        """Record the delay between a streamed tick and its arbitrage evaluation"""
+        arbitrage_detection_latency_seconds.observe(latency)
+    
+    def record_write_queue_depth(self, depth: int):
+        """Record the number of database writes waiting in the write-behind queue"""
+        write_queue_depth.set(depth)
+    
+    def record_write_flush(self, flush_time: float, writes: int):
+        """Record one flush of the write-behind queue"""
+        write_queue_flush_seconds.observe(flush_time)
+        write_queue_flushed_total.inc(writes)
+    
+    def record_write_dropped(self, reason: str, writes: int):
+        """Record database writes the write-behind queue gave up on"""
+        write_queue_dropped_total.labels(reason=reason).inc(writes)
+    
+    def record_write_spilled(self, writes: int):
+        """Record database writes the write-behind queue spilled to disk"""
+        write_queue_spilled_total.inc(writes)
+    
+    def record_stage(self, stage: str, duration: float, exchange: str = 'all'):
+        """Record the time one stage of the scan pipeline took"""
+        scan_stage_seconds.labels(stage=stage, exchange=exchange).observe(duration)
+    
+    @contextmanager
+    def time_stage(self, stage: str, exchange: str = 'all'):
+        """Time the enclosed block as one stage of the scan pipeline"""
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_stage(stage, time.perf_counter() - start_time, exchange)
+    
+    def record_scan_duration(self, duration: float, interval: float):
+        """Record how long a scan cycle took compared to the interval it has to fit in"""
+        scan_duration_seconds.observe(duration)
+        scan_interval_utilization.set(duration / interval if interval > 0 else 0.0)
+        if duration > interval:
+            scan_overruns_total.inc()
+    
+    def record_quote_age(self, symbol: str, exchange: str, age: float):
+        """Record how old a quote was when it was evaluated"""
+        self.symbol_labels.record(quote_age_seconds, symbol, lambda series: series.observe(age), exchange)
+        self.symbol_labels.record(quote_age_gauge, symbol, lambda series: series.set(age), exchange, other=False)
+    
+    def record_quote_skew(self, symbol: str, skew: float):
+        """Record how far apart in time the quotes compared for a symbol were"""
+        self.symbol_labels.record(quote_skew_seconds, symbol, lambda series: series.observe(skew))
+        self.symbol_labels.record(quote_skew_gauge, symbol, lambda series: series.set(skew), other=False)
+    
+    def record_stale_quotes(self, symbol: str):
+        """Record an evaluation discarded for quote skew"""
+        self.symbol_labels.record(stale_quotes_discarded_total, symbol, lambda series: series.inc())
+    
     def record_arbitrage_opportunity(self, symbol: str, buy_exchange: str, sell_exchange: str):
         """Record an arbitrage opportunity discovery"""
-        arbitrage_opportunities_total.labels(
-            symbol=symbol,
-            buy_exchange=buy_exchange,
-            sell_exchange=sell_exchange
-        ).inc()
+        # Symbols with the most opportunities earn their own series
+        self.symbol_labels.observe(symbol)
+        self.symbol_labels.record(arbitrage_opportunities_total, symbol, lambda series: series.inc(), buy_exchange, sell_exchange)
         
         arbitrage_discovery_rate.inc()
     
     def update_price_difference(self, symbol: str, difference_percentage: float):
         """Update price difference metric for a symbol"""
-        price_difference_gauge.labels(symbol=symbol).set(difference_percentage)
+        self.symbol_labels.record(price_difference_gauge, symbol, lambda series: series.set(difference_percentage), other=False)
     
     def update_exchange_prices(self, symbol: str, nobitex_price: Optional[float], wallex_price: Optional[float]):
         """Update price gauges for both exchanges"""
         if nobitex_price is not None:
-            nobitex_price_gauge.labels(symbol=symbol).set(nobitex_price)
+            self.symbol_labels.record(nobitex_price_gauge, symbol, lambda series: series.set(nobitex_price), other=False)
         
         if wallex_price is not None:
-            wallex_price_gauge.labels(symbol=symbol).set(wallex_price)
+            self.symbol_labels.record(wallex_price_gauge, symbol, lambda series: series.set(wallex_price), other=False)
+    
+    def update_exchange_price(self, symbol: str, exchange: str, price: float):
+        """Update the price gauge of one exchange"""
+        self.symbol_labels.record(exchange_price_gauge, symbol, lambda series: series.set(price), exchange, other=False)
     
     def update_service_metrics(self, scan_count: int):
         """Update service-level metrics"""
@@ -154,11 +409,37 @@ class PrometheusMetrics:
         total = success_counter + error_counter
         return (success_counter / total * 100) if total > 0 else 0.0
 
-def start_metrics_server(port: int = 8000):
-    """Start the Prometheus metrics HTTP server"""
-    start_http_server(port)
+class _QuietRequestHandler(WSGIRequestHandler):
+    """Request handler that does not log every scrape"""
+    
+    def log_message(self, format, *args):
+        pass
+
+def start_metrics_server(port: int = METRICS_PORT, profiler_enabled: bool = PROFILER_ENABLED, addr: str = '0.0.0.0',
+                         registry: CollectorRegistry = REGISTRY):
+    """
+    Start the Prometheus metrics HTTP server in a daemon thread
+    
+    Args:
+        port: Port to serve on
+        profiler_enabled: Whether to also serve the sampling profiler at PROFILE_PATH
+        addr: Address to bind
+        registry: Registry to expose, e.g. one aggregating sharded workers
+    
+    Returns:
+        The running server, for shutdown()
+    """
+    app = make_wsgi_app(registry)
+    if profiler_enabled:
+        app = profiler_app(app)
+    server = make_server(addr, port, app, ThreadingWSGIServer, handler_class=_QuietRequestHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    
     logger.info(f"📊 Prometheus metrics server started on port {port}")
     logger.info(f"🔗 Metrics endpoint: http://localhost:{port}/metrics")
+    if profiler_enabled:
+        logger.info(f"🔬 Profiler endpoint: http://localhost:{port}{PROFILE_PATH}?seconds=10&format=collapsed")
+    return server
 
 def get_metrics_data():
     """Get the latest metrics data in Prometheus format"""
@@ -0,0 +1,129 @@
+"""
+Prometheus multiprocess mode for sharded workers
+Every process writes its metrics to mmap-backed files in one directory and a single exporter aggregates them
+
+prometheus_client picks its value storage when it is first imported, so
+enable_multiprocess_mode must run before anything imports prometheus_client
+(including arbitrage_app.prometheus_adapter.metrics); this module therefore
+only imports it inside its functions. Worker processes inherit the setting
+through the environment.
+
+Workers export every symbol they scan; the exporter applies the top-K symbol
+bound of cardinality.py across all of them with SymbolLimitedCollector, since
+a series removed in a worker stays in its metric files.
+"""
+
+import glob
+import logging
+import os
+import sys
+import threading
+from collections import Counter
+from typing import Optional
+from arbitrage_app.prometheus_adapter.cardinality import OTHER_SYMBOL, SymbolLabelLimiter
+from arbitrage_app.sample_trading import PROFILER_ENABLED
+
+logger = logging.getLogger(__name__)
+
+MULTIPROCESS_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+def enable_multiprocess_mode(path: str):
+    """
+    Point this process and the workers it starts at an empty metrics directory
+
+    Files left by an earlier run are removed, or their counters would be added to this run's.
+    """
+    if "prometheus_client" in sys.modules and os.environ.get(MULTIPROCESS_ENV) != path:
+        raise RuntimeError("Multiprocess mode must be enabled before prometheus_client is imported")
+    os.makedirs(path, exist_ok=True)
+    for stale_file in glob.glob(os.path.join(path, "*.db")):
+        os.remove(stale_file)
+    os.environ[MULTIPROCESS_ENV] = path
+    logger.info(f"Prometheus multiprocess mode, metric files in {path}")
+
+def start_multiprocess_exporter(port: int, profiler_enabled: bool = PROFILER_ENABLED, addr: str = "0.0.0.0",
+                                limiter: Optional[SymbolLabelLimiter] = None):
+    """
+    Serve the metrics of every process writing to the shared directory on one port
+
+    Args:
+        port: Port to serve /metrics on
+        profiler_enabled: Also serve the sampling profiler of this process
+        addr: Address to bind
+        limiter: Symbol bound applied to all workers together; METRICS_SYMBOL_TOP_K and the allow-list if None
+
+    Returns:
+        The running server, for shutdown()
+    """
+    from prometheus_client import CollectorRegistry
+    from prometheus_client.multiprocess import MultiProcessCollector
+    from arbitrage_app.prometheus_adapter.metrics import start_metrics_server
+
+    registry = CollectorRegistry()
+    registry.register(SymbolLimitedCollector(MultiProcessCollector(None), limiter or SymbolLabelLimiter()))
+    return start_metrics_server(port, profiler_enabled, addr, registry)
+
+class SymbolLimitedCollector:
+    """
+    Bounds the symbol label of the combined metrics of all workers
+
+    On every scrape, symbols are ranked by their arbitrage opportunities summed
+    over all workers with the same SymbolLabelLimiter a single process uses.
+    Counters and histograms of untracked symbols are added up under
+    OTHER_SYMBOL and their gauges are left out, so an evicted symbol leaves
+    the output at once even though its values stay in the worker files.
+    """
+
+    def __init__(self, collector, limiter: SymbolLabelLimiter, score_metric: str = "arbitrage_opportunities"):
+        self.collector = collector
+        self.limiter = limiter
+        self.score_metric = score_metric
+        # Opportunities per symbol already added to the limiter's scores
+        self.scored = Counter()
+        self._lock = threading.Lock()
+
+    def collect(self):
+        with self._lock:
+            metrics = list(self.collector.collect())
+            totals = Counter()
+            for metric in metrics:
+                if metric.name == self.score_metric:
+                    for sample in metric.samples:
+                        if sample.name.endswith("_total") and sample.labels.get("symbol", OTHER_SYMBOL) != OTHER_SYMBOL:
+                            totals[sample.labels["symbol"]] += sample.value
+            for symbol, total in totals.items():
+                if total > self.scored[symbol]:
+                    self.limiter.observe(symbol, total - self.scored[symbol])
+                    self.scored[symbol] = total
+            return [self._limit(metric) for metric in metrics]
+
+    def _label(self, symbol: str) -> str:
+        return OTHER_SYMBOL if symbol == OTHER_SYMBOL else self.limiter.label(symbol)
+
+    def _limit(self, metric):
+        """A copy of a metric family with untracked symbols folded into OTHER_SYMBOL, or left out of gauges"""
+        from prometheus_client.metrics_core import Metric
+
+        if not any("symbol" in sample.labels for sample in metric.samples):
+            return metric
+        limited = Metric(metric.name, metric.documentation, metric.type, metric.unit)
+        merged = {}
+        for sample in metric.samples:
+            labels = dict(sample.labels)
+            if "symbol" in labels:
+                labels["symbol"] = self._label(labels["symbol"])
+                if metric.type == "gauge" and labels["symbol"] == OTHER_SYMBOL:
+                    continue
+            key = (sample.name, tuple(sorted(labels.items())))
+            if key in merged:
+                merged[key] = merged[key]._replace(value=merged[key].value + sample.value)
+            else:
+                merged[key] = sample._replace(labels=labels)
+        limited.samples = list(merged.values())
+        return limited
+
+def mark_worker_dead(pid: int, path: Optional[str] = None):
+    """Drop the live gauges of an exited worker; its counters and histograms keep counting"""
+    from prometheus_client.multiprocess import mark_process_dead
+
+    mark_process_dead(pid, path)
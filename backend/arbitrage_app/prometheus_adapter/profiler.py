@@ -0,0 +1,172 @@
+"""
+On-demand sampling profiler served next to /metrics
+GET /debug/profile?seconds=10&format=collapsed samples the stacks of every thread and returns them
+
+Nothing runs until a profile is requested: the sampler is a plain loop in the
+request's own thread that reads sys._current_frames() every interval, so an
+idle service pays no overhead and a profiled one pays one stack walk per sample.
+Samples are wall-clock: threads waiting on I/O or locks show up where they wait.
+"""
+
+import json
+import logging
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from arbitrage_app.sample_trading import PROFILER_SAMPLE_INTERVAL_SECONDS, PROFILER_DEFAULT_SECONDS, PROFILER_MAX_SECONDS
+
+logger = logging.getLogger(__name__)
+
+PROFILE_PATH = "/debug/profile"
+
+# One frame as (function, file, line)
+Frame = Tuple[str, str, int]
+# Sample counts per (thread name, frames from outermost to innermost)
+Samples = Dict[Tuple[str, Tuple[Frame, ...]], int]
+
+class ProfilerBusyError(Exception):
+    """Raised when a profile is requested while another one is running"""
+
+class SamplingProfiler:
+    """Samples the stacks of all threads for a fixed time, one profile at a time"""
+
+    def __init__(self, interval: float = PROFILER_SAMPLE_INTERVAL_SECONDS):
+        self.interval = interval
+        self._lock = threading.Lock()
+
+    def sample(self, seconds: float) -> Tuple[Samples, float]:
+        """
+        Sample every thread except the sampling one for `seconds`
+
+        Args:
+            seconds: How long to sample
+
+        Returns:
+            Tuple of (sample counts per thread and stack, average seconds between samples)
+
+        Raises:
+            ProfilerBusyError: If another profile is running
+        """
+        if not self._lock.acquire(blocking=False):
+            raise ProfilerBusyError("A profile is already running")
+        try:
+            samples = Counter()
+            own_thread = threading.get_ident()
+            start_time = time.perf_counter()
+            deadline = start_time + seconds
+            rounds = 0
+            while True:
+                rounds += 1
+                thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id != own_thread:
+                        samples[(thread_names.get(thread_id, str(thread_id)), walk_stack(frame))] += 1
+                now = time.perf_counter()
+                if now >= deadline:
+                    return dict(samples), (now - start_time) / rounds
+                time.sleep(min(self.interval, deadline - now))
+        finally:
+            self._lock.release()
+
+def walk_stack(frame) -> Tuple[Frame, ...]:
+    """Frames of a stack from the outermost call to the innermost"""
+    stack = []
+    while frame is not None:
+        code = frame.f_code
+        stack.append((code.co_name, code.co_filename, frame.f_lineno))
+        frame = frame.f_back
+    return tuple(reversed(stack))
+
+def frame_name(frame: Frame) -> str:
+    """Readable name of a frame, e.g. 'scan_all_pairs (arbitrage_detector.py:412)'"""
+    function, filename, line = frame
+    return f"{function} ({filename.rsplit('/', 1)[-1]}:{line})"
+
+def collapsed_stacks(samples: Samples) -> str:
+    """
+    Render samples in the collapsed-stack format read by flamegraph.pl and speedscope
+
+    Each line is 'thread;outer frame;...;inner frame count'.
+    """
+    lines = []
+    for (thread_name, stack), count in sorted(samples.items(), key=lambda item: -item[1]):
+        names = [thread_name] + [frame_name(frame).replace(";", ",") for frame in stack]
+        lines.append(f"{';'.join(names)} {count}")
+    return "\n".join(lines) + "\n"
+
+def speedscope_profile(samples: Samples, interval: float, name: str = "arbitrage_app") -> dict:
+    """
+    Render samples as a speedscope document with one sampled profile per thread
+
+    Every sample is weighted by the measured interval between samples, so profile values are seconds.
+    """
+    frames: List[dict] = []
+    frame_index: Dict[Frame, int] = {}
+    profiles: Dict[str, dict] = {}
+    for (thread_name, stack), count in samples.items():
+        indexes = []
+        for frame in stack:
+            if frame not in frame_index:
+                frame_index[frame] = len(frames)
+                frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+            indexes.append(frame_index[frame])
+        profile = profiles.setdefault(thread_name, {
+            "type": "sampled", "name": thread_name, "unit": "seconds",
+            "startValue": 0, "endValue": 0, "samples": [], "weights": []
+        })
+        profile["samples"].append(indexes)
+        profile["weights"].append(count * interval)
+        profile["endValue"] += count * interval
+
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": list(profiles.values()),
+        "name": name,
+        "exporter": "arbitrage_app.prometheus_adapter.profiler"
+    }
+
+def profiler_app(metrics_app, profiler: Optional[SamplingProfiler] = None, max_seconds: float = PROFILER_MAX_SECONDS):
+    """
+    Wrap a WSGI metrics app so PROFILE_PATH serves profiles and every other path the metrics
+
+    Query parameters of PROFILE_PATH:
+        seconds: Sampling time, default PROFILER_DEFAULT_SECONDS, at most max_seconds
+        format: 'collapsed' (default, text) or 'speedscope' (JSON)
+    """
+    profiler = profiler or SamplingProfiler()
+
+    def app(environ, start_response):
+        if environ.get("PATH_INFO") != PROFILE_PATH:
+            return metrics_app(environ, start_response)
+
+        query = parse_qs(environ.get("QUERY_STRING", ""))
+        output_format = query.get("format", ["collapsed"])[0]
+        try:
+            seconds = float(query.get("seconds", [PROFILER_DEFAULT_SECONDS])[0])
+        except ValueError:
+            seconds = -1
+        if not 0 < seconds <= max_seconds or output_format not in ("collapsed", "speedscope"):
+            return _respond(start_response, "400 Bad Request", "text/plain",
+                            f"seconds must be in (0, {max_seconds}] and format 'collapsed' or 'speedscope'\n")
+
+        logger.info(f"Profiling all threads for {seconds} seconds ({output_format})")
+        try:
+            samples, sample_interval = profiler.sample(seconds)
+        except ProfilerBusyError as e:
+            return _respond(start_response, "409 Conflict", "text/plain", f"{e}\n")
+
+        if output_format == "speedscope":
+            document = speedscope_profile(samples, sample_interval)
+            return _respond(start_response, "200 OK", "application/json", json.dumps(document))
+        return _respond(start_response, "200 OK", "text/plain; charset=utf-8", collapsed_stacks(samples))
+
+    return app
+
+def _respond(start_response, status: str, content_type: str, body: str):
+    encoded = body.encode("utf-8")
+    start_response(status, [("Content-Type", content_type), ("Content-Length", str(len(encoded)))])
+    return [encoded]
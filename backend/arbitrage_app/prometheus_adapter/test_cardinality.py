@@ -0,0 +1,87 @@
+"""
+Test script for bounded symbol labels
+This script checks top-K promotion, the allow-list and the "other" bucket of per-symbol metrics
+"""
+
+import threading
+from prometheus_client import REGISTRY, CollectorRegistry, Gauge
+from arbitrage_app.prometheus_adapter.cardinality import OTHER_SYMBOL, SymbolLabelLimiter
+from arbitrage_app.prometheus_adapter.metrics import PrometheusMetrics
+
+def test_top_k_promotion():
+    """Slots fill first come, then go to symbols with strictly more opportunities"""
+    print("Testing top-K symbol tracking...")
+
+    limiter = SymbolLabelLimiter(2, ["BTCUSDT"])
+    assert [limiter.label(symbol) for symbol in ("BTCUSDT", "AAAUSDT", "BBBUSDT", "CCCUSDT")] == \
+        ["BTCUSDT", "AAAUSDT", "BBBUSDT", OTHER_SYMBOL]
+
+    assert limiter.observe("AAAUSDT", 2) is None
+    assert limiter.observe("BBBUSDT") is None
+    # A tie with the lowest tracked symbol does not churn series
+    assert limiter.observe("CCCUSDT") is None and limiter.label("CCCUSDT") == OTHER_SYMBOL
+    assert limiter.observe("CCCUSDT") == "BBBUSDT"
+    assert limiter.label("CCCUSDT") == "CCCUSDT" and limiter.label("BBBUSDT") == OTHER_SYMBOL
+    # Allow-listed symbols never take a slot
+    limiter.observe("BTCUSDT", 100)
+    assert limiter.tracked == {"AAAUSDT", "CCCUSDT"}
+
+    unlimited = SymbolLabelLimiter(None, [])
+    assert all(unlimited.label(f"SYM{index}") == f"SYM{index}" for index in range(100))
+    print("  ✅ Top K tracked")
+
+def test_other_bucket():
+    """Untracked symbols count under 'other' and leave the gauges; evicted symbols lose their series"""
+    print("\nTesting the other bucket...")
+
+    metrics = PrometheusMetrics(0.0)
+    metrics.symbol_labels = SymbolLabelLimiter(1, [])
+    other_labels = {"symbol": OTHER_SYMBOL, "buy_exchange": "nobitex", "sell_exchange": "wallex"}
+    other_before = REGISTRY.get_sample_value("arbitrage_opportunities_total", other_labels) or 0.0
+
+    metrics.update_exchange_price("CARD1USDT", "nobitex", 10.0)
+    metrics.update_exchange_price("CARD2USDT", "nobitex", 20.0)
+    assert REGISTRY.get_sample_value("exchange_price", {"symbol": "CARD1USDT", "exchange": "nobitex"}) == 10.0
+    assert REGISTRY.get_sample_value("exchange_price", {"symbol": "CARD2USDT", "exchange": "nobitex"}) is None
+    assert REGISTRY.get_sample_value("exchange_price", {"symbol": OTHER_SYMBOL, "exchange": "nobitex"}) is None
+
+    metrics.record_arbitrage_opportunity("CARD3USDT", "nobitex", "wallex")
+    assert metrics.symbol_labels.tracked == {"CARD3USDT"}
+    assert REGISTRY.get_sample_value("exchange_price", {"symbol": "CARD1USDT", "exchange": "nobitex"}) is None
+    metrics.record_arbitrage_opportunity("CARD2USDT", "nobitex", "wallex")
+    assert REGISTRY.get_sample_value("arbitrage_opportunities_total", other_labels) == other_before + 1
+    metrics.record_quote_skew("CARD2USDT", 3.0)
+    assert REGISTRY.get_sample_value("quote_skew_seconds_count", {"symbol": OTHER_SYMBOL}) >= 1
+    assert REGISTRY.get_sample_value("quote_skew_last_seconds", {"symbol": OTHER_SYMBOL}) is None
+    print("  ✅ Other bucket aggregated")
+
+def test_eviction_waits_for_record():
+    """An eviction racing a record() waits for it and then removes the series it wrote"""
+    print("\nTesting eviction during a record...")
+
+    gauge = Gauge("race_price", "Price", ["symbol", "exchange"], registry=CollectorRegistry())
+    limiter = SymbolLabelLimiter(1, [])
+    evictions = []
+
+    def set_and_race(series):
+        # Another thread promotes BBBUSDT over AAAUSDT while AAAUSDT's value is being set
+        evictor = threading.Thread(target=lambda: evictions.append(limiter.observe("BBBUSDT", 5)))
+        evictor.start()
+        evictor.join(0.1)
+        assert evictor.is_alive(), "eviction must wait for the record in progress"
+        series.set(1.0)
+        set_and_race.evictor = evictor
+
+    limiter.record(gauge, "AAAUSDT", set_and_race, "nobitex", other=False)
+    set_and_race.evictor.join()
+    assert evictions == ["AAAUSDT"]
+    assert [sample.labels["symbol"] for sample in gauge.collect()[0].samples] == []
+    limiter.record(gauge, "AAAUSDT", lambda series: series.set(2.0), "nobitex", other=False)
+    assert [sample.labels["symbol"] for sample in gauge.collect()[0].samples] == []
+    print("  ✅ Evicted series stay removed")
+
+if __name__ == "__main__":
+    test_top_k_promotion()
+    test_other_bucket()
+    test_eviction_waits_for_record()
+    print("\n✅ All cardinality tests completed successfully!")
@@ -0,0 +1,127 @@
+"""
+Test script for Prometheus multiprocess mode
+This script records metrics from two worker processes and reads them back through one exporter
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import urllib.request
+from arbitrage_app.prometheus_adapter.cardinality import SymbolLabelLimiter
+from arbitrage_app.prometheus_adapter.multiprocess import MULTIPROCESS_ENV, start_multiprocess_exporter, mark_worker_dead
+from arbitrage_app.scraper.api import rate_limiter
+from arbitrage_app.sharded import shard_pairs, shard_spill_path
+
+WORKER_SCRIPT = """
+import os, sys
+from arbitrage_app.prometheus_adapter.metrics import PrometheusMetrics
+metrics = PrometheusMetrics(0.0)
+symbol, price, opportunities = sys.argv[1], float(sys.argv[2]), int(sys.argv[3])
+metrics.update_exchange_price(symbol, "nobitex", price)
+for _ in range(opportunities):
+    metrics.record_arbitrage_opportunity(symbol, "nobitex", "wallex")
+metrics.record_write_queue_depth(5)
+print(os.getpid())
+"""
+
+def run_worker(path, symbol, price, opportunities=1):
+    """Record metrics in a separate worker process and return its pid"""
+    environment = dict(os.environ, **{MULTIPROCESS_ENV: path})
+    result = subprocess.run([sys.executable, "-c", WORKER_SCRIPT, symbol, str(price), str(opportunities)], env=environment,
+                            capture_output=True, text=True, timeout=120, check=True)
+    return int(result.stdout.strip().splitlines()[-1])
+
+def sample_lines(body, name):
+    return [line for line in body.splitlines() if line.startswith(name)]
+
+def start_exporter(path, limiter=None):
+    """Exporter over a metrics directory, on a free local port"""
+    os.environ[MULTIPROCESS_ENV] = path
+    try:
+        return start_multiprocess_exporter(0, addr="127.0.0.1", limiter=limiter)
+    finally:
+        os.environ.pop(MULTIPROCESS_ENV)
+
+def scrape(server):
+    with urllib.request.urlopen(f"http://127.0.0.1:{server.server_port}/metrics", timeout=30) as response:
+        return response.read().decode("utf-8")
+
+def test_aggregated_exporter():
+    """Counters add up across workers, per-symbol gauges keep each worker's value and exited workers leave live gauges"""
+    print("Testing multiprocess exporter...")
+
+    with tempfile.TemporaryDirectory() as path:
+        first_pid = run_worker(path, "MPAUSDT", 100.0)
+        run_worker(path, "MPBUSDT", 200.0)
+
+        server = start_exporter(path)
+        try:
+            body = scrape(server)
+            assert 'exchange_price{exchange="nobitex",symbol="MPAUSDT"} 100.0' in body
+            assert 'exchange_price{exchange="nobitex",symbol="MPBUSDT"} 200.0' in body
+            assert "arbitrage_discovery_rate_total 2.0" in body
+            assert sample_lines(body, "write_queue_depth ") == ["write_queue_depth 10.0"]
+            assert "pid=" not in body
+            print("  ✅ Two workers exported on one port")
+
+            mark_worker_dead(first_pid, path)
+            body = scrape(server)
+            assert 'symbol="MPAUSDT"} 100.0' not in body
+            assert "arbitrage_discovery_rate_total 2.0" in body
+            assert sample_lines(body, "write_queue_depth ") == ["write_queue_depth 5.0"]
+            print("  ✅ Exited worker dropped from live gauges")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+def test_symbol_bound_across_workers():
+    """The exporter keeps the top K symbols of all workers together and drops evicted ones from the output"""
+    print("\nTesting the symbol bound across workers...")
+
+    with tempfile.TemporaryDirectory() as path:
+        run_worker(path, "MPAUSDT", 100.0, opportunities=1)
+        server = start_exporter(path, SymbolLabelLimiter(1, []))
+        try:
+            body = scrape(server)
+            assert 'exchange_price{exchange="nobitex",symbol="MPAUSDT"} 100.0' in body
+
+            # Another shard's symbol overtakes it
+            run_worker(path, "MPBUSDT", 200.0, opportunities=2)
+            body = scrape(server)
+            opportunities = sample_lines(body, "arbitrage_opportunities_total{")
+            print(f"  after eviction: {opportunities}")
+            assert "MPAUSDT" not in body
+            assert 'exchange_price{exchange="nobitex",symbol="MPBUSDT"} 200.0' in body
+            assert 'arbitrage_opportunities_total{buy_exchange="nobitex",sell_exchange="wallex",symbol="MPBUSDT"} 2.0' in opportunities
+            assert 'arbitrage_opportunities_total{buy_exchange="nobitex",sell_exchange="wallex",symbol="other"} 1.0' in opportunities
+            print("  ✅ Evicted symbol gone from the combined output")
+        finally:
+            server.shutdown()
+            server.server_close()
+
+def test_shards_split_pairs_and_budgets():
+    """Every pair lands on exactly one shard and each shard gets its share of the request budget"""
+    print("\nTesting shard splits...")
+
+    pairs = [f"PAIR{index}" for index in range(15)]
+    shards = [shard_pairs(pairs, shard, 4) for shard in range(4)]
+    assert sorted(sum(shards, [])) == sorted(pairs)
+    assert [len(shard) for shard in shards] == [4, 4, 4, 3]
+    assert len({shard_spill_path(shard) for shard in range(4)}) == 4
+
+    limits = {"requests": 60, "period": 60, "burst": 15, "max_requests": 120}
+    try:
+        rate_limiter.share_rate_limits(4)
+        shared = rate_limiter._process_limits(limits)
+    finally:
+        rate_limiter.share_rate_limits(1)
+    assert shared == {"requests": 15, "period": 60, "burst": 3, "max_requests": 30}
+    assert rate_limiter._process_limits(limits) == limits
+    print(f"  ✅ Budget per shard: {shared}")
+
+if __name__ == "__main__":
+    test_aggregated_exporter()
+    test_symbol_bound_across_workers()
+    test_shards_split_pairs_and_budgets()
+    print("\n✅ All multiprocess tests completed successfully!")
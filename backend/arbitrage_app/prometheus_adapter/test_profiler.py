@@ -0,0 +1,90 @@
+"""
+Test script for the sampling profiler endpoint
+This script profiles a busy thread through the metrics server and checks both output formats
+"""
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from arbitrage_app.prometheus_adapter.metrics import start_metrics_server
+from arbitrage_app.prometheus_adapter.profiler import ProfilerBusyError, SamplingProfiler
+
+def busy_scan(stop):
+    """Stand-in for a CPU-bound scan"""
+    while not stop.is_set():
+        sum(index * index for index in range(1000))
+
+def fetch(url):
+    with urllib.request.urlopen(url, timeout=30) as response:
+        return response.status, response.headers["Content-Type"], response.read().decode("utf-8")
+
+def test_profile_endpoint():
+    """A profile requested over HTTP shows where the busy thread spends its time"""
+    print("Testing profiler endpoint...")
+
+    server = start_metrics_server(0, profiler_enabled=True, addr="127.0.0.1")
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    stop = threading.Event()
+    worker = threading.Thread(target=busy_scan, args=(stop,), name="busy-worker", daemon=True)
+    worker.start()
+    try:
+        status, content_type, body = fetch(f"{base_url}/debug/profile?seconds=0.5")
+        assert status == 200 and content_type.startswith("text/plain")
+        busy_lines = [line for line in body.splitlines() if line.startswith("busy-worker;") and "busy_scan" in line]
+        assert busy_lines, body
+        assert all(line.rsplit(" ", 1)[1].isdigit() for line in body.splitlines())
+        print(f"  collapsed: {len(body.splitlines())} stacks, e.g. {busy_lines[0][-80:]}")
+
+        status, content_type, body = fetch(f"{base_url}/debug/profile?seconds=0.5&format=speedscope")
+        document = json.loads(body)
+        assert content_type == "application/json"
+        profile = next(profile for profile in document["profiles"] if profile["name"] == "busy-worker")
+        assert len(profile["samples"]) == len(profile["weights"])
+        assert 0.3 < profile["endValue"] < 1.0
+        names = {document["shared"]["frames"][index]["name"] for sample in profile["samples"] for index in sample}
+        assert "busy_scan" in names
+        print(f"  speedscope: busy-worker sampled for {profile['endValue']:.2f}s")
+
+        for query in ("seconds=0", "seconds=3600", "seconds=abc", "format=pprof"):
+            try:
+                fetch(f"{base_url}/debug/profile?{query}")
+            except urllib.error.HTTPError as e:
+                assert e.code == 400
+            else:
+                raise AssertionError(f"{query} was accepted")
+
+        status, _, body = fetch(f"{base_url}/metrics")
+        assert status == 200 and "scan_duration_seconds" in body
+    finally:
+        stop.set()
+        server.shutdown()
+        server.server_close()
+    print("  ✅ Profiles served")
+
+def test_one_profile_at_a_time():
+    """A second profile is refused while one is running"""
+    print("\nTesting concurrent profiles...")
+
+    profiler = SamplingProfiler(interval=0.01)
+    running = threading.Thread(target=profiler.sample, args=(0.5,))
+    running.start()
+    time.sleep(0.1)
+    try:
+        profiler.sample(0.1)
+    except ProfilerBusyError as e:
+        print(f"  Refused: {e}")
+    else:
+        raise AssertionError("Concurrent profile was allowed")
+    running.join()
+    # The sampling thread leaves itself out of its samples
+    samples, interval = profiler.sample(0.1)
+    assert 0.005 < interval < 0.1
+    assert all(thread_name != threading.current_thread().name for thread_name, _ in samples)
+    print("  ✅ One profile at a time")
+
+if __name__ == "__main__":
+    test_profile_endpoint()
+    test_one_profile_at_a_time()
+    print("\n✅ All profiler tests completed successfully!")
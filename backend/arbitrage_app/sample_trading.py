@@ -16,14 +16,129 @@ TRADING_PAIRS = [
     "AAVEUSDT"
 ]
 
+# Exchanges to compare, by registered adapter name (see scraper/api/exchange_registry.py).
+# Every exchange also needs an entry in RATE_LIMITS.
+EXCHANGES = ["nobitex", "wallex"]
+
 # API Configuration
 NOBITEX_BASE_URL = "https://apiv2.nobitex.ir"
 WALLEX_BASE_URL = "https://api.wallex.ir"
+NOBITEX_WS_URL = "wss://wss.nobitex.ir/connection/websocket"
+WALLEX_WS_URL = "wss://api.wallex.ir/socket.io/?EIO=4&transport=websocket"
 
 # Rate limiting configuration
 NOBITEX_RATE_LIMIT = 60  # requests per minute
 WALLEX_RATE_LIMIT = 60   # requests per minute (estimated)
 
+# Token-bucket budgets per exchange and endpoint. Endpoints without their own
+# entry share the exchange's "default" bucket. A bucket admits at most
+# `requests` calls in any `period` seconds, of which `burst` may go out at once.
+# `requests` is only the starting point: the budget adapts to rate-limit headers
+# and HTTP 429 responses, up to `max_requests`.
+RATE_LIMITS = {
+    "nobitex": {
+        "default": {"requests": NOBITEX_RATE_LIMIT, "period": 60, "burst": 15, "max_requests": 120},
+    },
+    "wallex": {
+        "default": {"requests": WALLEX_RATE_LIMIT, "period": 60, "burst": 15, "max_requests": 120},
+    },
+}
+
+# Adaptive rate limiting
+RATE_LIMIT_BACKOFF_FACTOR = 0.5  # budget multiplier applied on HTTP 429
+RATE_LIMIT_INCREASE_STEP = 1  # requests added to the budget per period of successful responses
+RATE_LIMIT_DEFAULT_RETRY_AFTER = 5  # seconds to pause on HTTP 429 without Retry-After
+RATE_LIMIT_MAX_RETRIES = 2  # retries of a throttled request before giving up for this cycle
+
 # Arbitrage detection settings
 ARBITRAGE_THRESHOLD = 0.01  # 1% minimum profit threshold
 CHECK_INTERVAL_SECONDS = 60  # Check every 60 seconds
+VECTORIZED_DETECTION = True  # evaluate all pairs of a scan with one NumPy pass instead of a Python loop
+MAX_QUOTE_SKEW_SECONDS = None  # skip symbols whose compared quotes traded further apart than this; None compares any quotes
+
+# Scan settings
+SCAN_MODE = "snapshot"  # "sequential", "concurrent", "snapshot" or "depth" (order books, executable size only)
+SCAN_MAX_WORKERS = 30  # threads used by the concurrent scan; requests are paced by RATE_LIMITS
+
+# HTTP connection pooling
+HTTP_POOL_SIZE = 10  # keep-alive connections per host
+HTTP_MAX_RETRIES = 2  # retries on connection errors and 5xx responses
+HTTP_BACKOFF_FACTOR = 0.3  # seconds, doubled on each retry
+HTTP_TIMEOUT_SECONDS = 10
+
+# Runtime settings
+RUN_MODE = "sync"  # "sync" (threads and time.sleep), "async" (asyncio event loop) or "stream" (WebSocket trades)
+ASYNC_MAX_IN_FLIGHT = 200  # concurrent connections per async exchange client
+STREAM_RECONNECT_DELAY_SECONDS = 5  # wait before reconnecting a dropped WebSocket stream
+
+# Database write-behind queue: detection queues writes and a background thread stores them
+WRITE_BEHIND_ENABLED = True
+WRITE_QUEUE_MAX_SIZE = 10000  # queued writes (a scan's prices count as one)
+WRITE_BATCH_SIZE = 200  # writes stored per flush
+WRITE_FLUSH_INTERVAL_SECONDS = 1.0  # longest a write waits in the queue before a flush
+WRITE_QUEUE_FULL_POLICY = "block"  # "block" (wait, then drop), "drop" or "spill" (to WRITE_SPILL_PATH, replayed later)
+WRITE_QUEUE_BLOCK_TIMEOUT_SECONDS = 0.5  # longest a write may wait for room under the "block" policy
+WRITE_SPILL_PATH = "database_spill.jsonl"  # sharded workers add .shard<i>
+
+# Price storage: "rows" (price_data, one row per exchange), "snapshots" (price_snapshots,
+# one row per symbol with a price column per exchange) or "both" while migrating.
+# Existing price_data moves over with: python -m arbitrage_app.database.migrate_snapshots
+PRICE_STORAGE = "rows"
+
+# Rollups: OHLC, spread and opportunity-count buckets per symbol and exchange, updated
+# as each batch is stored (PostgreSQL and SQLite). Bucket length in seconds by name.
+ROLLUPS_ENABLED = True
+ROLLUP_RESOLUTIONS = {"1m": 60, "1h": 3600, "1d": 86400}
+
+# PostgreSQL time partitioning: each table is range-partitioned on its time column by
+# "day" or "week", and partitions entirely older than retention_days are dropped
+PARTITIONING_ENABLED = True  # no effect on other databases
+PARTITIONED_TABLES = {
+    "price_data": {"column": "timestamp", "interval": "day", "retention_days": 30},
+    "arbitrage_opportunities": {"column": "timestamp", "interval": "week", "retention_days": 365},
+}
+PARTITIONS_AHEAD = 3  # periods created in advance
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = 3600
+
+# Streaming history readers: rows per keyset page and per column batch
+STREAM_PAGE_SIZE = 10000
+
+# Parquet archive: days older than after_days move out of the database into
+# <ARCHIVE_PATH>/<table>/date=YYYY-MM-DD/symbol=<symbol>/ with:
+# python -m arbitrage_app.database.archive
+# Keep after_days below the partition retention_days, or rows are dropped before they are archived.
+ARCHIVE_PATH = "archive"
+ARCHIVE_TABLES = {
+    "price_data": {"after_days": 7},
+    "arbitrage_opportunities": {"after_days": 90},
+}
+ARCHIVE_COMPRESSION = "zstd"
+
+# Prometheus exporter port, shared by all sharded workers
+METRICS_PORT = 8000
+
+# Sharded workers: python -m arbitrage_app.sharded runs WORKER_SHARDS detector processes,
+# each scanning every WORKER_SHARDS-th trading pair with its share of RATE_LIMITS. They
+# write metrics to mmap-backed files in METRICS_MULTIPROCESS_DIR (emptied at startup) and
+# the supervisor serves all of them on METRICS_PORT, so Prometheus keeps one target.
+WORKER_SHARDS = 4
+METRICS_MULTIPROCESS_DIR = "prometheus_multiproc"
+WORKER_RESTART_DELAY_SECONDS = 5  # wait before restarting a worker that exited on its own
+
+# Metric label cardinality: per-symbol series exist for the allow-listed symbols plus the
+# METRICS_SYMBOL_TOP_K symbols with the most opportunities (None for every symbol). Other
+# symbols add up under symbol="other" in counters and histograms and are left out of gauges.
+# With sharded workers the bound applies to all workers together, in the exporter.
+METRICS_SYMBOL_TOP_K = 50
+METRICS_SYMBOL_ALLOWLIST = ["BTCUSDT", "ETHUSDT"]
+
+# Sampling profiler on the metrics port: GET /debug/profile?seconds=10&format=collapsed|speedscope
+# samples the stacks of every thread. Off unless enabled; costs nothing until a profile is requested.
+PROFILER_ENABLED = False
+PROFILER_SAMPLE_INTERVAL_SECONDS = 0.01
+PROFILER_DEFAULT_SECONDS = 10
+PROFILER_MAX_SECONDS = 60
+
+# Bulk price ingestion
+PRICE_INGEST_METHOD = "auto"  # "auto"/"copy" (COPY FROM STDIN on PostgreSQL with psycopg2, INSERT elsewhere) or "insert"
+PRICE_COPY_CHUNK_ROWS = 50000  # rows serialized per COPY statement
@@ -0,0 +1,181 @@
+import asyncio
+import aiohttp
+import json
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+from arbitrage_app.scraper.api.wallex_api import WallexAPI
+from arbitrage_app.scraper.api.quote import Quote
+from arbitrage_app.scraper.api.rate_limiter import get_rate_limiter
+from arbitrage_app.sample_trading import (
+    WALLEX_BASE_URL,
+    HTTP_TIMEOUT_SECONDS,
+    RATE_LIMIT_MAX_RETRIES,
+    ASYNC_MAX_IN_FLIGHT
+)
+
+logger = logging.getLogger(__name__)
+
+class AsyncWallexAPI:
+    """asyncio client for interacting with Wallex exchange API"""
+
+    def __init__(self, metrics_collector=None):
+        self.base_url = WALLEX_BASE_URL
+        self.metrics = metrics_collector
+        self.trades_limiter = get_rate_limiter("wallex", "trades", metrics_collector)
+        self.markets_limiter = get_rate_limiter("wallex", "markets", metrics_collector)
+        self.depth_limiter = get_rate_limiter("wallex", "depth", metrics_collector)
+        # Created on first use so it binds to the running event loop
+        self.session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Get the client session, creating it inside the running event loop"""
+        if self.session is None or self.session.closed:
+            connector = aiohttp.TCPConnector(limit=ASYNC_MAX_IN_FLIGHT)
+            timeout = aiohttp.ClientTimeout(total=HTTP_TIMEOUT_SECONDS)
+            self.session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=timeout,
+                headers={
+                    'Content-Type': 'application/json',
+                    'Accept': 'application/json'
+                }
+            )
+        return self.session
+
+    async def close(self):
+        """Close the client session and its connections"""
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+    async def _get_json(self, url: str, description: str, limiter, params: Optional[Dict] = None) -> Optional[Dict]:
+        """
+        Send a rate-limited GET request and return the decoded body if it succeeded
+
+        Throttled requests are retried up to RATE_LIMIT_MAX_RETRIES times once
+        the limiter has backed off, instead of dropping the data for this cycle.
+
+        Args:
+            url: Request URL
+            description: What is being fetched, used for logging
+            limiter: TokenBucket guarding the endpoint
+            params: Optional query parameters
+
+        Returns:
+            Decoded response or None if error
+        """
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            await limiter.acquire_async()
+            start_time = time.time()
+
+            try:
+                async with self._get_session().get(url, params=params) as response:
+                    throttled = limiter.observe_response(response.status, response.headers)
+                    if throttled and attempt < RATE_LIMIT_MAX_RETRIES:
+                        logger.warning(f"Wallex throttled request for {description}, retrying ({attempt + 1}/{RATE_LIMIT_MAX_RETRIES})")
+                        if self.metrics:
+                            self.metrics.record_wallex_request(False, time.time() - start_time)
+                        continue
+                    response.raise_for_status()
+                    body = await response.read()
+                    if self.metrics:
+                        self.metrics.record_stage("http", time.time() - start_time, "wallex")
+
+                decode_start = time.time()
+                data = json.loads(body)
+                response_time = time.time() - start_time
+                if self.metrics:
+                    self.metrics.record_stage("json_decode", time.time() - decode_start, "wallex")
+
+                if data.get("success") == True:
+                    if self.metrics:
+                        self.metrics.record_wallex_request(True, response_time)
+                    return data
+                else:
+                    logger.error(f"Wallex API error for {description}: {data}")
+                    if self.metrics:
+                        self.metrics.record_wallex_request(False, response_time)
+                    return None
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                logger.error(f"Request failed for {description}: {e}")
+                response_time = time.time() - start_time
+                if self.metrics:
+                    self.metrics.record_wallex_request(False, response_time)
+                return None
+            except ValueError as e:
+                logger.error(f"JSON decode error for {description}: {e}")
+                response_time = time.time() - start_time
+                if self.metrics:
+                    self.metrics.record_wallex_request(False, response_time)
+                return None
+
+    async def get_trades(self, symbol: str) -> Optional[Dict]:
+        """
+        Get latest trades for a given symbol
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+
+        Returns:
+            Dictionary containing trades data or None if error
+        """
+        return await self._get_json(f"{self.base_url}/v1/trades", symbol, self.trades_limiter, params={"symbol": symbol})
+
+    async def get_latest_price(self, symbol: str) -> Optional[float]:
+        """
+        Get the latest price for a symbol from the most recent trade
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            Latest price as float or None if error
+        """
+        return WallexAPI.parse_latest_price(await self.get_trades(symbol), symbol)
+
+    async def get_latest_quote(self, symbol: str) -> Optional[Quote]:
+        """
+        Get the latest price for a symbol with its trade time and the time it was received
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            Quote of the most recent trade or None if error
+        """
+        trades_data = await self.get_trades(symbol)
+        return WallexAPI.parse_latest_quote(trades_data, symbol, time.time())
+
+    async def get_markets(self) -> Optional[Dict]:
+        """
+        Get the listing with statistics for every Wallex market in a single request
+
+        Returns:
+            Dictionary containing markets data or None if error
+        """
+        return await self._get_json(f"{self.base_url}/v1/markets", "markets", self.markets_limiter)
+
+    async def get_market_snapshot(self) -> Optional[Dict[str, float]]:
+        """
+        Get the latest price of every Wallex market from one markets call
+
+        Returns:
+            Dictionary mapping symbol (e.g., 'BTCUSDT') to latest price or None if error
+        """
+        return WallexAPI.parse_market_snapshot(await self.get_markets())
+
+    async def get_order_book(self, symbol: str) -> Optional[Dict[str, List[Tuple[float, float]]]]:
+        """
+        Get the bid and ask levels of a symbol's order book
+
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+
+        Returns:
+            Dictionary with sorted 'bids' and 'asks' as lists of (price, amount) or None if error
+        """
+        return WallexAPI.parse_order_book(
+            await self._get_json(f"{self.base_url}/v1/depth", f"{symbol} order book", self.depth_limiter, params={"symbol": symbol}),
+            symbol
+        )
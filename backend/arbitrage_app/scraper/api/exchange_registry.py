@@ -0,0 +1,62 @@
+"""
+Registry of exchange adapters the detector can price pairs on
+"""
+
+import logging
+from typing import Dict, List, Optional, Type
+from arbitrage_app.scraper.api.nobitex_api import NobitexAPI
+from arbitrage_app.scraper.api.wallex_api import WallexAPI
+from arbitrage_app.scraper.api.async_nobitex_api import AsyncNobitexAPI
+from arbitrage_app.scraper.api.async_wallex_api import AsyncWallexAPI
+
+logger = logging.getLogger(__name__)
+
+# Every adapter takes an optional metrics collector and provides the same methods:
+#   get_latest_price(symbol) -> Optional[float]
+#   get_latest_quote(symbol) -> Optional[Quote]
+#   get_market_snapshot() -> Optional[Dict[str, float]]
+#   get_order_book(symbol) -> Optional[Dict[str, List[Tuple[float, float]]]]
+#   close()
+# Async adapters provide the same methods as coroutines.
+_adapters: Dict[str, Dict[str, Optional[Type]]] = {}
+
+def register_exchange(name: str, client_class: Type, async_client_class: Optional[Type] = None):
+    """
+    Make an exchange available to the detectors
+
+    Args:
+        name: Exchange name used in EXCHANGES, RATE_LIMITS and price data (e.g., 'nobitex')
+        client_class: Adapter class used by the thread-based detector
+        async_client_class: Optional adapter class used by the asyncio detector
+    """
+    _adapters[name] = {"sync": client_class, "async": async_client_class}
+
+def get_registered_exchanges() -> List[str]:
+    """Get the names of all registered exchanges"""
+    return list(_adapters)
+
+def create_exchange_clients(names: List[str], metrics_collector=None, use_async: bool = False) -> Dict[str, object]:
+    """
+    Create one adapter per exchange, in the order given
+
+    Args:
+        names: Exchange names to create adapters for
+        metrics_collector: Optional PrometheusMetrics instance
+        use_async: Whether to create the asyncio adapters
+
+    Returns:
+        Dictionary mapping exchange name to adapter instance
+    """
+    kind = "async" if use_async else "sync"
+    clients = {}
+    for name in names:
+        if name not in _adapters:
+            raise ValueError(f"Unknown exchange: {name}. Registered exchanges: {', '.join(_adapters)}")
+        client_class = _adapters[name][kind]
+        if client_class is None:
+            raise ValueError(f"Exchange {name} has no {kind} adapter")
+        clients[name] = client_class(metrics_collector)
+    return clients
+
+register_exchange("nobitex", NobitexAPI, AsyncNobitexAPI)
+register_exchange("wallex", WallexAPI, AsyncWallexAPI)
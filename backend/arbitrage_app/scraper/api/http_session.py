@@ -0,0 +1,97 @@
+"""
+Pooled keep-alive HTTP sessions for exchange clients and the Bale notifier
+"""
+
+import logging
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from typing import Tuple
+from arbitrage_app.sample_trading import (
+    HTTP_POOL_SIZE,
+    HTTP_MAX_RETRIES,
+    HTTP_BACKOFF_FACTOR,
+    HTTP_TIMEOUT_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+class PooledSession(requests.Session):
+    """requests session that keeps connections alive and reports pool reuse"""
+
+    def __init__(self, client_name: str, metrics_collector=None,
+                 pool_size: int = HTTP_POOL_SIZE,
+                 max_retries: int = HTTP_MAX_RETRIES,
+                 backoff_factor: float = HTTP_BACKOFF_FACTOR,
+                 timeout: float = HTTP_TIMEOUT_SECONDS):
+        super().__init__()
+        self.client_name = client_name
+        self.metrics = metrics_collector
+        self.timeout = timeout
+        self._reported_connections = 0
+        self._reported_requests = 0
+
+        # Only connection errors and 5xx are retried here; idempotent methods only
+        retry = Retry(
+            total=max_retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        """Send a request on a pooled connection, applying the default timeout"""
+        kwargs.setdefault("timeout", self.timeout)
+        try:
+            return super().request(method, url, **kwargs)
+        finally:
+            self._report_pool_usage()
+
+    def connection_stats(self) -> Tuple[int, int]:
+        """
+        Count connections opened and requests sent across all host pools
+
+        Returns:
+            Tuple of (connections_opened, requests_sent)
+        """
+        connections_opened = 0
+        requests_sent = 0
+        for adapter in set(self.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections_opened += pool.num_connections
+                requests_sent += pool.num_requests
+        return connections_opened, requests_sent
+
+    def _report_pool_usage(self):
+        """Export newly opened connections and sent requests since the last report"""
+        if not self.metrics:
+            return
+
+        connections_opened, requests_sent = self.connection_stats()
+        new_connections = max(connections_opened - self._reported_connections, 0)
+        new_requests = max(requests_sent - self._reported_requests, 0)
+        self._reported_connections = connections_opened
+        self._reported_requests = requests_sent
+
+        self.metrics.record_http_pool_usage(self.client_name, new_connections, new_requests)
+
+def create_http_session(client_name: str, metrics_collector=None) -> PooledSession:
+    """
+    Create a pooled session configured from sample_trading settings
+
+    Args:
+        client_name: Label used for connection reuse metrics (e.g., 'nobitex')
+        metrics_collector: Optional PrometheusMetrics instance
+
+    Returns:
+        PooledSession instance
+    """
+    logger.debug(f"Creating pooled HTTP session for {client_name} (pool size {HTTP_POOL_SIZE})")
+    return PooledSession(client_name, metrics_collector)
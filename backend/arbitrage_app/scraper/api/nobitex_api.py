@@ -2,8 +2,11 @@ import os
 import requests
 import time
 import logging
-from typing import Dict, Optional
-from arbitrage_app.sample_trading import NOBITEX_BASE_URL, NOBITEX_RATE_LIMIT
+from typing import Dict, List, Optional, Tuple
+from arbitrage_app.scraper.api.http_session import create_http_session
+from arbitrage_app.scraper.api.quote import Quote, epoch_milliseconds
+from arbitrage_app.scraper.api.rate_limiter import get_rate_limiter
+from arbitrage_app.sample_trading import NOBITEX_BASE_URL, RATE_LIMIT_MAX_RETRIES
 
 logger = logging.getLogger(__name__)
 
@@ -12,86 +15,92 @@ class NobitexAPI:
     
     def __init__(self, metrics_collector=None):
         self.base_url = NOBITEX_BASE_URL
-        self.rate_limit = NOBITEX_RATE_LIMIT
-        self.last_request_time = 0
-        self.request_count = 0
-        self.minute_start = time.time()
         self.metrics = metrics_collector
+        self.session = create_http_session("nobitex", metrics_collector)
+        self.trades_limiter = get_rate_limiter("nobitex", "trades", metrics_collector)
+        self.market_stats_limiter = get_rate_limiter("nobitex", "market_stats", metrics_collector)
+        self.orderbook_limiter = get_rate_limiter("nobitex", "orderbook", metrics_collector)
     
-    def _rate_limit_check(self):
-        """Ensure we don't exceed the rate limit of 60 requests per minute"""
-        current_time = time.time()
-        
-        # Reset counter every minute
-        if current_time - self.minute_start >= 60:
-            self.request_count = 0
-            self.minute_start = current_time
-        
-        # If we've hit the limit, wait until the next minute
-        if self.request_count >= self.rate_limit:
-            wait_time = 60 - (current_time - self.minute_start)
-            if wait_time > 0:
-                logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-                self.request_count = 0
-                self.minute_start = time.time()
-        
-        # Ensure minimum time between requests
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 1:  # Minimum 1 second between requests
-            time.sleep(1 - time_since_last)
-        
-        self.last_request_time = time.time()
-        self.request_count += 1
+    def close(self):
+        """Close pooled connections held by this client"""
+        self.session.close()
     
-    def get_trades(self, symbol: str) -> Optional[Dict]:
+    def _get_json(self, url: str, description: str, limiter, params: Optional[Dict] = None) -> Optional[Dict]:
         """
-        Get latest trades for a given symbol
+        Send a rate-limited GET request and return the decoded body if it succeeded
+        
+        Throttled requests are retried up to RATE_LIMIT_MAX_RETRIES times once
+        the limiter has backed off, instead of dropping the data for this cycle.
         
         Args:
-            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+            url: Request URL
+            description: What is being fetched, used for logging
+            limiter: TokenBucket guarding the endpoint
+            params: Optional query parameters
             
         Returns:
-            Dictionary containing trades data or None if error
+            Decoded response or None if error
         """
-        self._rate_limit_check()
-        
-        url = f"{self.base_url}/v2/trades/{symbol}"
-        start_time = time.time()
-        
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            
-            data = response.json()
-            response_time = time.time() - start_time
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            limiter.acquire()
+            start_time = time.time()
             
-            if data.get("status") == "ok":
-                # Record successful request metrics
+            try:
+                response = self.session.get(url, params=params)
+                if self.metrics:
+                    self.metrics.record_stage("http", time.time() - start_time, "nobitex")
+                throttled = limiter.observe_response(response.status_code, response.headers)
+                if throttled and attempt < RATE_LIMIT_MAX_RETRIES:
+                    logger.warning(f"Nobitex throttled request for {description}, retrying ({attempt + 1}/{RATE_LIMIT_MAX_RETRIES})")
+                    if self.metrics:
+                        self.metrics.record_nobitex_request(False, time.time() - start_time)
+                    continue
+                response.raise_for_status()
+                
+                decode_start = time.time()
+                data = response.json()
+                response_time = time.time() - start_time
+                if self.metrics:
+                    self.metrics.record_stage("json_decode", time.time() - decode_start, "nobitex")
+                
+                if data.get("status") == "ok":
+                    # Record successful request metrics
+                    if self.metrics:
+                        self.metrics.record_nobitex_request(True, response_time)
+                    return data
+                else:
+                    logger.error(f"Nobitex API error for {description}: {data}")
+                    # Record failed request metrics
+                    if self.metrics:
+                        self.metrics.record_nobitex_request(False, response_time)
+                    return None
+                    
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed for {description}: {e}")
+                response_time = time.time() - start_time
+                # Record failed request metrics
                 if self.metrics:
-                    self.metrics.record_nobitex_request(True, response_time)
-                return data
-            else:
-                logger.error(f"Nobitex API error for {symbol}: {data}")
+                    self.metrics.record_nobitex_request(False, response_time)
+                return None
+            except ValueError as e:
+                logger.error(f"JSON decode error for {description}: {e}")
+                response_time = time.time() - start_time
                 # Record failed request metrics
                 if self.metrics:
                     self.metrics.record_nobitex_request(False, response_time)
                 return None
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {symbol}: {e}")
-            response_time = time.time() - start_time
-            # Record failed request metrics
-            if self.metrics:
-                self.metrics.record_nobitex_request(False, response_time)
-            return None
-        except ValueError as e:
-            logger.error(f"JSON decode error for {symbol}: {e}")
-            response_time = time.time() - start_time
-            # Record failed request metrics
-            if self.metrics:
-                self.metrics.record_nobitex_request(False, response_time)
-            return None
+    
+    def get_trades(self, symbol: str) -> Optional[Dict]:
+        """
+        Get latest trades for a given symbol
+        
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+            
+        Returns:
+            Dictionary containing trades data or None if error
+        """
+        return self._get_json(f"{self.base_url}/v2/trades/{symbol}", symbol, self.trades_limiter)
     
     def get_latest_price(self, symbol: str) -> Optional[float]:
         """
@@ -103,8 +112,20 @@ class NobitexAPI:
         Returns:
             Latest price as float or None if error
         """
-        trades_data = self.get_trades(symbol)
+        return self.parse_latest_price(self.get_trades(symbol), symbol)
+    
+    @staticmethod
+    def parse_latest_price(trades_data: Optional[Dict], symbol: str) -> Optional[float]:
+        """
+        Extract the most recent trade price from a trades response
         
+        Args:
+            trades_data: Response of the trades endpoint or None
+            symbol: Trading pair symbol, used for logging
+            
+        Returns:
+            Latest price as float or None if missing
+        """
         if not trades_data or not trades_data.get("trades"):
             return None
         
@@ -119,3 +140,125 @@ class NobitexAPI:
         except (ValueError, KeyError) as e:
             logger.error(f"Error parsing price for {symbol}: {e}")
             return None
+    
+    def get_latest_quote(self, symbol: str) -> Optional[Quote]:
+        """
+        Get the latest price for a symbol with its trade time and the time it was received
+        
+        Args:
+            symbol: Trading pair symbol
+            
+        Returns:
+            Quote of the most recent trade or None if error
+        """
+        trades_data = self.get_trades(symbol)
+        return self.parse_latest_quote(trades_data, symbol, time.time())
+    
+    @staticmethod
+    def parse_latest_quote(trades_data: Optional[Dict], symbol: str, received_at: float) -> Optional[Quote]:
+        """
+        Extract the most recent trade price and time from a trades response
+        
+        Args:
+            trades_data: Response of the trades endpoint or None
+            symbol: Trading pair symbol, used for logging
+            received_at: Local time the response was received
+            
+        Returns:
+            Quote or None if the price is missing; trade_time is None if the time is
+        """
+        price = NobitexAPI.parse_latest_price(trades_data, symbol)
+        if price is None:
+            return None
+        
+        # Trade times are epoch milliseconds
+        return Quote(price, received_at, epoch_milliseconds(trades_data["trades"][0].get("time")))
+    
+    def get_market_stats(self) -> Optional[Dict]:
+        """
+        Get market statistics for every Nobitex market in a single request
+        
+        Returns:
+            Dictionary containing market stats data or None if error
+        """
+        return self._get_json(f"{self.base_url}/market/stats", "market stats", self.market_stats_limiter)
+    
+    def get_market_snapshot(self) -> Optional[Dict[str, float]]:
+        """
+        Get the latest price of every Nobitex market from one market stats call
+        
+        Returns:
+            Dictionary mapping symbol (e.g., 'BTCUSDT') to latest price or None if error
+        """
+        return self.parse_market_snapshot(self.get_market_stats())
+    
+    @staticmethod
+    def parse_market_snapshot(stats_data: Optional[Dict]) -> Optional[Dict[str, float]]:
+        """
+        Map a market stats response to latest prices keyed by trades symbol
+        
+        Args:
+            stats_data: Response of the market stats endpoint or None
+            
+        Returns:
+            Dictionary mapping symbol to latest price or None if missing
+        """
+        if not stats_data or not stats_data.get("stats"):
+            return None
+        
+        snapshot = {}
+        for market, stats in stats_data["stats"].items():
+            # Market stats are keyed like 'btc-usdt', while trades use 'BTCUSDT'
+            symbol = market.replace("-", "").upper()
+            if symbol.endswith("RLS"):
+                symbol = symbol[:-3] + "IRT"
+            
+            if stats.get("isClosed"):
+                continue
+            try:
+                snapshot[symbol] = float(stats["latest"])
+            except (ValueError, KeyError, TypeError) as e:
+                logger.debug(f"Skipping Nobitex market {market}: {e}")
+        
+        return snapshot
+    
+    def get_order_book(self, symbol: str) -> Optional[Dict[str, List[Tuple[float, float]]]]:
+        """
+        Get the bid and ask levels of a symbol's order book
+        
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+            
+        Returns:
+            Dictionary with 'bids' (best first, descending) and 'asks' (best first, ascending)
+            as lists of (price, amount) or None if error
+        """
+        return self.parse_order_book(
+            self._get_json(f"{self.base_url}/v3/orderbook/{symbol}", f"{symbol} order book", self.orderbook_limiter),
+            symbol
+        )
+    
+    @staticmethod
+    def parse_order_book(book_data: Optional[Dict], symbol: str) -> Optional[Dict[str, List[Tuple[float, float]]]]:
+        """
+        Extract price levels from an order book response
+        
+        Args:
+            book_data: Response of the order book endpoint or None
+            symbol: Trading pair symbol, used for logging
+            
+        Returns:
+            Dictionary with sorted 'bids' and 'asks' or None if missing
+        """
+        if not book_data:
+            return None
+        
+        # Levels are [price, amount] pairs of strings
+        try:
+            bids = [(float(price), float(amount)) for price, amount in book_data.get("bids", [])]
+            asks = [(float(price), float(amount)) for price, amount in book_data.get("asks", [])]
+        except (ValueError, TypeError) as e:
+            logger.error(f"Error parsing order book for {symbol}: {e}")
+            return None
+        
+        return {"bids": sorted(bids, reverse=True), "asks": sorted(asks)}
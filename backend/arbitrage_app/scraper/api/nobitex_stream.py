@@ -0,0 +1,63 @@
+import json
+import logging
+from typing import List, Tuple, Union
+from arbitrage_app.scraper.api.price_stream import PriceStream, Ticks, parse_price, load_json, text_frame
+from arbitrage_app.sample_trading import NOBITEX_WS_URL
+
+logger = logging.getLogger(__name__)
+
+class NobitexStream(PriceStream):
+    """Nobitex public trades over its Centrifugo WebSocket (JSON protocol)"""
+
+    exchange = "nobitex"
+    channel_prefix = "public:trades-"
+
+    def __init__(self, symbols: List[str], url: str = NOBITEX_WS_URL, **kwargs):
+        super().__init__(symbols, url, **kwargs)
+
+    def subscribe_messages(self) -> List[str]:
+        """Connect command followed by one subscribe command per symbol"""
+        messages = [json.dumps({"id": 1, "connect": {"name": "arbitrage-app"}})]
+        for command_id, symbol in enumerate(self.symbols, start=2):
+            messages.append(json.dumps({"id": command_id, "subscribe": {"channel": f"{self.channel_prefix}{symbol}"}}))
+        return messages
+
+    def handle_message(self, message: Union[str, bytes]) -> Tuple[Ticks, List[str]]:
+        """Parse pushed trade publications and answer server pings"""
+        ticks = []
+        replies = []
+        message = text_frame(message)
+        if message is None:
+            return ticks, replies
+
+        # Centrifugo may batch several replies into one frame, one per line
+        for line in message.splitlines():
+            frame = load_json(line)
+            if frame == {}:
+                replies.append("{}")  # ping
+                continue
+            if not isinstance(frame, dict) or "push" not in frame:
+                continue
+
+            push = frame["push"]
+            channel = push.get("channel") if isinstance(push, dict) else None
+            if not isinstance(channel, str) or not channel.startswith(self.channel_prefix):
+                continue
+            symbol = channel[len(self.channel_prefix):]
+
+            publication = push.get("pub")
+            data = publication.get("data") if isinstance(publication, dict) else None
+            if isinstance(data, str):
+                data = load_json(data)
+            trades = data if isinstance(data, list) else [data]
+
+            # Publications list trades oldest first, keep the latest price
+            for trade in reversed(trades):
+                price = parse_price(trade.get("price")) if isinstance(trade, dict) else None
+                if price is not None:
+                    ticks.append((symbol, price))
+                    break
+            else:
+                logger.debug(f"Ignoring Nobitex publication without a price on {channel}")
+
+        return ticks, replies
@@ -0,0 +1,119 @@
+"""
+WebSocket price streams for exchanges that publish public trades
+"""
+
+import asyncio
+import json
+import logging
+import time
+from typing import Awaitable, Callable, List, Optional, Tuple, Union
+import websockets
+from arbitrage_app.sample_trading import STREAM_RECONNECT_DELAY_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# (symbol, price) pairs parsed from one WebSocket frame
+Ticks = List[Tuple[str, float]]
+TickHandler = Callable[[str, str, float, float], Awaitable[None]]
+
+class PriceStream:
+    """
+    Base class for an exchange's public trade stream
+
+    Subclasses describe the exchange's wire protocol: the frames sent after
+    connecting and how to turn received frames into ticks. This class owns the
+    connection, reconnects after failures and hands every tick to a callback.
+    """
+
+    exchange = ""
+
+    def __init__(self, symbols: List[str], url: str, reconnect_delay: float = STREAM_RECONNECT_DELAY_SECONDS):
+        self.symbols = list(symbols)
+        self.url = url
+        self.reconnect_delay = reconnect_delay
+        self.running = False
+        self.ticks_received = 0
+
+    def subscribe_messages(self) -> List[str]:
+        """Frames to send right after the connection opens"""
+        raise NotImplementedError
+
+    def handle_message(self, message: Union[str, bytes]) -> Tuple[Ticks, List[str]]:
+        """
+        Parse one received frame
+
+        Args:
+            message: Raw frame; binary frames are decoded as UTF-8 or skipped
+
+        Returns:
+            Tuple of (ticks in the frame, frames to send back)
+        """
+        raise NotImplementedError
+
+    async def run(self, on_tick: TickHandler):
+        """
+        Stream ticks into `on_tick(exchange, symbol, price, received_at)` until stopped
+
+        Args:
+            on_tick: Coroutine called for every parsed tick
+        """
+        self.running = True
+        while self.running:
+            try:
+                async with websockets.connect(self.url) as websocket:
+                    logger.info(f"Connected to {self.exchange} stream at {self.url}")
+                    for message in self.subscribe_messages():
+                        await websocket.send(message)
+
+                    async for message in websocket:
+                        received_at = time.time()
+                        try:
+                            ticks, replies = self.handle_message(message)
+                        except Exception as e:
+                            # One malformed frame must not end the stream
+                            logger.warning(f"Skipping {self.exchange} frame that could not be parsed: {e}")
+                            continue
+                        for reply in replies:
+                            await websocket.send(reply)
+                        for symbol, price in ticks:
+                            self.ticks_received += 1
+                            await on_tick(self.exchange, symbol, price, received_at)
+                        if not self.running:
+                            break
+
+            except asyncio.CancelledError:
+                raise
+            except (OSError, websockets.exceptions.WebSocketException) as e:
+                logger.error(f"{self.exchange} stream error: {e}")
+
+            if self.running:
+                logger.info(f"Reconnecting to {self.exchange} stream in {self.reconnect_delay} seconds...")
+                await asyncio.sleep(self.reconnect_delay)
+
+    def stop(self):
+        """Stop after the frame being processed"""
+        self.running = False
+
+def parse_price(value) -> Optional[float]:
+    """Convert a price field to float, ignoring missing or malformed values"""
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if price > 0 else None
+
+def text_frame(message: Union[str, bytes]) -> Optional[str]:
+    """Text of a frame, decoding binary frames as UTF-8; None if a binary frame is not text"""
+    if isinstance(message, str):
+        return message
+    try:
+        return bytes(message).decode("utf-8")
+    except (TypeError, UnicodeDecodeError):
+        return None
+
+def load_json(message: str):
+    """Decode a JSON frame, returning None for anything that is not JSON"""
+    try:
+        return json.loads(message)
+    except ValueError:
+        return None
@@ -0,0 +1,41 @@
+"""
+Prices tagged with when they traded on the exchange and when they reached us
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Quote:
+    """Latest price of a symbol on one exchange"""
+    price: float
+    # Local epoch seconds the response carrying the price was received
+    received_at: float
+    # Epoch seconds of the trade as reported by the exchange, None if it reports none
+    trade_time: Optional[float] = None
+
+    @property
+    def time(self) -> float:
+        """Best known time of the price: the exchange's trade time, or the receive time without one"""
+        return self.trade_time if self.trade_time is not None else self.received_at
+
+def epoch_milliseconds(value) -> Optional[float]:
+    """Convert an epoch timestamp in milliseconds to epoch seconds, None if malformed"""
+    try:
+        return float(value) / 1000
+    except (TypeError, ValueError):
+        return None
+
+def iso_timestamp(value) -> Optional[float]:
+    """Convert an ISO 8601 timestamp to epoch seconds, assuming UTC without an offset, None if malformed"""
+    try:
+        moment = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.timestamp()
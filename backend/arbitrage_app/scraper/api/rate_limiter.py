@@ -0,0 +1,265 @@
+"""
+Token-bucket rate limiter shared by all exchange clients
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Mapping, Optional, Tuple
+from arbitrage_app.sample_trading import (
+    RATE_LIMITS,
+    RATE_LIMIT_BACKOFF_FACTOR,
+    RATE_LIMIT_INCREASE_STEP,
+    RATE_LIMIT_DEFAULT_RETRY_AFTER
+)
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Token bucket that lets a client burst and then settles to a steady rate
+
+    A bucket holding `burst` tokens refilled at `(requests - burst) / period`
+    tokens per second never admits more than `requests` calls in any
+    `period`-second window (burst is at least one token). Each acquire
+    reserves a token up front, so callers from threads and from event loops
+    queue fairly in arrival order.
+
+    The budget adapts to what the exchange reports through observe_response:
+    it creeps up towards `max_requests` while responses show headroom, is cut
+    by RATE_LIMIT_BACKOFF_FACTOR on HTTP 429, and follows X-RateLimit-Limit
+    when the exchange sends it. Retry-After and exhausted X-RateLimit-Remaining
+    pause the bucket until the exchange accepts requests again.
+    """
+
+    def __init__(self, exchange: str, endpoint: str, requests: int, period: float, burst: int = 0,
+                 max_requests: Optional[int] = None, min_requests: Optional[int] = None,
+                 metrics_collector=None):
+        if burst >= requests:
+            raise ValueError(f"Burst ({burst}) must be below the request budget ({requests}) for {exchange}/{endpoint}")
+
+        self.exchange = exchange
+        self.endpoint = endpoint
+        self.period = period
+        self.capacity = max(burst, 1)
+        self.max_requests = max_requests or requests
+        self.min_requests = min_requests or self.capacity + 1
+        self.metrics = metrics_collector
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+        self._set_requests(requests)
+
+    def _set_requests(self, requests: float):
+        """Set the per-period budget within its bounds and derive the refill rate"""
+        self.requests = min(max(requests, self.min_requests), self.max_requests)
+        self.rate = (self.requests - self.capacity) / self.period
+
+    def _settle(self, now: float):
+        """Credit tokens refilled since the last update; call with the lock held"""
+        # `updated` lies in the future while the bucket is paused
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def _pause(self, now: float, seconds: float):
+        """Stop refilling for `seconds` so queued reservations line up after the pause"""
+        self._settle(now)
+        self.tokens = min(self.tokens, 0.0)
+        self.updated = max(self.updated, now + seconds)
+
+    def _reserve(self) -> Tuple[float, float]:
+        """
+        Take one token, letting the balance go negative when the bucket is empty
+
+        Returns:
+            Tuple of (seconds to wait before sending, tokens left after the reservation)
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._settle(now)
+            self.tokens -= 1
+            wait_time = max(self.updated - now, 0.0)
+            if self.tokens < 0:
+                wait_time += -self.tokens / self.rate
+            return wait_time, self.tokens
+
+    def observe_response(self, status_code: int, headers: Mapping[str, str]) -> bool:
+        """
+        Adjust the send rate from an exchange response
+
+        Args:
+            status_code: HTTP status of the response
+            headers: Response headers (case-insensitive mapping)
+
+        Returns:
+            True if the exchange throttled the request and it should be retried
+        """
+        limit = _header_number(headers, "X-RateLimit-Limit")
+        remaining = _header_number(headers, "X-RateLimit-Remaining")
+        reset = _reset_seconds(_header_number(headers, "X-RateLimit-Reset"))
+        throttled = status_code == 429
+        # The headers describe the whole budget; this process only gets its share of it
+        if limit:
+            limit = max(limit // _budget_shares, 2)
+        if remaining is not None:
+            remaining /= _budget_shares
+
+        with self._lock:
+            now = time.monotonic()
+            self._settle(now)
+
+            if limit and limit > self.capacity:
+                # The exchange told us its real budget, trust it over our guess
+                self.max_requests = limit
+                if self.requests > limit:
+                    self._set_requests(limit)
+
+            if throttled:
+                retry_after = _retry_after_seconds(headers.get("Retry-After"))
+                if retry_after is None:
+                    retry_after = reset if reset is not None else RATE_LIMIT_DEFAULT_RETRY_AFTER
+                self._pause(now, retry_after)
+                self._set_requests(self.requests * RATE_LIMIT_BACKOFF_FACTOR)
+                logger.warning(f"{self.exchange}/{self.endpoint} throttled us. Backing off for {retry_after:.2f} seconds, "
+                               f"budget now {self.requests:.1f} requests per {self.period} seconds")
+            elif remaining is not None and remaining <= 0 and reset:
+                self._pause(now, reset)
+            elif 200 <= status_code < 300 and (remaining is None or remaining > self.capacity):
+                # Additive increase: about RATE_LIMIT_INCREASE_STEP per period of successful requests
+                self._set_requests(self.requests + RATE_LIMIT_INCREASE_STEP / self.requests)
+
+            requests = self.requests
+
+        if self.metrics:
+            self.metrics.record_rate_limit_budget(self.exchange, self.endpoint, requests / self.period * 60, throttled)
+        return throttled
+
+    def _record(self, wait_time: float, tokens_left: float):
+        """Log long waits and export wait time and remaining tokens"""
+        if wait_time > 1:
+            logger.info(f"Rate limit reached for {self.exchange}/{self.endpoint}. Waiting {wait_time:.2f} seconds...")
+        if self.metrics:
+            self.metrics.record_rate_limit_wait(self.exchange, self.endpoint, wait_time, max(tokens_left, 0.0))
+
+    def acquire(self) -> float:
+        """
+        Block the calling thread until a request may be sent
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait_time, tokens_left = self._reserve()
+        self._record(wait_time, tokens_left)
+        if wait_time > 0:
+            time.sleep(wait_time)
+        return wait_time
+
+    async def acquire_async(self) -> float:
+        """
+        Suspend the calling task until a request may be sent
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait_time, tokens_left = self._reserve()
+        self._record(wait_time, tokens_left)
+        if wait_time > 0:
+            await asyncio.sleep(wait_time)
+        return wait_time
+
+    def tokens_left(self) -> float:
+        """Get the current token balance without consuming one"""
+        with self._lock:
+            elapsed = max(time.monotonic() - self.updated, 0.0)
+            return min(self.capacity, self.tokens + elapsed * self.rate)
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    """Read a numeric header, ignoring missing or malformed values"""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def _reset_seconds(reset: Optional[float]) -> Optional[float]:
+    """Convert an X-RateLimit-Reset value (seconds or epoch time) to seconds from now"""
+    if reset is None:
+        return None
+    if reset > 1e9:
+        reset = reset - time.time()
+    return max(reset, 0.0)
+
+def _retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Convert a Retry-After header (seconds or HTTP date) to seconds from now"""
+    if value is None:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+_limiters: Dict[Tuple[str, str], TokenBucket] = {}
+_limiters_lock = threading.Lock()
+# Number of processes splitting every exchange budget, see share_rate_limits
+_budget_shares = 1
+
+def share_rate_limits(shares: int):
+    """
+    Give this process 1/`shares` of every budget in RATE_LIMITS
+
+    Sharded workers each hold their own limiters; splitting the budgets keeps
+    their combined request rate within what the exchanges allow. Call before
+    the first limiter is created.
+    """
+    global _budget_shares
+    _budget_shares = max(shares, 1)
+
+def _process_limits(limits: Mapping) -> Dict:
+    """This process's share of a bucket's limits"""
+    if _budget_shares == 1:
+        return dict(limits)
+    shared = dict(limits)
+    shared["requests"] = max(limits["requests"] // _budget_shares, 2)
+    # Burst must stay below the request budget
+    shared["burst"] = min(limits.get("burst", 0) // _budget_shares, shared["requests"] - 1)
+    for bound in ("max_requests", "min_requests"):
+        if limits.get(bound):
+            shared[bound] = max(limits[bound] // _budget_shares, shared["burst"] + 1)
+    return shared
+
+def get_rate_limiter(exchange: str, endpoint: str, metrics_collector=None) -> TokenBucket:
+    """
+    Get the shared limiter for an exchange endpoint
+
+    Endpoints without their own entry in RATE_LIMITS share the exchange's
+    'default' bucket, so every client of one exchange draws from one budget.
+
+    Args:
+        exchange: Exchange name (e.g., 'nobitex')
+        endpoint: Endpoint name (e.g., 'trades')
+        metrics_collector: Optional PrometheusMetrics instance
+
+    Returns:
+        TokenBucket instance
+    """
+    exchange_limits = RATE_LIMITS[exchange]
+    bucket_name = endpoint if endpoint in exchange_limits else "default"
+
+    with _limiters_lock:
+        limiter = _limiters.get((exchange, bucket_name))
+        if limiter is None:
+            limiter = TokenBucket(exchange, bucket_name, metrics_collector=metrics_collector,
+                                  **_process_limits(exchange_limits[bucket_name]))
+            _limiters[(exchange, bucket_name)] = limiter
+        elif limiter.metrics is None:
+            limiter.metrics = metrics_collector
+        return limiter
@@ -2,8 +2,11 @@ import os
 import requests
 import time
 import logging
-from typing import Dict, Optional
-from arbitrage_app.sample_trading import WALLEX_BASE_URL, WALLEX_RATE_LIMIT
+from typing import Dict, List, Optional, Tuple
+from arbitrage_app.scraper.api.http_session import create_http_session
+from arbitrage_app.scraper.api.quote import Quote, iso_timestamp
+from arbitrage_app.scraper.api.rate_limiter import get_rate_limiter
+from arbitrage_app.sample_trading import WALLEX_BASE_URL, RATE_LIMIT_MAX_RETRIES
 
 logger = logging.getLogger(__name__)
 
@@ -12,37 +15,11 @@ class WallexAPI:
     
     def __init__(self, metrics_collector=None):
         self.base_url = WALLEX_BASE_URL
-        self.rate_limit = WALLEX_RATE_LIMIT
-        self.last_request_time = 0
-        self.request_count = 0
-        self.minute_start = time.time()
         self.metrics = metrics_collector
-    
-    def _rate_limit_check(self):
-        """Ensure we don't exceed the rate limit"""
-        current_time = time.time()
-        
-        # Reset counter every minute
-        if current_time - self.minute_start >= 60:
-            self.request_count = 0
-            self.minute_start = current_time
-        
-        # If we've hit the limit, wait until the next minute
-        if self.request_count >= self.rate_limit:
-            wait_time = 60 - (current_time - self.minute_start)
-            if wait_time > 0:
-                logger.info(f"Rate limit reached. Waiting {wait_time:.2f} seconds...")
-                time.sleep(wait_time)
-                self.request_count = 0
-                self.minute_start = time.time()
-        
-        # Ensure minimum time between requests
-        time_since_last = current_time - self.last_request_time
-        if time_since_last < 1:  # Minimum 1 second between requests
-            time.sleep(1 - time_since_last)
-        
-        self.last_request_time = time.time()
-        self.request_count += 1
+        self.session = create_http_session("wallex", metrics_collector)
+        self.trades_limiter = get_rate_limiter("wallex", "trades", metrics_collector)
+        self.markets_limiter = get_rate_limiter("wallex", "markets", metrics_collector)
+        self.depth_limiter = get_rate_limiter("wallex", "depth", metrics_collector)
     
     def _get_headers(self) -> Dict[str, str]:
         """Get headers for API requests"""
@@ -52,56 +29,86 @@ class WallexAPI:
         }
         return headers
     
-    def get_trades(self, symbol: str) -> Optional[Dict]:
+    def close(self):
+        """Close pooled connections held by this client"""
+        self.session.close()
+    
+    def _get_json(self, url: str, description: str, limiter, params: Optional[Dict] = None) -> Optional[Dict]:
         """
-        Get latest trades for a given symbol
+        Send a rate-limited GET request and return the decoded body if it succeeded
+        
+        Throttled requests are retried up to RATE_LIMIT_MAX_RETRIES times once
+        the limiter has backed off, instead of dropping the data for this cycle.
         
         Args:
-            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+            url: Request URL
+            description: What is being fetched, used for logging
+            limiter: TokenBucket guarding the endpoint
+            params: Optional query parameters
             
         Returns:
-            Dictionary containing trades data or None if error
+            Decoded response or None if error
         """
-        self._rate_limit_check()
-        
-        url = f"{self.base_url}/v1/trades"
-        params = {"symbol": symbol}
-        headers = self._get_headers()
-        start_time = time.time()
-        
-        try:
-            response = requests.get(url, params=params, headers=headers, timeout=10)
-            response.raise_for_status()
+        for attempt in range(RATE_LIMIT_MAX_RETRIES + 1):
+            limiter.acquire()
+            start_time = time.time()
             
-            data = response.json()
-            response_time = time.time() - start_time
-            
-            if data.get("success") == True:
-                # Record successful request metrics
+            try:
+                response = self.session.get(url, params=params, headers=self._get_headers())
+                if self.metrics:
+                    self.metrics.record_stage("http", time.time() - start_time, "wallex")
+                throttled = limiter.observe_response(response.status_code, response.headers)
+                if throttled and attempt < RATE_LIMIT_MAX_RETRIES:
+                    logger.warning(f"Wallex throttled request for {description}, retrying ({attempt + 1}/{RATE_LIMIT_MAX_RETRIES})")
+                    if self.metrics:
+                        self.metrics.record_wallex_request(False, time.time() - start_time)
+                    continue
+                response.raise_for_status()
+                
+                decode_start = time.time()
+                data = response.json()
+                response_time = time.time() - start_time
                 if self.metrics:
-                    self.metrics.record_wallex_request(True, response_time)
-                return data
-            else:
-                logger.error(f"Wallex API error for {symbol}: {data}")
+                    self.metrics.record_stage("json_decode", time.time() - decode_start, "wallex")
+                
+                if data.get("success") == True:
+                    # Record successful request metrics
+                    if self.metrics:
+                        self.metrics.record_wallex_request(True, response_time)
+                    return data
+                else:
+                    logger.error(f"Wallex API error for {description}: {data}")
+                    # Record failed request metrics
+                    if self.metrics:
+                        self.metrics.record_wallex_request(False, response_time)
+                    return None
+                    
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Request failed for {description}: {e}")
+                response_time = time.time() - start_time
+                # Record failed request metrics
+                if self.metrics:
+                    self.metrics.record_wallex_request(False, response_time)
+                return None
+            except ValueError as e:
+                logger.error(f"JSON decode error for {description}: {e}")
+                response_time = time.time() - start_time
                 # Record failed request metrics
                 if self.metrics:
                     self.metrics.record_wallex_request(False, response_time)
                 return None
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Request failed for {symbol}: {e}")
-            response_time = time.time() - start_time
-            # Record failed request metrics
-            if self.metrics:
-                self.metrics.record_wallex_request(False, response_time)
-            return None
-        except ValueError as e:
-            logger.error(f"JSON decode error for {symbol}: {e}")
-            response_time = time.time() - start_time
-            # Record failed request metrics
-            if self.metrics:
-                self.metrics.record_wallex_request(False, response_time)
-            return None
+    
+    def get_trades(self, symbol: str) -> Optional[Dict]:
+        """
+        Get latest trades for a given symbol
+        
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+            
+        Returns:
+            Dictionary containing trades data or None if error
+        """
+        return self._get_json(f"{self.base_url}/v1/trades", symbol, self.trades_limiter, params={"symbol": symbol})
     
     def get_latest_price(self, symbol: str) -> Optional[float]:
         """
@@ -113,8 +120,20 @@ class WallexAPI:
         Returns:
             Latest price as float or None if error
         """
-        trades_data = self.get_trades(symbol)
+        return self.parse_latest_price(self.get_trades(symbol), symbol)
+    
+    @staticmethod
+    def parse_latest_price(trades_data: Optional[Dict], symbol: str) -> Optional[float]:
+        """
+        Extract the most recent trade price from a trades response
         
+        Args:
+            trades_data: Response of the trades endpoint or None
+            symbol: Trading pair symbol, used for logging
+            
+        Returns:
+            Latest price as float or None if missing
+        """
         if not trades_data or not trades_data.get("result", {}).get("latestTrades"):
             return None
         
@@ -129,3 +148,119 @@ class WallexAPI:
         except (ValueError, KeyError) as e:
             logger.error(f"Error parsing price for {symbol}: {e}")
             return None
+    
+    def get_latest_quote(self, symbol: str) -> Optional[Quote]:
+        """
+        Get the latest price for a symbol with its trade time and the time it was received
+        
+        Args:
+            symbol: Trading pair symbol
+            
+        Returns:
+            Quote of the most recent trade or None if error
+        """
+        trades_data = self.get_trades(symbol)
+        return self.parse_latest_quote(trades_data, symbol, time.time())
+    
+    @staticmethod
+    def parse_latest_quote(trades_data: Optional[Dict], symbol: str, received_at: float) -> Optional[Quote]:
+        """
+        Extract the most recent trade price and time from a trades response
+        
+        Args:
+            trades_data: Response of the trades endpoint or None
+            symbol: Trading pair symbol, used for logging
+            received_at: Local time the response was received
+            
+        Returns:
+            Quote or None if the price is missing; trade_time is None if the time is
+        """
+        price = WallexAPI.parse_latest_price(trades_data, symbol)
+        if price is None:
+            return None
+        
+        # Trade times are an ISO 8601 string
+        return Quote(price, received_at, iso_timestamp(trades_data["result"]["latestTrades"][0].get("timestamp")))
+    
+    def get_markets(self) -> Optional[Dict]:
+        """
+        Get the listing with statistics for every Wallex market in a single request
+        
+        Returns:
+            Dictionary containing markets data or None if error
+        """
+        return self._get_json(f"{self.base_url}/v1/markets", "markets", self.markets_limiter)
+    
+    def get_market_snapshot(self) -> Optional[Dict[str, float]]:
+        """
+        Get the latest price of every Wallex market from one markets call
+        
+        Returns:
+            Dictionary mapping symbol (e.g., 'BTCUSDT') to latest price or None if error
+        """
+        return self.parse_market_snapshot(self.get_markets())
+    
+    @staticmethod
+    def parse_market_snapshot(markets_data: Optional[Dict]) -> Optional[Dict[str, float]]:
+        """
+        Map a markets response to latest prices keyed by symbol
+        
+        Args:
+            markets_data: Response of the markets endpoint or None
+            
+        Returns:
+            Dictionary mapping symbol to latest price or None if missing
+        """
+        if not markets_data or not markets_data.get("result", {}).get("symbols"):
+            return None
+        
+        snapshot = {}
+        for symbol, market in markets_data["result"]["symbols"].items():
+            try:
+                snapshot[symbol] = float(market["stats"]["lastPrice"])
+            except (ValueError, KeyError, TypeError) as e:
+                # Markets without trades report lastPrice as '-'
+                logger.debug(f"Skipping Wallex market {symbol}: {e}")
+        
+        return snapshot
+    
+    def get_order_book(self, symbol: str) -> Optional[Dict[str, List[Tuple[float, float]]]]:
+        """
+        Get the bid and ask levels of a symbol's order book
+        
+        Args:
+            symbol: Trading pair symbol (e.g., 'BTCUSDT')
+            
+        Returns:
+            Dictionary with 'bids' (best first, descending) and 'asks' (best first, ascending)
+            as lists of (price, amount) or None if error
+        """
+        return self.parse_order_book(
+            self._get_json(f"{self.base_url}/v1/depth", f"{symbol} order book", self.depth_limiter, params={"symbol": symbol}),
+            symbol
+        )
+    
+    @staticmethod
+    def parse_order_book(depth_data: Optional[Dict], symbol: str) -> Optional[Dict[str, List[Tuple[float, float]]]]:
+        """
+        Extract price levels from a depth response
+        
+        Args:
+            depth_data: Response of the depth endpoint or None
+            symbol: Trading pair symbol, used for logging
+            
+        Returns:
+            Dictionary with sorted 'bids' and 'asks' or None if missing
+        """
+        if not depth_data or not depth_data.get("result"):
+            return None
+        
+        result = depth_data["result"]
+        try:
+            bids = [(float(level["price"]), float(level["quantity"])) for level in result.get("bid", [])]
+            asks = [(float(level["price"]), float(level["quantity"])) for level in result.get("ask", [])]
+        except (ValueError, KeyError, TypeError) as e:
+            logger.error(f"Error parsing order book for {symbol}: {e}")
+            return None
+        
+        return {"bids": sorted(bids, reverse=True), "asks": sorted(asks)}
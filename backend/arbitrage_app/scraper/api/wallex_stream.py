@@ -0,0 +1,61 @@
+import json
+import logging
+from typing import List, Tuple, Union
+from arbitrage_app.scraper.api.price_stream import PriceStream, Ticks, parse_price, load_json, text_frame
+from arbitrage_app.sample_trading import WALLEX_WS_URL
+
+logger = logging.getLogger(__name__)
+
+class WallexStream(PriceStream):
+    """Wallex public trades over its Socket.IO (Engine.IO v4) WebSocket"""
+
+    exchange = "wallex"
+    channel_suffix = "@trade"
+
+    def __init__(self, symbols: List[str], url: str = WALLEX_WS_URL, **kwargs):
+        super().__init__(symbols, url, **kwargs)
+
+    def subscribe_messages(self) -> List[str]:
+        """Nothing to send until the server opens the Engine.IO session"""
+        return []
+
+    def subscribe_frames(self) -> List[str]:
+        """Socket.IO subscribe events, one per symbol"""
+        return [
+            "42" + json.dumps(["subscribe", {"channel": f"{symbol}{self.channel_suffix}"}])
+            for symbol in self.symbols
+        ]
+
+    def handle_message(self, message: Union[str, bytes]) -> Tuple[Ticks, List[str]]:
+        """Parse Socket.IO trade events and drive the Engine.IO handshake and pings"""
+        message = text_frame(message)
+        if message is None:
+            return [], []
+        if message.startswith("0"):
+            return [], ["40"]  # Engine.IO open, join the default namespace
+        if message.startswith("40"):
+            return [], self.subscribe_frames()
+        if message == "2":
+            return [], ["3"]  # ping
+        if not message.startswith("42"):
+            return [], []
+
+        event = load_json(message[2:])
+        if not isinstance(event, list):
+            return [], []
+
+        channel = next((item for item in event if isinstance(item, str) and item.endswith(self.channel_suffix)), None)
+        if channel is None:
+            return [], []
+        symbol = channel[:-len(self.channel_suffix)]
+
+        # Events carry a single trade or a list of trades, oldest first
+        for payload in reversed(event):
+            trades = payload if isinstance(payload, list) else [payload]
+            for trade in reversed(trades):
+                price = parse_price(trade.get("price")) if isinstance(trade, dict) else None
+                if price is not None:
+                    return [(symbol, price)], []
+
+        logger.debug(f"Ignoring Wallex event without a price on {channel}")
+        return [], []
@@ -1,12 +1,17 @@
 import logging
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
 from datetime import datetime
+from itertools import permutations
 from typing import Dict, List, Optional, Tuple
-from dataclasses import dataclass
-from arbitrage_app.scraper.api.nobitex_api import NobitexAPI
-from arbitrage_app.scraper.api.wallex_api import WallexAPI
-from arbitrage_app.sample_trading import TRADING_PAIRS, ARBITRAGE_THRESHOLD
+from dataclasses import dataclass, replace
+import numpy as np
+from arbitrage_app.scraper.api.exchange_registry import create_exchange_clients
+from arbitrage_app.scraper.api.quote import Quote
+from arbitrage_app.scraper.detector.vectorized import calculate_best_spreads, calculate_spread_matrix
+from arbitrage_app.sample_trading import TRADING_PAIRS, EXCHANGES, ARBITRAGE_THRESHOLD, SCAN_MODE, SCAN_MAX_WORKERS, VECTORIZED_DETECTION, MAX_QUOTE_SKEW_SECONDS
 
 logger = logging.getLogger(__name__)
 
@@ -14,46 +19,220 @@ logger = logging.getLogger(__name__)
 class ArbitrageOpportunity:
     """Data class to represent an arbitrage opportunity"""
     symbol: str
-    nobitex_price: float
-    wallex_price: float
+    nobitex_price: Optional[float]
+    wallex_price: Optional[float]
     profit_percentage: float
     profit_amount: float
     buy_exchange: str
     sell_exchange: str
     timestamp: float
+    # Filled by depth scans: size both books support and the average prices it fills at
+    executable_volume: Optional[float] = None
+    buy_vwap: Optional[float] = None
+    sell_vwap: Optional[float] = None
+    # Prices on the buy and sell exchange, which need not be Nobitex or Wallex
+    buy_price: Optional[float] = None
+    sell_price: Optional[float] = None
+    
+    def __post_init__(self):
+        # Opportunities built from the two-exchange fields alone still report buy and sell prices
+        exchange_prices = {"nobitex": self.nobitex_price, "wallex": self.wallex_price}
+        if self.buy_price is None:
+            self.buy_price = exchange_prices.get(self.buy_exchange)
+        if self.sell_price is None:
+            self.sell_price = exchange_prices.get(self.sell_exchange)
+
+OrderBook = Dict[str, List[Tuple[float, float]]]
+
+def mid_price(order_book: Optional[OrderBook]) -> Optional[float]:
+    """Midpoint between the best bid and best ask, or None if either side is empty"""
+    if not order_book or not order_book["bids"] or not order_book["asks"]:
+        return None
+    return (order_book["bids"][0][0] + order_book["asks"][0][0]) / 2
+
+def walk_order_books(asks: List[Tuple[float, float]], bids: List[Tuple[float, float]], threshold: float) -> Tuple[float, float, float]:
+    """
+    Match one exchange's asks against the other's bids, best levels first
+    
+    Levels are consumed while the marginal unit still earns at least `threshold`,
+    so every unit of the returned size is profitable on its own.
+    
+    Args:
+        asks: (price, amount) levels to buy from, ascending
+        bids: (price, amount) levels to sell into, descending
+        threshold: Minimum profit per unit as a fraction of the buy price
+    
+    Returns:
+        Tuple of (volume, total cost, total proceeds)
+    """
+    volume = cost = proceeds = 0.0
+    ask_index = bid_index = 0
+    ask_left = asks[0][1] if asks else 0.0
+    bid_left = bids[0][1] if bids else 0.0
+    
+    while ask_index < len(asks) and bid_index < len(bids):
+        ask_price = asks[ask_index][0]
+        bid_price = bids[bid_index][0]
+        if bid_price < ask_price * (1 + threshold):
+            break
+        
+        size = min(ask_left, bid_left)
+        volume += size
+        cost += size * ask_price
+        proceeds += size * bid_price
+        ask_left -= size
+        bid_left -= size
+        
+        if ask_left <= 0:
+            ask_index += 1
+            ask_left = asks[ask_index][1] if ask_index < len(asks) else 0.0
+        if bid_left <= 0:
+            bid_index += 1
+            bid_left = bids[bid_index][1] if bid_index < len(bids) else 0.0
+    
+    return volume, cost, proceeds
 
 class ArbitrageDetector:
-    """Main class for detecting arbitrage opportunities between Nobitex and Wallex"""
+    """Main class for detecting arbitrage opportunities across the configured exchanges"""
+    
+    use_async_clients = False
     
-    def __init__(self, metrics_collector=None, database_service=None):
-        self.nobitex_api = NobitexAPI(metrics_collector)
-        self.wallex_api = WallexAPI(metrics_collector)
-        self.trading_pairs = TRADING_PAIRS
+    def __init__(self, metrics_collector=None, database_service=None, exchanges: Optional[List[str]] = None,
+                 trading_pairs: Optional[List[str]] = None):
+        self.exchanges = create_exchange_clients(exchanges or EXCHANGES, metrics_collector, self.use_async_clients)
+        self.nobitex_api = self.exchanges.get("nobitex")
+        self.wallex_api = self.exchanges.get("wallex")
+        self.trading_pairs = trading_pairs or TRADING_PAIRS
         self.threshold = ARBITRAGE_THRESHOLD
         self.metrics = metrics_collector
         self.database_service = database_service
-        
+        self.scan_mode = SCAN_MODE
+        self.max_workers = SCAN_MAX_WORKERS
+        self.last_scan_duration = None
+        self.vectorized = VECTORIZED_DETECTION
+        self.max_quote_skew = MAX_QUOTE_SKEW_SECONDS
+        # Latest fetched quote of each symbol on each exchange, with its trade and receive times
+        self.quote_times: Dict[str, Dict[str, Quote]] = {}
+        # Price rows collected while batch_price_writes is active, None otherwise
+        self._price_batch = None
+    
+    def close(self):
+        """Close the exchange clients' pooled HTTP sessions"""
+        for client in self.exchanges.values():
+            client.close()
+    
     def get_price_data(self, symbol: str) -> Dict[str, Optional[float]]:
         """
-        Get price data from both exchanges for a given symbol
+        Get price data from every exchange for a given symbol
         
         Args:
             symbol: Trading pair symbol
+        
+        Returns:
+            Dictionary mapping exchange name to price
+        """
+        return self._keep_quotes(symbol, {
+            exchange: client.get_latest_quote(symbol)
+            for exchange, client in self.exchanges.items()
+        })
+    
+    def _keep_quotes(self, symbol: str, quotes: Dict[str, Optional[Quote]]) -> Dict[str, Optional[float]]:
+        """Keep a symbol's fetched quotes for its evaluation and return their prices"""
+        self.quote_times[symbol] = {exchange: quote for exchange, quote in quotes.items() if quote}
+        return {exchange: quote.price if quote else None for exchange, quote in quotes.items()}
+    
+    def _fetch_per_symbol(self, method_name: str) -> Dict[str, Dict[str, object]]:
+        """Call a per-symbol client method for every pair on every exchange in parallel"""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                symbol: {
+                    exchange: executor.submit(getattr(client, method_name), symbol)
+                    for exchange, client in self.exchanges.items()
+                }
+                for symbol in self.trading_pairs
+            }
             
+            return {
+                symbol: {
+                    exchange: self._future_result(future, symbol, exchange.title())
+                    for exchange, future in exchange_futures.items()
+                }
+                for symbol, exchange_futures in futures.items()
+            }
+    
+    def get_all_order_books(self) -> Dict[str, Dict[str, Optional[OrderBook]]]:
+        """
+        Get order books from every exchange for all trading pairs in parallel
+        
         Returns:
-            Dictionary with prices from both exchanges
+            Dictionary mapping symbol to a dictionary with the order book of each exchange
         """
-        # Get Nobitex price
-        nobitex_price = self.nobitex_api.get_latest_price(symbol)
+        return self._fetch_per_symbol("get_order_book")
+    
+    def get_all_price_data_concurrent(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Get price data from every exchange for all trading pairs in parallel
         
-        # Get Wallex price
-        wallex_price = self.wallex_api.get_latest_price(symbol)
+        Each exchange client serializes its own requests through its rate limiter,
+        so the exchanges are fetched side by side at their full request budget.
         
+        Returns:
+            Dictionary mapping symbol to a dictionary with prices from every exchange
+        """
         return {
-            "nobitex": nobitex_price,
-            "wallex": wallex_price
+            symbol: self._keep_quotes(symbol, quotes)
+            for symbol, quotes in self._fetch_per_symbol("get_latest_quote").items()
         }
     
+    def get_all_price_data_snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Get price data for all trading pairs from one market snapshot per exchange
+        
+        Scan cost is one request per exchange regardless of how many pairs are watched.
+        
+        Returns:
+            Dictionary mapping symbol to a dictionary with prices from every exchange
+        """
+        with ThreadPoolExecutor(max_workers=len(self.exchanges)) as executor:
+            futures = {
+                exchange: executor.submit(self._call_received, client.get_market_snapshot)
+                for exchange, client in self.exchanges.items()
+            }
+            snapshots = {
+                exchange: self._future_result(future, "all markets", exchange.title())
+                for exchange, future in futures.items()
+            }
+        
+        return self._snapshot_price_data(snapshots)
+    
+    @staticmethod
+    def _call_received(method, *args) -> Tuple[object, float]:
+        """Call a client method and return its result with the local time it came back"""
+        return method(*args), time.time()
+    
+    def _snapshot_price_data(self, snapshots: Dict[str, Optional[Tuple[Optional[Dict[str, float]], float]]]) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Split (snapshot, received_at) results per exchange into prices per symbol
+        
+        Snapshots carry no trade times, so their quotes are timed by when they were received.
+        """
+        quotes = {symbol: {} for symbol in self.trading_pairs}
+        for exchange, result in snapshots.items():
+            snapshot, received_at = result or (None, None)
+            for symbol in self.trading_pairs:
+                price = (snapshot or {}).get(symbol)
+                quotes[symbol][exchange] = Quote(price, received_at) if price is not None else None
+        
+        return {symbol: self._keep_quotes(symbol, symbol_quotes) for symbol, symbol_quotes in quotes.items()}
+    
+    def _future_result(self, future, symbol: str, exchange: str):
+        """Unwrap a price future, logging instead of raising on failure"""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Error fetching {exchange} price for {symbol}: {e}")
+            return None
+    
     def calculate_arbitrage(self, nobitex_price: float, wallex_price: float) -> Optional[Tuple[float, str, str]]:
         """
         Calculate arbitrage opportunity between two prices
@@ -61,60 +240,137 @@ class ArbitrageDetector:
         Args:
             nobitex_price: Price from Nobitex
             wallex_price: Price from Wallex
-            
+        
+        Returns:
+            Tuple of (profit_percentage, buy_exchange, sell_exchange) or None if no opportunity
+        """
+        return self.calculate_best_spread({"nobitex": nobitex_price, "wallex": wallex_price})
+    
+    def calculate_best_spread(self, prices: Dict[str, Optional[float]]) -> Optional[Tuple[float, str, str]]:
+        """
+        Calculate the most profitable arbitrage across any number of exchanges
+        
+        The best combination buys on the cheapest exchange and sells on the
+        dearest, so one pass over the prices finds it.
+        
+        Args:
+            prices: Dictionary mapping exchange name to price
+        
         Returns:
             Tuple of (profit_percentage, buy_exchange, sell_exchange) or None if no opportunity
         """
-        if not nobitex_price or not wallex_price:
+        quoted = {exchange: price for exchange, price in prices.items() if price}
+        if len(quoted) < 2:
             return None
         
-        # Calculate profit percentage for both directions
-        # Direction 1: Buy on Wallex, Sell on Nobitex
-        profit_1 = ((nobitex_price - wallex_price) / wallex_price) * 100
+        buy_exchange = min(quoted, key=quoted.get)
+        sell_exchange = max(quoted, key=quoted.get)
+        if buy_exchange == sell_exchange:
+            return None
         
-        # Direction 2: Buy on Nobitex, Sell on Wallex  
-        profit_2 = ((wallex_price - nobitex_price) / nobitex_price) * 100
+        profit_percentage = ((quoted[sell_exchange] - quoted[buy_exchange]) / quoted[buy_exchange]) * 100
         
-        # Check if either direction meets the threshold
-        if profit_1 >= self.threshold * 100:
-            return profit_1, "wallex", "nobitex"
-        elif profit_2 >= self.threshold * 100:
-            return profit_2, "nobitex", "wallex"
+        # Check if the best combination meets the threshold
+        if profit_percentage >= self.threshold * 100:
+            return profit_percentage, buy_exchange, sell_exchange
         
         return None
     
+    def get_spread_matrix(self, all_price_data: Dict[str, Dict[str, Optional[float]]]) -> Tuple[List[str], np.ndarray]:
+        """
+        Calculate the pairwise spread between every exchange for every trading pair
+        
+        Args:
+            all_price_data: Dictionary mapping symbol to prices from every exchange
+        
+        Returns:
+            Tuple of (exchange names, array of shape (symbols, exchanges, exchanges)) where
+            [s, buy, sell] is the profit percentage of buying on `buy` and selling on `sell`
+        """
+        exchanges, prices = self._price_matrix(all_price_data)
+        return exchanges, calculate_spread_matrix(prices)
+    
+    def _price_matrix(self, all_price_data: Dict[str, Dict[str, Optional[float]]]) -> Tuple[List[str], np.ndarray]:
+        """Arrange prices as a (symbols x exchanges) matrix with NaN for missing prices"""
+        exchanges = list(self.exchanges)
+        prices = np.array([
+            [all_price_data[symbol].get(exchange) or np.nan for exchange in exchanges]
+            for symbol in self.trading_pairs
+        ], dtype=float).reshape(len(self.trading_pairs), len(exchanges))
+        return exchanges, prices
+    
+    def calculate_depth_arbitrage(self, order_books: Dict[str, Optional[OrderBook]]) -> Optional[Tuple[float, float, float, str, str]]:
+        """
+        Calculate the arbitrage the order books can actually execute
+        
+        Every ordered pair of exchanges is walked and the most profitable fill is kept.
+        
+        Args:
+            order_books: Dictionary mapping exchange name to order book
+        
+        Returns:
+            Tuple of (executable_volume, buy_vwap, sell_vwap, buy_exchange, sell_exchange) or None if no opportunity
+        """
+        best_result = None
+        best_profit = 0.0
+        books = {exchange: book for exchange, book in order_books.items() if book}
+        
+        for buy_exchange, sell_exchange in permutations(books, 2):
+            volume, cost, proceeds = walk_order_books(books[buy_exchange]["asks"], books[sell_exchange]["bids"], self.threshold)
+            if volume > 0 and proceeds - cost > best_profit:
+                best_profit = proceeds - cost
+                best_result = (volume, cost / volume, proceeds / volume, buy_exchange, sell_exchange)
+        
+        return best_result
+    
     def detect_arbitrage_opportunity(self, symbol: str) -> Optional[ArbitrageOpportunity]:
         """
         Detect arbitrage opportunity for a specific symbol
         
         Args:
             symbol: Trading pair symbol
-            
+        
+        Returns:
+            ArbitrageOpportunity object or None if no opportunity found
+        """
+        return self.evaluate_prices(symbol, self.get_price_data(symbol))
+    
+    def evaluate_price_data(self, symbol: str, nobitex_price: Optional[float], wallex_price: Optional[float]) -> Optional[ArbitrageOpportunity]:
+        """
+        Store, record and check already fetched Nobitex and Wallex prices for an arbitrage opportunity
+        
+        Args:
+            symbol: Trading pair symbol
+            nobitex_price: Price from Nobitex
+            wallex_price: Price from Wallex
+        
         Returns:
             ArbitrageOpportunity object or None if no opportunity found
         """
-        price_data = self.get_price_data(symbol)
+        return self.evaluate_prices(symbol, {"nobitex": nobitex_price, "wallex": wallex_price})
+    
+    def evaluate_prices(self, symbol: str, prices: Dict[str, Optional[float]]) -> Optional[ArbitrageOpportunity]:
+        """
+        Store, record and check already fetched prices for an arbitrage opportunity
         
-        nobitex_price = price_data["nobitex"]
-        wallex_price = price_data["wallex"]
+        Args:
+            symbol: Trading pair symbol
+            prices: Dictionary mapping exchange name to price
         
-        if not nobitex_price or not wallex_price:
-            logger.warning(f"Missing price data for {symbol}: Nobitex={nobitex_price}, Wallex={wallex_price}")
+        Returns:
+            ArbitrageOpportunity object or None if no opportunity found
+        """
+        quoted = {exchange: price for exchange, price in prices.items() if price}
+        if len(quoted) < 2:
+            logger.warning(f"Missing price data for {symbol}: {self._format_prices(prices)}")
             return None
         
-        # Store price data in database
-        self.database_service.store_price_data(symbol, nobitex_price, wallex_price, datetime.utcnow())
-        # Update price metrics
-        if self.metrics:
-            self.metrics.update_exchange_prices(symbol, nobitex_price, wallex_price)
-            
-            # Calculate and update price difference
-            price_diff_percentage = abs(nobitex_price - wallex_price) / min(nobitex_price, wallex_price) * 100
-            self.metrics.update_price_difference(symbol, price_diff_percentage)
+        if not self._check_quote_times(symbol, quoted):
+            return None
         
-        logger.info(f"Nobitex price and Wallex price for {symbol} received successfully")
+        self._record_prices(symbol, quoted)
         
-        arbitrage_result = self.calculate_arbitrage(nobitex_price, wallex_price)
+        arbitrage_result = self.calculate_best_spread(quoted)
         
         if not arbitrage_result:
             return None
@@ -122,50 +378,309 @@ class ArbitrageDetector:
         profit_percentage, buy_exchange, sell_exchange = arbitrage_result
         
         # Calculate profit amount (assuming 1 unit trade)
-        if buy_exchange == "nobitex":
-            profit_amount = wallex_price - nobitex_price
-        else:
-            profit_amount = nobitex_price - wallex_price
+        profit_amount = quoted[sell_exchange] - quoted[buy_exchange]
         
-        # Store arbitrage opportunity in database
-        self.database_service.store_arbitrage_opportunity(ArbitrageOpportunity(symbol, nobitex_price, wallex_price, profit_percentage, profit_amount, buy_exchange, sell_exchange, datetime.utcnow()))
-        # Record arbitrage opportunity metrics
+        return self._create_opportunity(symbol, quoted, profit_percentage, profit_amount, buy_exchange, sell_exchange)
+    
+    def _check_quote_times(self, symbol: str, prices: Dict[str, float]) -> bool:
+        """
+        Record the age and skew of a symbol's quotes and tell whether they are close enough in time to compare
+        
+        Prices given without a fetched quote, e.g. evaluated directly, have no times and always pass.
+        
+        Args:
+            symbol: Trading pair symbol
+            prices: Dictionary mapping exchange name to the price about to be compared
+        
+        Returns:
+            False if the quotes are further apart than max_quote_skew seconds
+        """
+        quotes = {
+            exchange: quote for exchange, quote in self.quote_times.get(symbol, {}).items()
+            if prices.get(exchange) == quote.price
+        }
+        if not quotes:
+            return True
+        
+        now = time.time()
+        skew = max(quote.time for quote in quotes.values()) - min(quote.time for quote in quotes.values())
         if self.metrics:
-            self.metrics.record_arbitrage_opportunity(symbol, buy_exchange, sell_exchange)
+            for exchange, quote in quotes.items():
+                self.metrics.record_quote_age(symbol, exchange, now - quote.time)
+            if len(quotes) > 1:
+                self.metrics.record_quote_skew(symbol, skew)
+        
+        if self.max_quote_skew is not None and skew > self.max_quote_skew:
+            logger.warning(f"Discarding prices for {symbol}: quotes are {skew:.1f} seconds apart "
+                           f"(max {self.max_quote_skew} seconds)")
+            if self.metrics:
+                self.metrics.record_stale_quotes(symbol)
+            return False
+        return True
+    
+    def _stage(self, stage: str, exchange: str = "all"):
+        """Context manager timing a scan stage, or doing nothing without metrics"""
+        return self.metrics.time_stage(stage, exchange) if self.metrics else nullcontext()
+    
+    def _format_prices(self, prices: Dict[str, Optional[float]]) -> str:
+        """Format prices per exchange for logging"""
+        return ", ".join(f"{exchange.title()}={price}" for exchange, price in prices.items())
+    
+    def _record_prices(self, symbol: str, prices: Dict[str, float]):
+        """Store a symbol's prices and update its price metrics"""
+        # Store price data in database, or hold it for the batch write at the end of a scan
+        if self._price_batch is not None:
+            self._price_batch.append((symbol, prices, datetime.utcnow()))
+        elif self.database_service:
+            with self._stage("db_write"):
+                self.database_service.store_exchange_prices(symbol, prices, datetime.utcnow())
+        # Update price metrics
+        if self.metrics:
+            self.metrics.update_exchange_prices(symbol, prices.get("nobitex"), prices.get("wallex"))
+            for exchange, price in prices.items():
+                self.metrics.update_exchange_price(symbol, exchange, price)
+            
+            # Calculate and update price difference
+            lowest_price = min(prices.values())
+            price_diff_percentage = (max(prices.values()) - lowest_price) / lowest_price * 100
+            self.metrics.update_price_difference(symbol, price_diff_percentage)
         
-        return ArbitrageOpportunity(
+        logger.info(f"Prices for {symbol} received successfully from {', '.join(exchange.title() for exchange in prices)}")
+    
+    def _create_opportunity(self, symbol: str, prices: Dict[str, float], profit_percentage: float, profit_amount: float,
+                            buy_exchange: str, sell_exchange: str, **depth_fields) -> ArbitrageOpportunity:
+        """Store and record a detected opportunity and return it"""
+        opportunity = ArbitrageOpportunity(
             symbol=symbol,
-            nobitex_price=nobitex_price,
-            wallex_price=wallex_price,
+            nobitex_price=prices.get("nobitex"),
+            wallex_price=prices.get("wallex"),
             profit_percentage=profit_percentage,
             profit_amount=profit_amount,
             buy_exchange=buy_exchange,
             sell_exchange=sell_exchange,
-            timestamp=time.time()
+            timestamp=time.time(),
+            buy_price=prices[buy_exchange],
+            sell_price=prices[sell_exchange],
+            **depth_fields
         )
+        
+        # Store arbitrage opportunity in database
+        if self.database_service:
+            with self._stage("db_write"):
+                self.database_service.store_arbitrage_opportunity(replace(opportunity, timestamp=datetime.utcnow()))
+        # Record arbitrage opportunity metrics
+        if self.metrics:
+            self.metrics.record_arbitrage_opportunity(symbol, buy_exchange, sell_exchange)
+        
+        return opportunity
+    
+    @contextmanager
+    def batch_price_writes(self):
+        """
+        Collect the prices stored inside the block and write them in one transaction on exit
+        
+        Nested blocks join the outermost batch. A failed write is logged rather
+        than raised, so the opportunities found in the block are kept.
+        """
+        if self._price_batch is not None or not self.database_service:
+            yield
+            return
+        
+        self._price_batch = []
+        try:
+            yield
+        finally:
+            price_batch, self._price_batch = self._price_batch, None
+            if price_batch:
+                try:
+                    with self._stage("db_write"):
+                        self.database_service.store_price_batch(price_batch)
+                except Exception as e:
+                    logger.error(f"Error storing prices for {len(price_batch)} symbols: {e}")
     
-    def scan_all_pairs(self) -> List[ArbitrageOpportunity]:
+    def scan_all_pairs(self, mode: Optional[str] = None) -> List[ArbitrageOpportunity]:
         """
         Scan all trading pairs for arbitrage opportunities
         
+        Args:
+            mode: 'sequential', 'concurrent', 'snapshot' or 'depth'; defaults to SCAN_MODE
+        
         Returns:
             List of ArbitrageOpportunity objects
         """
+        mode = mode or self.scan_mode
         opportunities = []
         
-        logger.info(f"Scanning {len(self.trading_pairs)} trading pairs for arbitrage opportunities...")
-        
-        for symbol in self.trading_pairs:
-            try:
-                opportunity = self.detect_arbitrage_opportunity(symbol)
-                if opportunity:
-                    opportunities.append(opportunity)
-                    logger.info(f"Arbitrage opportunity found for {symbol}: "
-                              f"{opportunity.profit_percentage:.6f}% profit "
-                              f"(Buy {opportunity.buy_exchange}, Sell {opportunity.sell_exchange})")
-            except Exception as e:
-                logger.error(f"Error scanning {symbol}: {e}")
+        logger.info(f"Scanning {len(self.trading_pairs)} trading pairs for arbitrage opportunities ({mode} mode)...")
+        start_time = time.time()
+        
+        if mode == "sequential":
+            # Fetching and evaluating interleave per symbol, so only the inner stages are timed
+            with self.batch_price_writes():
+                for symbol in self.trading_pairs:
+                    self._collect_opportunity(
+                        opportunities, symbol,
+                        lambda: self.detect_arbitrage_opportunity(symbol)
+                    )
+        else:
+            fetch, evaluate = self._scan_steps(mode)
+            with self._stage("fetch"):
+                fetched = fetch()
+            with self._stage("evaluate"):
+                opportunities = evaluate(fetched)
+        
+        self.last_scan_duration = time.time() - start_time
+        logger.info(f"Found {len(opportunities)} arbitrage opportunities "
+                   f"in {self.last_scan_duration:.2f} seconds ({mode} mode)")
+        return opportunities
+    
+    def _scan_steps(self, mode: str):
+        """Fetch and evaluate functions of a batch scan mode"""
+        if mode == "snapshot":
+            return self.get_all_price_data_snapshot, self.evaluate_all_price_data
+        if mode == "depth":
+            return self.get_all_order_books, self.evaluate_all_order_books
+        if mode == "concurrent":
+            return self.get_all_price_data_concurrent, self.evaluate_all_price_data
+        raise ValueError(f"Unknown scan mode: {mode}")
+    
+    def evaluate_all_price_data(self, all_price_data: Dict[str, Dict[str, Optional[float]]]) -> List[ArbitrageOpportunity]:
+        """
+        Evaluate prices fetched for every trading pair in one pass
+        
+        The prices of all pairs are stored in a single transaction.
+        
+        Args:
+            all_price_data: Dictionary mapping symbol to prices from every exchange
+        
+        Returns:
+            List of ArbitrageOpportunity objects
+        """
+        with self.batch_price_writes():
+            if self.vectorized:
+                return self.evaluate_all_price_data_vectorized(all_price_data)
+            
+            opportunities = []
+            for symbol in self.trading_pairs:
+                prices = all_price_data[symbol]
+                self._collect_opportunity(
+                    opportunities, symbol,
+                    lambda: self.evaluate_prices(symbol, prices)
+                )
+            return opportunities
+    
+    def evaluate_all_price_data_vectorized(self, all_price_data: Dict[str, Dict[str, Optional[float]]]) -> List[ArbitrageOpportunity]:
+        """
+        Evaluate prices fetched for every trading pair with one vectorized spread calculation
+        
+        Gives the same results as the per-symbol path; only storage and metrics remain per symbol.
+        
+        Args:
+            all_price_data: Dictionary mapping symbol to prices from every exchange
+        
+        Returns:
+            List of ArbitrageOpportunity objects
+        """
+        exchanges, prices = self._price_matrix(all_price_data)
+        profit_percentage, profit_amount, buy_index, sell_index, is_opportunity = calculate_best_spreads(prices, self.threshold)
+        
+        opportunities = []
+        for index, symbol in enumerate(self.trading_pairs):
+            quoted = {exchange: price for exchange, price in all_price_data[symbol].items() if price}
+            if len(quoted) < 2:
+                logger.warning(f"Missing price data for {symbol}: {self._format_prices(all_price_data[symbol])}")
                 continue
+            if not self._check_quote_times(symbol, quoted):
+                continue
+            
+            result = None
+            if is_opportunity[index]:
+                result = (float(profit_percentage[index]), float(profit_amount[index]),
+                          exchanges[buy_index[index]], exchanges[sell_index[index]])
+            
+            self._collect_opportunity(
+                opportunities, symbol,
+                lambda: self._evaluate_batch_result(symbol, quoted, result)
+            )
+        return opportunities
+    
+    def _evaluate_batch_result(self, symbol: str, prices: Dict[str, float],
+                               result: Optional[Tuple[float, float, str, str]]) -> Optional[ArbitrageOpportunity]:
+        """Record one symbol's prices and create its opportunity from a precomputed batch result"""
+        self._record_prices(symbol, prices)
+        if not result:
+            return None
+        profit_percentage, profit_amount, buy_exchange, sell_exchange = result
+        return self._create_opportunity(symbol, prices, profit_percentage, profit_amount, buy_exchange, sell_exchange)
+    
+    def evaluate_order_books(self, symbol: str, order_books: Dict[str, Optional[OrderBook]]) -> Optional[ArbitrageOpportunity]:
+        """
+        Store, record and check already fetched order books for an executable arbitrage opportunity
+        
+        Prices stored and exported for the symbol are the mid prices of each book.
         
-        logger.info(f"Found {len(opportunities)} arbitrage opportunities")
+        Args:
+            symbol: Trading pair symbol
+            order_books: Dictionary mapping exchange name to order book
+        
+        Returns:
+            ArbitrageOpportunity object with depth fields or None if no opportunity found
+        """
+        mid_prices = {exchange: mid_price(book) for exchange, book in order_books.items()}
+        quoted = {exchange: price for exchange, price in mid_prices.items() if price}
+        if len(quoted) < 2:
+            logger.warning(f"Missing order book for {symbol}: {self._format_prices(mid_prices)}")
+            return None
+        
+        self._record_prices(symbol, quoted)
+        
+        depth_result = self.calculate_depth_arbitrage(order_books)
+        
+        if not depth_result:
+            return None
+        
+        executable_volume, buy_vwap, sell_vwap, buy_exchange, sell_exchange = depth_result
+        profit_percentage = (sell_vwap - buy_vwap) / buy_vwap * 100
+        profit_amount = (sell_vwap - buy_vwap) * executable_volume
+        
+        # Report the prices the fill actually gets on the two exchanges it uses
+        fill_prices = dict(quoted)
+        fill_prices[buy_exchange] = buy_vwap
+        fill_prices[sell_exchange] = sell_vwap
+        
+        return self._create_opportunity(
+            symbol, fill_prices, profit_percentage, profit_amount, buy_exchange, sell_exchange,
+            executable_volume=executable_volume, buy_vwap=buy_vwap, sell_vwap=sell_vwap
+        )
+    
+    def evaluate_all_order_books(self, order_books: Dict[str, Dict[str, Optional[OrderBook]]]) -> List[ArbitrageOpportunity]:
+        """
+        Evaluate order books fetched for every trading pair in one pass
+        
+        Args:
+            order_books: Dictionary mapping symbol to order books from every exchange
+        
+        Returns:
+            List of ArbitrageOpportunity objects
+        """
+        opportunities = []
+        with self.batch_price_writes():
+            for symbol in self.trading_pairs:
+                books = order_books[symbol]
+                self._collect_opportunity(
+                    opportunities, symbol,
+                    lambda: self.evaluate_order_books(symbol, books)
+                )
         return opportunities
+    
+    def _collect_opportunity(self, opportunities: List[ArbitrageOpportunity], symbol: str, detect) -> None:
+        """Run one symbol's detection step and append any opportunity it finds"""
+        try:
+            opportunity = detect()
+            if opportunity:
+                opportunities.append(opportunity)
+                logger.info(f"Arbitrage opportunity found for {symbol}: "
+                          f"{opportunity.profit_percentage:.6f}% profit "
+                          f"(Buy {opportunity.buy_exchange}, Sell {opportunity.sell_exchange})")
+        except Exception as e:
+            logger.error(f"Error scanning {symbol}: {e}")
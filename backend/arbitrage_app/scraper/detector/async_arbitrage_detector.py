@@ -0,0 +1,158 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector, ArbitrageOpportunity, OrderBook
+
+logger = logging.getLogger(__name__)
+
+class AsyncArbitrageDetector(ArbitrageDetector):
+    """asyncio variant of ArbitrageDetector that keeps all quote requests in flight on one event loop"""
+
+    use_async_clients = True
+
+    async def close(self):
+        """Close the exchange clients' sessions"""
+        await asyncio.gather(*(client.close() for client in self.exchanges.values()))
+
+    async def _gather_exchanges(self, method_name: str, *args) -> Dict[str, object]:
+        """Call one client method on every exchange concurrently, logging failures as None"""
+        results = await asyncio.gather(
+            *(getattr(client, method_name)(*args) for client in self.exchanges.values()),
+            return_exceptions=True
+        )
+        subject = args[0] if args else "all markets"
+        return {
+            exchange: self._gather_result(result, subject, exchange.title())
+            for exchange, result in zip(self.exchanges, results)
+        }
+
+    async def get_price_data(self, symbol: str) -> Dict[str, Optional[float]]:
+        """
+        Get price data from every exchange for a given symbol
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            Dictionary mapping exchange name to price
+        """
+        return self._keep_quotes(symbol, await self._gather_exchanges("get_latest_quote", symbol))
+
+    async def get_all_price_data_concurrent(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Get price data from every exchange for all trading pairs as concurrent tasks
+
+        Returns:
+            Dictionary mapping symbol to a dictionary with prices from every exchange
+        """
+        results = await asyncio.gather(*(self.get_price_data(symbol) for symbol in self.trading_pairs))
+        return dict(zip(self.trading_pairs, results))
+
+    async def get_all_price_data_snapshot(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """
+        Get price data for all trading pairs from one market snapshot per exchange
+
+        Returns:
+            Dictionary mapping symbol to a dictionary with prices from every exchange
+        """
+        results = await asyncio.gather(
+            *(self._await_received(client.get_market_snapshot()) for client in self.exchanges.values()),
+            return_exceptions=True
+        )
+        snapshots = {
+            exchange: self._gather_result(result, "all markets", exchange.title())
+            for exchange, result in zip(self.exchanges, results)
+        }
+
+        return self._snapshot_price_data(snapshots)
+
+    @staticmethod
+    async def _await_received(coroutine) -> Tuple[object, float]:
+        """Await a client call and return its result with the local time it came back"""
+        return await coroutine, time.time()
+
+    async def get_order_books(self, symbol: str) -> Dict[str, Optional[OrderBook]]:
+        """
+        Get order books from every exchange for a given symbol
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            Dictionary with the order book of each exchange
+        """
+        return await self._gather_exchanges("get_order_book", symbol)
+
+    async def get_all_order_books(self) -> Dict[str, Dict[str, Optional[OrderBook]]]:
+        """
+        Get order books from every exchange for all trading pairs as concurrent tasks
+
+        Returns:
+            Dictionary mapping symbol to a dictionary with the order book of each exchange
+        """
+        results = await asyncio.gather(*(self.get_order_books(symbol) for symbol in self.trading_pairs))
+        return dict(zip(self.trading_pairs, results))
+
+    def _gather_result(self, result, symbol: str, exchange: str):
+        """Turn an exception returned by asyncio.gather into a logged None"""
+        if isinstance(result, Exception):
+            logger.error(f"Error fetching {exchange} price for {symbol}: {result}")
+            return None
+        return result
+
+    async def detect_arbitrage_opportunity(self, symbol: str) -> Optional[ArbitrageOpportunity]:
+        """
+        Detect arbitrage opportunity for a specific symbol
+
+        Args:
+            symbol: Trading pair symbol
+
+        Returns:
+            ArbitrageOpportunity object or None if no opportunity found
+        """
+        price_data = await self.get_price_data(symbol)
+        loop = asyncio.get_running_loop()
+        # Database writes are blocking, keep them off the event loop
+        return await loop.run_in_executor(None, self.evaluate_prices, symbol, price_data)
+
+    async def scan_all_pairs(self, mode: Optional[str] = None) -> List[ArbitrageOpportunity]:
+        """
+        Scan all trading pairs for arbitrage opportunities
+
+        Args:
+            mode: 'sequential', 'concurrent', 'snapshot' or 'depth'; defaults to SCAN_MODE
+
+        Returns:
+            List of ArbitrageOpportunity objects
+        """
+        mode = mode or self.scan_mode
+
+        logger.info(f"Scanning {len(self.trading_pairs)} trading pairs for arbitrage opportunities ({mode} mode, async)...")
+        start_time = time.time()
+
+        evaluate = self.evaluate_all_price_data
+        with self._stage("fetch"):
+            if mode == "depth":
+                fetched = await self.get_all_order_books()
+                evaluate = self.evaluate_all_order_books
+            elif mode == "snapshot":
+                fetched = await self.get_all_price_data_snapshot()
+            elif mode == "concurrent":
+                fetched = await self.get_all_price_data_concurrent()
+            elif mode == "sequential":
+                fetched = {}
+                for symbol in self.trading_pairs:
+                    fetched[symbol] = await self.get_price_data(symbol)
+            else:
+                raise ValueError(f"Unknown scan mode: {mode}")
+
+        loop = asyncio.get_running_loop()
+        # Database writes are blocking, keep them off the event loop
+        with self._stage("evaluate"):
+            opportunities = await loop.run_in_executor(None, evaluate, fetched)
+
+        self.last_scan_duration = time.time() - start_time
+        logger.info(f"Found {len(opportunities)} arbitrage opportunities "
+                   f"in {self.last_scan_duration:.2f} seconds ({mode} mode, async)")
+        return opportunities
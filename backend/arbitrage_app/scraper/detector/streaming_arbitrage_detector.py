@@ -0,0 +1,120 @@
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+from arbitrage_app.scraper.api.nobitex_stream import NobitexStream
+from arbitrage_app.scraper.api.quote import Quote
+from arbitrage_app.scraper.api.wallex_stream import WallexStream
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector, ArbitrageOpportunity
+
+logger = logging.getLogger(__name__)
+
+OpportunityHandler = Callable[[ArbitrageOpportunity], Awaitable[None]]
+
+class StreamingArbitrageDetector(ArbitrageDetector):
+    """
+    Event-driven variant of ArbitrageDetector fed by the exchanges' WebSocket trade streams
+
+    The latest price per symbol and exchange is kept in memory and a symbol is
+    re-evaluated only when one of its quotes changes, so an opportunity is seen
+    as soon as the tick that opened it arrives instead of at the next scan.
+    """
+
+    nobitex_stream_class = NobitexStream
+    wallex_stream_class = WallexStream
+
+    def __init__(self, metrics_collector=None, database_service=None, nobitex_url: Optional[str] = None,
+                 wallex_url: Optional[str] = None, trading_pairs: Optional[List[str]] = None):
+        super().__init__(metrics_collector, database_service, trading_pairs=trading_pairs)
+        self.streams = [
+            self._create_stream(self.nobitex_stream_class, nobitex_url),
+            self._create_stream(self.wallex_stream_class, wallex_url)
+        ]
+        self.quotes: Dict[str, Dict[str, Optional[float]]] = {
+            symbol: {exchange: None for exchange in self.exchanges} for symbol in self.trading_pairs
+        }
+        self.on_opportunity: Optional[OpportunityHandler] = None
+        self.evaluations = 0
+        self.last_detection_latency = None
+
+    def _create_stream(self, stream_class, url: Optional[str]):
+        """Create a stream for the watched pairs, on its default URL unless one is given"""
+        if url is None:
+            return stream_class(self.trading_pairs)
+        return stream_class(self.trading_pairs, url)
+
+    def seed_quotes(self):
+        """Fill the quote table from one REST market snapshot so detection starts before the first ticks"""
+        for symbol, price_data in self.get_all_price_data_snapshot().items():
+            for exchange, price in price_data.items():
+                if price is not None and self.quotes[symbol][exchange] is None:
+                    self.quotes[symbol][exchange] = price
+
+    async def on_tick(self, exchange: str, symbol: str, price: float, received_at: float):
+        """
+        Update the quote table with a streamed price and re-evaluate the symbol if it changed
+
+        Args:
+            exchange: Exchange name (e.g., 'nobitex')
+            symbol: Trading pair symbol
+            price: Traded price
+            received_at: Time the frame carrying the tick was received
+        """
+        if self.metrics:
+            self.metrics.record_stream_tick(exchange)
+
+        quote = self.quotes.get(symbol)
+        if quote is None or exchange not in quote:
+            return
+        # A repeated price still refreshes how old the quote is
+        self.quote_times.setdefault(symbol, {})[exchange] = Quote(price, received_at)
+        if quote[exchange] == price:
+            return
+        quote[exchange] = price
+
+        if sum(1 for quoted_price in quote.values() if quoted_price is not None) < 2:
+            return
+
+        loop = asyncio.get_running_loop()
+        try:
+            # Database writes are blocking, keep them off the event loop
+            opportunity = await loop.run_in_executor(None, self.evaluate_prices, symbol, dict(quote))
+        except Exception as e:
+            logger.error(f"Error evaluating {symbol} after {exchange} tick: {e}")
+            return
+
+        self.evaluations += 1
+        self.last_detection_latency = time.time() - received_at
+        if self.metrics:
+            self.metrics.record_detection_latency(self.last_detection_latency)
+
+        if opportunity:
+            logger.info(f"Arbitrage opportunity found for {symbol} {self.last_detection_latency * 1000:.1f} ms after {exchange} tick: "
+                        f"{opportunity.profit_percentage:.6f}% profit "
+                        f"(Buy {opportunity.buy_exchange}, Sell {opportunity.sell_exchange})")
+            if self.on_opportunity:
+                await self.on_opportunity(opportunity)
+
+    async def run(self, on_opportunity: Optional[OpportunityHandler] = None, seed: bool = True):
+        """
+        Stream both exchanges and detect opportunities until stopped
+
+        Args:
+            on_opportunity: Optional coroutine called with every opportunity found
+            seed: Whether to fill the quote table from a REST snapshot first
+        """
+        self.on_opportunity = on_opportunity
+        if seed:
+            await asyncio.get_running_loop().run_in_executor(None, self.seed_quotes)
+
+        logger.info(f"Streaming {len(self.trading_pairs)} trading pairs from {len(self.streams)} exchanges...")
+        await asyncio.gather(*(stream.run(self.on_tick) for stream in self.streams))
+
+    def stop(self):
+        """Stop every stream after the frame it is processing"""
+        for stream in self.streams:
+            stream.stop()
+
+    def get_quotes(self) -> Dict[str, Dict[str, Optional[float]]]:
+        """Get a copy of the latest-quote table"""
+        return {symbol: dict(quote) for symbol, quote in self.quotes.items()}
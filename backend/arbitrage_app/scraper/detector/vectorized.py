@@ -0,0 +1,56 @@
+"""
+Vectorized spread computation for many symbols and exchanges at once
+
+Prices are a (symbols x exchanges) matrix; missing prices are NaN (or zero).
+"""
+
+from typing import Tuple
+import numpy as np
+
+def calculate_spread_matrix(prices: np.ndarray) -> np.ndarray:
+    """
+    Calculate the spread of every buy/sell exchange combination for every symbol
+
+    Args:
+        prices: Price matrix of shape (symbols, exchanges)
+
+    Returns:
+        Array of shape (symbols, exchanges, exchanges) where [s, buy, sell] is the
+        profit percentage of buying symbol s on `buy` and selling it on `sell`;
+        NaN where either price is missing
+    """
+    prices = np.where(prices > 0, prices, np.nan)
+    buy_prices = prices[:, :, np.newaxis]
+    sell_prices = prices[:, np.newaxis, :]
+    return (sell_prices - buy_prices) / buy_prices * 100
+
+def calculate_best_spreads(prices: np.ndarray, threshold: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Find the most profitable exchange combination of every symbol in one pass
+
+    The best combination always buys on the cheapest exchange and sells on the
+    dearest, so only the per-row minimum and maximum are needed rather than the
+    whole spread matrix. With two exchanges this matches
+    ArbitrageDetector.calculate_arbitrage exactly.
+
+    Args:
+        prices: Price matrix of shape (symbols, exchanges)
+        threshold: Minimum profit as a fraction (e.g., 0.01 for 1%)
+
+    Returns:
+        Tuple of arrays (profit_percentage, profit_amount, buy_index, sell_index, is_opportunity);
+        values are only meaningful where is_opportunity is True
+    """
+    quoted = prices > 0
+    buy_index = np.argmin(np.where(quoted, prices, np.inf), axis=1)
+    sell_index = np.argmax(np.where(quoted, prices, -np.inf), axis=1)
+
+    rows = np.arange(prices.shape[0])
+    buy_prices = prices[rows, buy_index]
+    sell_prices = prices[rows, sell_index]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        profit_percentage = (sell_prices - buy_prices) / buy_prices * 100
+
+    is_opportunity = (quoted.sum(axis=1) >= 2) & (buy_index != sell_index) & (profit_percentage >= threshold * 100)
+    return profit_percentage, sell_prices - buy_prices, buy_index, sell_index, is_opportunity
@@ -0,0 +1,47 @@
+"""
+Benchmark of scalar vs vectorized spread calculation
+Run directly: python -m arbitrage_app.scraper.test.bench_detection
+"""
+
+import random
+import time
+import numpy as np
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector
+from arbitrage_app.scraper.detector.vectorized import calculate_best_spreads
+
+def best_of(function, repeat=5):
+    """Fastest of several runs, in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start_time = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start_time)
+    return min(timings)
+
+def main():
+    detector = ArbitrageDetector()
+    rng = random.Random(1)
+
+    print(f"{'symbols':>10} {'scalar ms':>12} {'vectorized ms':>14} {'speed-up':>9}")
+    for size in (15, 1_000, 10_000, 100_000):
+        base = [rng.uniform(0.01, 60000) for _ in range(size)]
+        nobitex_list = [price * rng.uniform(0.97, 1.03) for price in base]
+        wallex_list = [price * rng.uniform(0.97, 1.03) for price in base]
+
+        def scalar():
+            return [detector.calculate_arbitrage(nobitex_price, wallex_price)
+                    for nobitex_price, wallex_price in zip(nobitex_list, wallex_list)]
+
+        def vectorized():
+            # Includes building the price matrix, as a scan has to
+            prices = np.column_stack([np.array(nobitex_list, dtype=float), np.array(wallex_list, dtype=float)])
+            return calculate_best_spreads(prices, detector.threshold)
+
+        scalar_time = best_of(scalar)
+        vectorized_time = best_of(vectorized)
+        print(f"{size:>10} {scalar_time * 1000:>12.3f} {vectorized_time * 1000:>14.3f} {scalar_time / vectorized_time:>8.1f}x")
+
+    detector.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""
+In-memory stand-in for DatabaseIntegrationService used by offline detector tests
+"""
+
+class RecordingDatabase:
+    """Keeps what the detector would store instead of writing to a database"""
+
+    def __init__(self):
+        self.prices = []
+        self.price_batches = 0
+        self.opportunities = []
+
+    def store_price_data(self, symbol, nobitex_price, wallex_price, timestamp):
+        return self.store_exchange_prices(symbol, {"nobitex": nobitex_price, "wallex": wallex_price}, timestamp)
+
+    def store_exchange_prices(self, symbol, prices, timestamp):
+        self.prices.append((symbol, dict(prices)))
+        return True
+
+    def store_price_batch(self, price_batch):
+        self.price_batches += 1
+        for symbol, prices, timestamp in price_batch:
+            self.store_exchange_prices(symbol, prices, timestamp)
+        return True
+
+    def store_arbitrage_opportunity(self, opportunity):
+        self.opportunities.append(opportunity)
+        return True
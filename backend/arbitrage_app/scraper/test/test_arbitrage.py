@@ -3,9 +3,11 @@ Test script for the arbitrage detection system
 This script tests the API integrations and arbitrage detection logic
 """
 
+import asyncio
 import logging
 import time
 from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector
+from arbitrage_app.scraper.detector.async_arbitrage_detector import AsyncArbitrageDetector
 from arbitrage_app.sample_trading import TRADING_PAIRS
 
 # Configure logging
@@ -72,6 +74,45 @@ def test_full_scan():
     else:
         print("No arbitrage opportunities found at this time.")
 
+def test_scan_mode_timing():
+    """Compare wall-clock scan time of the sequential, concurrent and snapshot scan modes"""
+    print("\n" + "="*50)
+    print("Comparing scan mode times...")
+    print("="*50)
+    
+    detector = ArbitrageDetector()
+    
+    timings = {}
+    for mode in ["sequential", "concurrent", "snapshot"]:
+        opportunities = detector.scan_all_pairs(mode=mode)
+        timings[mode] = detector.last_scan_duration
+        print(f"  {mode:<12} {timings[mode]:>8.2f} seconds, {len(opportunities)} opportunities")
+    
+    for mode in ["concurrent", "snapshot"]:
+        if timings[mode] > 0:
+            print(f"  {mode.capitalize()} speedup: {timings['sequential'] / timings[mode]:.2f}x")
+
+def test_run_mode_timing():
+    """Compare wall-clock scan time of the threaded and asyncio detectors"""
+    print("\n" + "="*50)
+    print("Comparing sync and async detector scan times...")
+    print("="*50)
+    
+    async def async_scan(mode):
+        detector = AsyncArbitrageDetector()
+        try:
+            await detector.scan_all_pairs(mode=mode)
+            return detector.last_scan_duration
+        finally:
+            await detector.close()
+    
+    for mode in ["concurrent", "snapshot"]:
+        sync_detector = ArbitrageDetector()
+        sync_detector.scan_all_pairs(mode=mode)
+        sync_detector.close()
+        async_duration = asyncio.run(async_scan(mode))
+        print(f"  {mode:<12} sync {sync_detector.last_scan_duration:>8.2f} seconds, async {async_duration:>8.2f} seconds")
+
 if __name__ == "__main__":
     print("🚀 Starting Arbitrage Detection System Test")
     print("=" * 60)
@@ -83,6 +124,12 @@ if __name__ == "__main__":
         # Test full scan
         test_full_scan()
         
+        # Compare scan modes
+        test_scan_mode_timing()
+        
+        # Compare run modes
+        test_run_mode_timing()
+        
         print("\n✅ All tests completed successfully!")
         
     except Exception as e:
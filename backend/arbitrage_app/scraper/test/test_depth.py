@@ -0,0 +1,94 @@
+"""
+Test script for order-book depth arbitrage
+This script checks order book parsing and the depth walk on recorded books without calling any exchange
+"""
+
+from dataclasses import replace
+from datetime import datetime
+from arbitrage_app.scraper.api.nobitex_api import NobitexAPI
+from arbitrage_app.scraper.api.wallex_api import WallexAPI
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector, walk_order_books
+from arbitrage_app.scraper.test.recording_database import RecordingDatabase
+
+# Recorded shapes of the order book responses
+NOBITEX_BOOK = {
+    "status": "ok",
+    "lastUpdate": 1718000000000,
+    "asks": [["60100", "0.5"], ["60000", "0.2"], ["60200", "1"]],
+    "bids": [["59900", "0.3"], ["59800", "1"]]
+}
+
+WALLEX_DEPTH = {
+    "success": True,
+    "result": {
+        "ask": [{"price": "61500", "quantity": "0.4", "sum": "24600"}],
+        "bid": [
+            {"price": "61000", "quantity": "0.1", "sum": "6100"},
+            {"price": "60800", "quantity": "0.4", "sum": "24320"},
+            {"price": "60500", "quantity": "5", "sum": "302500"}
+        ]
+    }
+}
+
+def test_order_book_parsing():
+    """Both exchanges' books come back sorted best level first"""
+    print("Testing order book parsing...")
+
+    nobitex_book = NobitexAPI.parse_order_book(NOBITEX_BOOK, "BTCUSDT")
+    wallex_book = WallexAPI.parse_order_book(WALLEX_DEPTH, "BTCUSDT")
+
+    assert nobitex_book["asks"][0] == (60000.0, 0.2)
+    assert nobitex_book["bids"][0] == (59900.0, 0.3)
+    assert wallex_book["bids"] == [(61000.0, 0.1), (60800.0, 0.4), (60500.0, 5.0)]
+    assert NobitexAPI.parse_order_book(None, "BTCUSDT") is None
+    print("  ✅ Order books parsed")
+
+def test_walk_stops_at_threshold():
+    """Levels are matched only while each unit still clears the threshold"""
+    print("\nTesting depth walk...")
+
+    asks = [(100.0, 1.0), (101.0, 2.0)]
+    bids = [(103.0, 0.5), (102.5, 1.0), (101.5, 10.0)]
+
+    volume, cost, proceeds = walk_order_books(asks, bids, 0.01)
+    # 0.5 @ 100 -> 103, 0.5 @ 100 -> 102.5, 0.5 @ 101 -> 102.5; 101.5 is below 101 * 1.01
+    print(f"  volume {volume}, cost {cost}, proceeds {proceeds}")
+    assert volume == 1.5
+    assert cost == 50.0 + 50.0 + 50.5
+    assert proceeds == 51.5 + 51.25 + 51.25
+
+    assert walk_order_books([], bids, 0.01) == (0.0, 0.0, 0.0)
+
+def test_depth_opportunity():
+    """A depth scan reports executable size and VWAPs and skips spreads the books cannot fill"""
+    print("\nTesting depth-aware opportunity...")
+
+    database = RecordingDatabase()
+    detector = ArbitrageDetector(database_service=database)
+    nobitex_book = NobitexAPI.parse_order_book(NOBITEX_BOOK, "BTCUSDT")
+    wallex_book = WallexAPI.parse_order_book(WALLEX_DEPTH, "BTCUSDT")
+
+    opportunity = detector.evaluate_order_books("BTCUSDT", {"nobitex": nobitex_book, "wallex": wallex_book})
+
+    print(f"  {opportunity.executable_volume} BTC, buy {opportunity.buy_vwap:.2f}, sell {opportunity.sell_vwap:.2f}, "
+          f"profit {opportunity.profit_amount:.2f} USDT ({opportunity.profit_percentage:.4f}%)")
+    assert (opportunity.buy_exchange, opportunity.sell_exchange) == ("nobitex", "wallex")
+    # 0.2 @ 60000 and 0.3 @ 60100 fill against 61000 and 60800; 60500 is below 60100 * 1.01
+    assert abs(opportunity.executable_volume - 0.5) < 1e-9
+    assert abs(opportunity.profit_amount - (0.1 * 1000 + 0.1 * 800 + 0.3 * 700)) < 1e-6
+    assert opportunity.nobitex_price == opportunity.buy_price == opportunity.buy_vwap
+    # The stored copy carries a datetime for the DateTime column, everything else is the same
+    assert [replace(stored, timestamp=opportunity.timestamp) for stored in database.opportunities] == [opportunity]
+    assert isinstance(database.opportunities[0].timestamp, datetime)
+
+    # Last trades may be far apart, but books that do not cross are not an opportunity
+    flat_book = {"bids": [(61000.0, 1.0)], "asks": [(61100.0, 1.0)]}
+    assert detector.evaluate_order_books("ETHUSDT", {"nobitex": flat_book, "wallex": wallex_book}) is None
+    assert len(database.prices) == 2
+    detector.close()
+
+if __name__ == "__main__":
+    test_order_book_parsing()
+    test_walk_stops_at_threshold()
+    test_depth_opportunity()
+    print("\n✅ All depth tests completed successfully!")
@@ -0,0 +1,107 @@
+"""
+Test script for the exchange adapter registry
+This script plugs a third, offline exchange into the detector and checks N-exchange spreads
+"""
+
+import time
+from arbitrage_app.scraper.api.exchange_registry import register_exchange, get_registered_exchanges, create_exchange_clients
+from arbitrage_app.scraper.api.quote import Quote
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector
+from arbitrage_app.scraper.test.recording_database import RecordingDatabase
+
+class FakeExchangeAPI:
+    """Adapter serving fixed prices without any network access"""
+
+    prices = {}
+
+    def __init__(self, metrics_collector=None):
+        self.metrics = metrics_collector
+
+    def get_latest_price(self, symbol):
+        return self.prices.get(symbol)
+
+    def get_latest_quote(self, symbol):
+        price = self.prices.get(symbol)
+        return Quote(price, time.time()) if price is not None else None
+
+    def get_market_snapshot(self):
+        return dict(self.prices)
+
+    def get_order_book(self, symbol):
+        price = self.prices.get(symbol)
+        if price is None:
+            return None
+        return {"bids": [(price * 0.999, 1.0)], "asks": [(price * 1.001, 1.0)]}
+
+    def close(self):
+        pass
+
+class CheapExchangeAPI(FakeExchangeAPI):
+    prices = {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0}
+
+class DearExchangeAPI(FakeExchangeAPI):
+    prices = {"BTCUSDT": 61200.0, "ETHUSDT": 3010.0}
+
+class MiddleExchangeAPI(FakeExchangeAPI):
+    prices = {"BTCUSDT": 60600.0}
+
+register_exchange("test_cheap", CheapExchangeAPI)
+register_exchange("test_dear", DearExchangeAPI)
+register_exchange("test_middle", MiddleExchangeAPI)
+
+def test_registry():
+    """Registered exchanges create adapters and unknown ones are rejected"""
+    print("Testing exchange registry...")
+
+    assert {"nobitex", "wallex", "test_cheap"} <= set(get_registered_exchanges())
+    clients = create_exchange_clients(["test_cheap", "test_dear"])
+    assert list(clients) == ["test_cheap", "test_dear"]
+    assert isinstance(clients["test_dear"], DearExchangeAPI)
+
+    for names, use_async in ((["no_such_exchange"], False), (["test_cheap"], True)):
+        try:
+            create_exchange_clients(names, use_async=use_async)
+        except ValueError as e:
+            print(f"  Rejected: {e}")
+        else:
+            raise AssertionError(f"{names} should not create clients")
+    print("  ✅ Registry works")
+
+def test_three_exchange_detection():
+    """The detector picks the cheapest and dearest of three exchanges on every scan path"""
+    print("\nTesting three-exchange detection...")
+
+    database = RecordingDatabase()
+    detector = ArbitrageDetector(database_service=database, exchanges=["test_middle", "test_cheap", "test_dear"])
+    detector.trading_pairs = ["BTCUSDT", "ETHUSDT"]
+    assert detector.nobitex_api is None
+
+    assert detector.calculate_best_spread({"test_middle": 60600.0, "test_cheap": 60000.0, "test_dear": 61200.0}) == (
+        2.0, "test_cheap", "test_dear"
+    )
+
+    exchanges, matrix = detector.get_spread_matrix(detector.get_all_price_data_snapshot())
+    assert exchanges == ["test_middle", "test_cheap", "test_dear"]
+    assert matrix.shape == (2, 3, 3)
+    assert abs(matrix[0, 1, 2] - 2.0) < 1e-9
+    assert abs(matrix[0, 1, 0] - 1.0) < 1e-9
+
+    for mode, vectorized in (("sequential", False), ("snapshot", False), ("snapshot", True), ("concurrent", True)):
+        detector.vectorized = vectorized
+        opportunities = detector.scan_all_pairs(mode)
+        print(f"  {mode} (vectorized={vectorized}): {[(opp.symbol, opp.buy_exchange, opp.sell_exchange) for opp in opportunities]}")
+        # ETHUSDT only spreads 0.33% between the two exchanges quoting it
+        assert [(opp.symbol, opp.buy_exchange, opp.sell_exchange) for opp in opportunities] == [("BTCUSDT", "test_cheap", "test_dear")]
+        assert (opportunities[0].buy_price, opportunities[0].sell_price) == (60000.0, 61200.0)
+        assert opportunities[0].nobitex_price is None
+
+    opportunities = detector.scan_all_pairs("depth")
+    assert [(opp.buy_exchange, opp.sell_exchange) for opp in opportunities] == [("test_cheap", "test_dear")]
+    assert database.prices[-1] == ("ETHUSDT", {"test_cheap": 3000.0, "test_dear": 3010.0})
+    detector.close()
+    print("  ✅ Three-exchange detection works")
+
+if __name__ == "__main__":
+    test_registry()
+    test_three_exchange_detection()
+    print("\n✅ All exchange registry tests completed successfully!")
@@ -0,0 +1,106 @@
+"""
+Test script for quote trade and receive times
+This script parses recorded trades responses and checks quote age, skew and the max skew filter offline
+"""
+
+import time
+from prometheus_client import REGISTRY
+from arbitrage_app.prometheus_adapter.metrics import PrometheusMetrics
+from arbitrage_app.scraper.api.exchange_registry import register_exchange
+from arbitrage_app.scraper.api.nobitex_api import NobitexAPI
+from arbitrage_app.scraper.api.quote import Quote
+from arbitrage_app.scraper.api.wallex_api import WallexAPI
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector
+from arbitrage_app.scraper.test.recording_database import RecordingDatabase
+
+class TimedExchangeAPI:
+    """Adapter serving fixed prices that traded `trade_age` seconds ago"""
+
+    prices = {}
+    trade_age = 0.0
+
+    def __init__(self, metrics_collector=None):
+        self.metrics = metrics_collector
+
+    def get_latest_quote(self, symbol):
+        price = self.prices.get(symbol)
+        if price is None:
+            return None
+        received_at = time.time()
+        return Quote(price, received_at, received_at - self.trade_age)
+
+    def close(self):
+        pass
+
+class FreshExchangeAPI(TimedExchangeAPI):
+    prices = {"BTCUSDT": 60000.0, "ETHUSDT": 3000.0}
+
+class LaggingExchangeAPI(TimedExchangeAPI):
+    prices = {"BTCUSDT": 61200.0, "ETHUSDT": 3060.0}
+    trade_age = 120.0
+
+register_exchange("quote_fresh", FreshExchangeAPI)
+register_exchange("quote_lagging", LaggingExchangeAPI)
+
+def test_parse_trade_times():
+    """Nobitex trade times are epoch milliseconds, Wallex ones ISO 8601"""
+    print("Testing trade time parsing...")
+
+    nobitex_trades = {"status": "ok", "trades": [{"time": 1718000000000, "price": "60000", "volume": "0.01", "type": "buy"}]}
+    quote = NobitexAPI.parse_latest_quote(nobitex_trades, "BTCUSDT", 1718000002.5)
+    assert quote == Quote(60000.0, 1718000002.5, 1718000000.0)
+    print(f"  Nobitex: {quote}")
+
+    wallex_trades = {"success": True, "result": {"latestTrades": [
+        {"symbol": "BTCUSDT", "quantity": "0.01", "price": "60100", "isBuyOrder": True, "timestamp": "2024-06-10T06:13:20Z"}
+    ]}}
+    quote = WallexAPI.parse_latest_quote(wallex_trades, "BTCUSDT", 1718000002.5)
+    assert quote == Quote(60100.0, 1718000002.5, 1718000000.0)
+    print(f"  Wallex: {quote}")
+
+    # A trade without a usable time still quotes, timed by its arrival
+    wallex_trades["result"]["latestTrades"][0]["timestamp"] = "-"
+    quote = WallexAPI.parse_latest_quote(wallex_trades, "BTCUSDT", 1718000002.5)
+    assert quote.trade_time is None and quote.time == 1718000002.5
+    assert NobitexAPI.parse_latest_quote({"status": "ok", "trades": []}, "BTCUSDT", 0.0) is None
+    print("  ✅ Trade times parsed")
+
+def test_quote_age_and_skew():
+    """Evaluations export per-symbol quote age and skew, and the max skew option discards far-apart quotes"""
+    print("\nTesting quote age and skew...")
+
+    metrics = PrometheusMetrics(0.0)
+    database = RecordingDatabase()
+    detector = ArbitrageDetector(metrics, database, exchanges=["quote_fresh", "quote_lagging"])
+    detector.trading_pairs = ["BTCUSDT", "ETHUSDT"]
+
+    opportunities = detector.scan_all_pairs("concurrent")
+    assert {opportunity.symbol for opportunity in opportunities} == {"BTCUSDT", "ETHUSDT"}
+    skew = REGISTRY.get_sample_value("quote_skew_last_seconds", {"symbol": "BTCUSDT"})
+    age = REGISTRY.get_sample_value("quote_age_last_seconds", {"symbol": "BTCUSDT", "exchange": "quote_lagging"})
+    print(f"  BTCUSDT skew {skew:.3f}s, lagging quote age {age:.3f}s")
+    assert 119.0 < skew < 121.0
+    assert age >= 120.0
+    assert REGISTRY.get_sample_value("quote_age_seconds_count", {"symbol": "BTCUSDT", "exchange": "quote_fresh"}) >= 1
+
+    discarded = REGISTRY.get_sample_value("stale_quotes_discarded_total", {"symbol": "ETHUSDT"}) or 0.0
+    detector.max_quote_skew = 60.0
+    for vectorized in (True, False):
+        detector.vectorized = vectorized
+        stored = len(database.prices)
+        assert detector.scan_all_pairs("concurrent") == []
+        assert len(database.prices) == stored
+    assert REGISTRY.get_sample_value("stale_quotes_discarded_total", {"symbol": "ETHUSDT"}) == discarded + 2
+
+    # Prices evaluated without fetched quotes have no times to compare
+    assert detector.evaluate_prices("ETHUSDT", {"quote_fresh": 3000.0, "quote_lagging": 3100.0}) is not None
+
+    detector.max_quote_skew = 300.0
+    assert len(detector.scan_all_pairs("sequential")) == 2
+    detector.close()
+    print("  ✅ Skewed quotes discarded")
+
+if __name__ == "__main__":
+    test_parse_trade_times()
+    test_quote_age_and_skew()
+    print("\n✅ All quote time tests completed successfully!")
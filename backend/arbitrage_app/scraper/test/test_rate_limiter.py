@@ -0,0 +1,152 @@
+"""
+Test script for the shared token-bucket rate limiter
+This script checks burst, pacing and budget behaviour without calling any exchange
+"""
+
+import asyncio
+import threading
+import time
+from arbitrage_app.scraper.api.rate_limiter import TokenBucket, get_rate_limiter, share_rate_limits
+
+def test_burst_is_immediate():
+    """A full bucket admits its burst without waiting"""
+    print("Testing burst...")
+
+    bucket = TokenBucket("test", "burst", requests=60, period=60, burst=10)
+
+    start_time = time.monotonic()
+    waits = [bucket.acquire() for _ in range(10)]
+    elapsed = time.monotonic() - start_time
+
+    print(f"  10 requests in {elapsed:.3f} seconds")
+    assert all(wait == 0 for wait in waits)
+    assert elapsed < 0.1
+
+def test_budget_is_never_exceeded():
+    """Threads hammering one bucket never exceed the budget in any window"""
+    print("\nTesting budget across threads...")
+
+    # 20 requests per 2 seconds, 5 of them as a burst
+    bucket = TokenBucket("test", "budget", requests=20, period=2, burst=5)
+    sent = []
+    sent_lock = threading.Lock()
+
+    def worker():
+        for _ in range(8):
+            bucket.acquire()
+            with sent_lock:
+                sent.append(time.monotonic())
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    sent.sort()
+    busiest_window = max(
+        sum(1 for other in sent if start <= other < start + 2)
+        for start in sent
+    )
+    print(f"  {len(sent)} requests, busiest 2-second window held {busiest_window}")
+    assert busiest_window <= 20
+
+def test_async_acquire_paces_tasks():
+    """Tasks on an event loop wait for tokens just like threads"""
+    print("\nTesting async acquire...")
+
+    bucket = TokenBucket("test", "async", requests=12, period=1, burst=2)
+
+    async def run():
+        start_time = time.monotonic()
+        await asyncio.gather(*(bucket.acquire_async() for _ in range(7)))
+        return time.monotonic() - start_time
+
+    elapsed = asyncio.run(run())
+    # 2 burst tokens, then 5 more at 10 tokens per second
+    print(f"  7 requests in {elapsed:.3f} seconds")
+    assert 0.4 <= elapsed < 0.8
+
+def test_endpoints_share_default_bucket():
+    """Endpoints without their own budget draw from the exchange default"""
+    print("\nTesting shared limiter registry...")
+
+    trades_limiter = get_rate_limiter("nobitex", "trades")
+    stats_limiter = get_rate_limiter("nobitex", "market_stats")
+    wallex_limiter = get_rate_limiter("wallex", "trades")
+
+    assert trades_limiter is stats_limiter
+    assert trades_limiter is not wallex_limiter
+    print(f"  nobitex bucket: {trades_limiter.capacity} burst, {trades_limiter.rate:.3f} tokens/second")
+
+def test_throttling_backs_off_and_pauses():
+    """HTTP 429 halves the budget and holds requests until Retry-After passes"""
+    print("\nTesting 429 back-off...")
+
+    bucket = TokenBucket("test", "throttle", requests=60, period=60, burst=5)
+
+    throttled = bucket.observe_response(429, {"Retry-After": "0.3"})
+    start_time = time.monotonic()
+    bucket.acquire()
+    elapsed = time.monotonic() - start_time
+
+    print(f"  budget {bucket.requests:.1f}/60s, first request after {elapsed:.3f} seconds")
+    assert throttled
+    assert bucket.requests == 30
+    assert elapsed >= 0.29
+
+def test_headroom_raises_budget():
+    """Successful responses with headroom raise the budget up to the ceiling"""
+    print("\nTesting additive increase...")
+
+    bucket = TokenBucket("test", "increase", requests=60, period=60, burst=5, max_requests=62)
+
+    for _ in range(200):
+        bucket.observe_response(200, {})
+
+    print(f"  budget {bucket.requests:.1f}/60s")
+    assert bucket.requests == 62
+
+def test_rate_limit_headers_set_ceiling():
+    """X-RateLimit-Limit caps the budget and an exhausted X-RateLimit-Remaining pauses it"""
+    print("\nTesting rate-limit headers...")
+
+    bucket = TokenBucket("test", "headers", requests=60, period=60, burst=5, max_requests=120)
+
+    bucket.observe_response(200, {"X-RateLimit-Limit": "40", "X-RateLimit-Remaining": "39"})
+    assert bucket.max_requests == 40
+    assert bucket.requests == 40
+
+    bucket.observe_response(200, {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "0.2"})
+    start_time = time.monotonic()
+    bucket.acquire()
+    elapsed = time.monotonic() - start_time
+
+    print(f"  budget {bucket.requests:.1f}/60s, next request after {elapsed:.3f} seconds")
+    assert elapsed >= 0.19
+
+def test_rate_limit_headers_are_shared():
+    """A sharded worker takes only its share of the exchange-wide X-RateLimit-Limit"""
+    print("\nTesting rate-limit headers with shared budgets...")
+
+    try:
+        share_rate_limits(4)
+        bucket = TokenBucket("test", "shared-headers", requests=15, period=60, burst=3, max_requests=30)
+        bucket.observe_response(200, {"X-RateLimit-Limit": "200", "X-RateLimit-Remaining": "199"})
+    finally:
+        share_rate_limits(1)
+
+    print(f"  ceiling {bucket.max_requests}/60s of the exchange's 200")
+    assert bucket.max_requests == 50
+    assert bucket.requests <= 50
+
+if __name__ == "__main__":
+    test_burst_is_immediate()
+    test_budget_is_never_exceeded()
+    test_async_acquire_paces_tasks()
+    test_endpoints_share_default_bucket()
+    test_throttling_backs_off_and_pauses()
+    test_headroom_raises_budget()
+    test_rate_limit_headers_set_ceiling()
+    test_rate_limit_headers_are_shared()
+    print("\n✅ All rate limiter tests completed successfully!")
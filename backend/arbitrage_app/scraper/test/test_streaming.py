@@ -0,0 +1,160 @@
+"""
+Test script for the WebSocket price streams and the streaming arbitrage detector
+This script replays recorded exchange frames from a local WebSocket server
+"""
+
+import asyncio
+import json
+import logging
+import time
+from arbitrage_app.scraper.api.nobitex_stream import NobitexStream
+from arbitrage_app.scraper.api.wallex_stream import WallexStream
+from arbitrage_app.scraper.detector.streaming_arbitrage_detector import StreamingArbitrageDetector
+from arbitrage_app.scraper.test.ws_replay_server import ReplayServer
+from arbitrage_app.sample_trading import TRADING_PAIRS
+from arbitrage_app.scraper.test.recording_database import RecordingDatabase
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+def nobitex_push(symbol, price):
+    """Recorded shape of a Nobitex trades publication"""
+    trades = [{"price": str(price), "volume": "0.01", "type": "buy", "time": 1718000000000}]
+    return json.dumps({"push": {"channel": f"public:trades-{symbol}", "pub": {"data": json.dumps(trades)}}})
+
+def wallex_event(symbol, price):
+    """Recorded shape of a Wallex trade event"""
+    trade = {"symbol": symbol, "price": str(price), "quantity": "0.01", "isBuyOrder": True}
+    return "42" + json.dumps(["Broadcaster", f"{symbol}@trade", trade])
+
+NOBITEX_SESSION = [
+    ("expect", len(TRADING_PAIRS) + 1),  # connect and one subscribe per pair
+    ("send", '{"id":1,"connect":{"client":"replay","version":"5.0.0"}}'),
+    ("send", nobitex_push("BTCUSDT", 60000)),
+    ("send", nobitex_push("ETHUSDT", 3000)),
+    ("send", nobitex_push("BTCUSDT", 60000)),  # unchanged, must not trigger evaluation
+    ("send", "{}"),
+]
+
+WALLEX_SESSION = [
+    ("send", '0{"sid":"replay","upgrades":[],"pingInterval":25000,"pingTimeout":20000}'),
+    ("expect", 1),  # namespace connect
+    ("send", '40{"sid":"replay"}'),
+    ("expect", len(TRADING_PAIRS)),  # one subscribe per pair
+    ("send", wallex_event("BTCUSDT", 60900)),
+    ("send", wallex_event("ETHUSDT", 3001)),
+    ("send", "2"),
+]
+
+def test_stream_parsers():
+    """Both protocols turn recorded frames into ticks and answer pings"""
+    print("Testing stream parsers...")
+
+    nobitex = NobitexStream(["BTCUSDT"])
+    assert nobitex.handle_message(nobitex_push("BTCUSDT", 60000)) == ([("BTCUSDT", 60000.0)], [])
+    assert nobitex.handle_message("{}") == ([], ["{}"])
+    assert len(nobitex.subscribe_messages()) == 2
+
+    wallex = WallexStream(["BTCUSDT"])
+    assert wallex.handle_message('0{"sid":"replay"}') == ([], ["40"])
+    assert wallex.handle_message('40{"sid":"replay"}') == ([], wallex.subscribe_frames())
+    assert wallex.handle_message(wallex_event("BTCUSDT", 60900)) == ([("BTCUSDT", 60900.0)], [])
+    assert wallex.handle_message("2") == ([], ["3"])
+
+    # Malformed frames are ignored rather than raised
+    for frame in ('{"push": {"channel": "public:trades-BTCUSDT", "pub": null}}', '{"push": "x"}', b"\xff"):
+        assert nobitex.handle_message(frame) == ([], [])
+    assert wallex.handle_message(b"\xff\xfe") == ([], [])
+    assert wallex.handle_message(b"2") == ([], ["3"])
+    print("  ✅ Recorded frames parsed")
+
+def test_streaming_detection():
+    """Ticks replayed by the stand-in servers are evaluated as they arrive"""
+    print("\nTesting streaming detection...")
+
+    async def run():
+        nobitex_server = ReplayServer(NOBITEX_SESSION)
+        wallex_server = ReplayServer(WALLEX_SESSION)
+        database = RecordingDatabase()
+        detector = StreamingArbitrageDetector(
+            database_service=database,
+            nobitex_url=await nobitex_server.start(),
+            wallex_url=await wallex_server.start()
+        )
+        found = []
+
+        async def on_opportunity(opportunity):
+            found.append(opportunity)
+
+        stream_task = asyncio.create_task(detector.run(on_opportunity, seed=False))
+        deadline = time.time() + 10
+        while time.time() < deadline and not ("{}" in nobitex_server.received and "3" in wallex_server.received
+                                              and detector.evaluations >= 2):
+            await asyncio.sleep(0.05)
+
+        detector.stop()
+        stream_task.cancel()
+        await asyncio.gather(stream_task, return_exceptions=True)
+        await nobitex_server.stop()
+        await wallex_server.stop()
+        detector.close()
+        return detector, database, found
+
+    detector, database, found = asyncio.run(run())
+
+    print(f"  Evaluations: {detector.evaluations}, last latency: {detector.last_detection_latency * 1000:.1f} ms")
+    print(f"  Opportunities: {[(opp.symbol, round(opp.profit_percentage, 2)) for opp in found]}")
+    assert detector.get_quotes()["BTCUSDT"] == {"nobitex": 60000.0, "wallex": 60900.0}
+    assert detector.evaluations == 2
+    assert sorted(row[0] for row in database.prices) == ["BTCUSDT", "ETHUSDT"]
+    assert [opp.symbol for opp in found] == ["BTCUSDT"]
+    assert found[0].buy_exchange == "nobitex"
+    assert detector.last_detection_latency < 1
+
+class FragileNobitexStream(NobitexStream):
+    """Nobitex stream whose parser raises on one particular frame"""
+
+    def handle_message(self, message):
+        if message == "boom":
+            raise ValueError("unexpected frame")
+        return super().handle_message(message)
+
+def test_malformed_frames_do_not_stop_stream():
+    """A frame that cannot be parsed is skipped and the stream keeps delivering ticks"""
+    print("\nTesting malformed frames...")
+
+    async def run():
+        server = ReplayServer([
+            ("expect", 2),  # connect and one subscribe
+            ("send", '{"push": {"channel": "public:trades-BTCUSDT", "pub": null}}'),
+            ("send", '{"push": "x"}'),
+            ("send", b"\xff"),
+            ("send", "boom"),
+            ("send", nobitex_push("BTCUSDT", 60000)),
+        ])
+        stream = FragileNobitexStream(["BTCUSDT"], url=await server.start(), reconnect_delay=60)
+        ticks = []
+
+        async def on_tick(exchange, symbol, price, received_at):
+            ticks.append((exchange, symbol, price))
+            stream.stop()
+
+        try:
+            await asyncio.wait_for(stream.run(on_tick), timeout=10)
+        finally:
+            await server.stop()
+        return ticks
+
+    ticks = asyncio.run(run())
+    print(f"  Ticks after malformed frames: {ticks}")
+    assert ticks == [("nobitex", "BTCUSDT", 60000.0)]
+    print("  ✅ Stream kept going")
+
+if __name__ == "__main__":
+    test_stream_parsers()
+    test_streaming_detection()
+    test_malformed_frames_do_not_stop_stream()
+    print("\n✅ All streaming tests completed successfully!")
@@ -0,0 +1,113 @@
+"""
+Test script for vectorized arbitrage detection
+This script checks that the NumPy batch path matches the per-symbol path without calling any exchange
+"""
+
+import random
+import numpy as np
+from arbitrage_app.scraper.detector.arbitrage_detector import ArbitrageDetector
+from arbitrage_app.scraper.detector.vectorized import calculate_best_spreads, calculate_spread_matrix
+from arbitrage_app.scraper.test.recording_database import RecordingDatabase
+
+def random_price_data(symbols, exchanges=("nobitex", "wallex"), seed=7):
+    """Prices within a few percent of each other, with some missing on any exchange"""
+    rng = random.Random(seed)
+    price_data = {}
+    for symbol in symbols:
+        base = rng.uniform(0.01, 60000)
+        price_data[symbol] = {
+            exchange: base * rng.uniform(0.97, 1.03) if rng.random() > 0.1 else rng.choice([None, 0.0])
+            for exchange in exchanges
+        }
+    return price_data
+
+def test_batch_matches_scalar():
+    """Every row of the batch result agrees with calculate_best_spread, for two and for four exchanges"""
+    print("Testing batch spreads...")
+
+    detector = ArbitrageDetector()
+    for exchanges in (("nobitex", "wallex"), ("nobitex", "wallex", "venue_a", "venue_b")):
+        price_data = random_price_data([f"SYM{i}" for i in range(2000)], exchanges)
+        prices = np.array([[symbol_prices[exchange] or np.nan for exchange in exchanges]
+                           for symbol_prices in price_data.values()])
+
+        profit_percentage, profit_amount, buy_index, sell_index, is_opportunity = calculate_best_spreads(
+            prices, detector.threshold
+        )
+
+        for index, symbol_prices in enumerate(price_data.values()):
+            quoted = {exchange: price for exchange, price in symbol_prices.items() if price}
+            expected = detector.calculate_best_spread(quoted)
+            assert bool(is_opportunity[index]) == (expected is not None)
+            if expected:
+                assert profit_percentage[index] == expected[0]
+                assert (exchanges[buy_index[index]], exchanges[sell_index[index]]) == expected[1:]
+
+        print(f"  ✅ {int(is_opportunity.sum())} opportunities in {len(price_data)} symbols on {len(exchanges)} exchanges agree")
+    detector.close()
+
+def test_spread_matrix():
+    """The spread matrix holds every buy/sell combination and NaN where a price is missing"""
+    print("\nTesting spread matrix...")
+
+    matrix = calculate_spread_matrix(np.array([[100.0, 102.0, np.nan], [50.0, 0.0, 49.0]]))
+
+    assert matrix.shape == (2, 3, 3)
+    assert matrix[0, 0, 1] == 2.0
+    assert abs(matrix[0, 1, 0] - (100.0 - 102.0) / 102.0 * 100) < 1e-12
+    assert matrix[0, 0, 0] == 0.0
+    assert np.isnan(matrix[0, 0, 2]) and np.isnan(matrix[1, 1, 0])
+    assert abs(matrix[1, 2, 0] - (50.0 - 49.0) / 49.0 * 100) < 1e-12
+    print("  ✅ Spread matrix correct")
+
+def test_vectorized_scan_matches_scalar():
+    """Both evaluate paths store the same prices and return the same opportunities"""
+    print("\nTesting vectorized evaluation...")
+
+    results = {}
+    for vectorized in (False, True):
+        database = RecordingDatabase()
+        detector = ArbitrageDetector(database_service=database)
+        detector.trading_pairs = [f"SYM{i}" for i in range(300)]
+        detector.vectorized = vectorized
+        opportunities = detector.evaluate_all_price_data(random_price_data(detector.trading_pairs))
+        # All prices of the scan go to the database in one write
+        assert database.price_batches == 1
+        results[vectorized] = (
+            database.prices,
+            [(opp.symbol, opp.profit_percentage, opp.profit_amount, opp.buy_exchange, opp.sell_exchange) for opp in opportunities]
+        )
+        detector.close()
+
+    print(f"  {len(results[True][1])} opportunities, {len(results[True][0])} stored prices")
+    assert results[True] == results[False]
+
+class FailingBatchDatabase(RecordingDatabase):
+    """Stores opportunities but fails every price batch"""
+
+    def store_price_batch(self, price_batch):
+        raise RuntimeError("database is down")
+
+def test_failed_price_batch_keeps_opportunities():
+    """A price batch that cannot be stored, or no database at all, does not cost the scan its opportunities"""
+    print("\nTesting a failed price batch...")
+
+    pairs = [f"SYM{i}" for i in range(300)]
+    price_data = random_price_data(pairs)
+    found = {}
+    for name, database in (("stored", RecordingDatabase()), ("failing", FailingBatchDatabase()), ("none", None)):
+        detector = ArbitrageDetector(database_service=database)
+        detector.trading_pairs = pairs
+        found[name] = [opp.symbol for opp in detector.evaluate_all_price_data(price_data)]
+        detector.close()
+
+    print(f"  {len(found['stored'])} opportunities with a working, a failing and no database")
+    assert found["stored"]
+    assert found["failing"] == found["stored"] == found["none"]
+
+if __name__ == "__main__":
+    test_batch_matches_scalar()
+    test_spread_matrix()
+    test_vectorized_scan_matches_scalar()
+    test_failed_price_batch_keeps_opportunities()
+    print("\n✅ All vectorized detection tests completed successfully!")
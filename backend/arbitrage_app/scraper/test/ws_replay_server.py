@@ -0,0 +1,47 @@
+"""
+Local WebSocket stand-in for the exchange streams
+Replays recorded frames to every client that connects, following a short script
+"""
+
+import asyncio
+from typing import List, Tuple
+import websockets
+
+# A script step is ("send", frame) to push a frame or ("expect", count) to wait for client frames
+Step = Tuple[str, object]
+
+class ReplayServer:
+    """WebSocket server on localhost that plays a recorded session to each client"""
+
+    def __init__(self, script: List[Step], interval: float = 0.0):
+        self.script = script
+        self.interval = interval
+        self.received: List[str] = []
+        self.server = None
+        self.url = None
+
+    async def _handle(self, websocket, *args):
+        """Play the script, then keep the connection open until the client leaves"""
+        for action, value in self.script:
+            if action == "send":
+                await websocket.send(value)
+                if self.interval:
+                    await asyncio.sleep(self.interval)
+            else:
+                for _ in range(value):
+                    self.received.append(await websocket.recv())
+
+        async for message in websocket:
+            self.received.append(message)
+
+    async def start(self) -> str:
+        """Start listening on a free port and return the server URL"""
+        self.server = await websockets.serve(self._handle, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        self.url = f"ws://127.0.0.1:{port}"
+        return self.url
+
+    async def stop(self):
+        """Close the server and every open connection"""
+        self.server.close()
+        await self.server.wait_closed()
@@ -0,0 +1,127 @@
+"""
+Sharded deployment: several detector processes behind one metrics exporter
+Run directly: python -m arbitrage_app.sharded [shards]
+
+Worker i scans TRADING_PAIRS[i::shards] with 1/shards of every rate limit.
+All workers write their metrics to METRICS_MULTIPROCESS_DIR and this
+supervisor serves them on METRICS_PORT, so Prometheus keeps scraping one
+target. Only worker 0 sends start/stop notifications and maintains partitions.
+Each worker spills failed database writes to its own file, WRITE_SPILL_PATH.shard<i>.
+"""
+
+import logging
+import multiprocessing
+import signal
+import sys
+import time
+from typing import Dict, List
+from arbitrage_app.prometheus_adapter.multiprocess import enable_multiprocess_mode, start_multiprocess_exporter, mark_worker_dead
+from arbitrage_app.sample_trading import (
+    TRADING_PAIRS,
+    CHECK_INTERVAL_SECONDS,
+    WORKER_SHARDS,
+    METRICS_PORT,
+    METRICS_MULTIPROCESS_DIR,
+    WORKER_RESTART_DELAY_SECONDS,
+    WRITE_SPILL_PATH
+)
+
+logger = logging.getLogger(__name__)
+
+def shard_pairs(pairs: List[str], shard: int, shards: int) -> List[str]:
+    """Trading pairs scanned by one shard"""
+    return pairs[shard::shards]
+
+def shard_spill_path(shard: int) -> str:
+    """Write-behind spill file of one shard; the spill lock only guards its own process"""
+    return f"{WRITE_SPILL_PATH}.shard{shard}"
+
+def run_worker(shard: int, shards: int):
+    """Entry point of a worker process"""
+    # Imported in the worker so metrics are created after multiprocess mode is set up
+    from arbitrage_app.main import ArbitrageApp
+    from arbitrage_app.scraper.api.rate_limiter import share_rate_limits
+
+    share_rate_limits(shards)
+    app = ArbitrageApp(trading_pairs=shard_pairs(TRADING_PAIRS, shard, shards), metrics_port=None, primary=shard == 0,
+                       spill_path=shard_spill_path(shard))
+    app.start()
+
+class ShardSupervisor:
+    """Starts one process per shard, restarts the ones that exit and serves their combined metrics"""
+
+    def __init__(self, shards: int = WORKER_SHARDS, metrics_port: int = METRICS_PORT,
+                 metrics_path: str = METRICS_MULTIPROCESS_DIR):
+        self.shards = min(shards, len(TRADING_PAIRS))
+        self.metrics_port = metrics_port
+        self.metrics_path = metrics_path
+        self.context = multiprocessing.get_context("spawn")
+        self.workers: Dict[int, multiprocessing.Process] = {}
+        self.running = False
+
+    def start_worker(self, shard: int):
+        worker = self.context.Process(target=run_worker, args=(shard, self.shards), name=f"arbitrage-shard-{shard}")
+        worker.start()
+        self.workers[shard] = worker
+        logger.info(f"Started shard {shard}/{self.shards} (pid {worker.pid}): "
+                    f"{', '.join(shard_pairs(TRADING_PAIRS, shard, self.shards))}")
+
+    def run(self):
+        """Run the workers until SIGINT or SIGTERM"""
+        enable_multiprocess_mode(self.metrics_path)
+        # Set up the schema once, before workers race to do it
+        from arbitrage_app.database.models import init_database
+        init_database()
+
+        self.running = True
+        signal.signal(signal.SIGINT, self._signal_handler)
+        signal.signal(signal.SIGTERM, self._signal_handler)
+        for shard in range(self.shards):
+            self.start_worker(shard)
+        start_multiprocess_exporter(self.metrics_port)
+
+        try:
+            while self.running:
+                for shard, worker in list(self.workers.items()):
+                    if worker.is_alive():
+                        continue
+                    logger.warning(f"Shard {shard} (pid {worker.pid}) exited with code {worker.exitcode}, "
+                                   f"restarting in {WORKER_RESTART_DELAY_SECONDS} seconds")
+                    mark_worker_dead(worker.pid)
+                    time.sleep(WORKER_RESTART_DELAY_SECONDS)
+                    if self.running:
+                        self.start_worker(shard)
+                time.sleep(1)
+        finally:
+            self.stop()
+
+    def _signal_handler(self, signum, frame):
+        logger.info(f"Received signal {signum}. Stopping {len(self.workers)} shards...")
+        self.running = False
+
+    def stop(self):
+        """Ask every worker to stop gracefully and wait for them"""
+        for worker in self.workers.values():
+            if worker.is_alive():
+                worker.terminate()
+        # A worker notices the stop request after its current scan interval
+        for worker in self.workers.values():
+            worker.join(timeout=CHECK_INTERVAL_SECONDS + 30)
+            if worker.is_alive():
+                logger.warning(f"Shard {worker.name} did not stop, killing it")
+                worker.kill()
+                worker.join()
+            mark_worker_dead(worker.pid)
+        self.workers.clear()
+        logger.info("✅ All shards stopped")
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(processName)s - %(levelname)s - %(message)s'
+    )
+    shards = int(sys.argv[1]) if len(sys.argv) > 1 else WORKER_SHARDS
+    ShardSupervisor(shards).run()
+
+if __name__ == "__main__":
+    main()